@@ -0,0 +1,83 @@
+import random
+import time
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+import keyboards
+from texts import FORM_QUESTIONS_BY_LANG, SUPPORTED_LANGS, TRANSLATIONS, form_question, normalize_lang, t
+
+SAMPLES = 20000
+FORM_STATES = list(FORM_QUESTIONS_BY_LANG["ru"])
+
+
+def legacy_t(lang, key):
+    # Так t() работал до каталога: нормализация и два поиска по словарям на каждую строку.
+    code = normalize_lang(lang)
+    value = TRANSLATIONS.get(code, {}).get(key)
+    if value is None:
+        value = TRANSLATIONS["ru"].get(key, key)
+    return value
+
+
+def legacy_form_question(state, lang):
+    code = normalize_lang(lang)
+    questions = FORM_QUESTIONS_BY_LANG.get(code) or FORM_QUESTIONS_BY_LANG["ru"]
+    return questions[state]
+
+
+def legacy_form_keyboard(lang):
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=legacy_t(lang, "btn_back"), callback_data="form_back")],
+        [InlineKeyboardButton(text=legacy_t(lang, "menu_home"), callback_data="main_menu")]
+    ])
+
+
+def make_steps() -> list[tuple]:
+    rnd = random.Random(42)
+    return [(rnd.choice(FORM_STATES), rnd.choice(SUPPORTED_LANGS)) for _ in range(SAMPLES)]
+
+
+def run_legacy(steps) -> float:
+    started = time.perf_counter()
+    for state, lang in steps:
+        legacy_form_question(state, lang)
+        legacy_form_keyboard(lang)
+        legacy_t(lang, "field_phone_invalid")
+    return time.perf_counter() - started
+
+
+def run_catalog(steps) -> float:
+    started = time.perf_counter()
+    for state, lang in steps:
+        form_question(state, lang)
+        keyboards.form_keyboard(lang)
+        t(lang, "field_phone_invalid")
+    return time.perf_counter() - started
+
+
+def run_preview_menu(builder, langs) -> float:
+    started = time.perf_counter()
+    for lang in langs:
+        builder(lang)
+    return time.perf_counter() - started
+
+
+def main():
+    steps = make_steps()
+    legacy_time = run_legacy(steps)
+    catalog_time = run_catalog(steps)
+    langs = [lang for _, lang in steps]
+    preview_build = run_preview_menu(keyboards.preview_edit_menu.__wrapped__, langs)
+    preview_cached = run_preview_menu(keyboards.preview_edit_menu, langs)
+    print(f"Шагов анкеты: {len(steps)} (состояния: {', '.join(state.state.split(':')[-1] for state in FORM_STATES)})")
+    print(f"Сборка на каждый шаг: {legacy_time * 1e6 / len(steps):.2f} мкс на шаг")
+    print(f"Каталог:              {catalog_time * 1e6 / len(steps):.2f} мкс на шаг")
+    print(f"Ускорение: x{legacy_time / catalog_time:.1f}")
+    print(
+        f"preview_edit_menu: сборка {preview_build * 1e6 / len(langs):.2f} мкс, "
+        f"из каталога {preview_cached * 1e6 / len(langs):.2f} мкс"
+    )
+
+
+if __name__ == "__main__":
+    main()
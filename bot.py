@@ -1,14 +1,21 @@
 import asyncio
+import difflib
+import functools
+import hashlib
 import html
 import json
 import logging
 import os
 import random
 import re
+import socket
+import time
 import traceback
 import urllib.error
 import urllib.request
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from typing import Callable
 
 from aiogram import Bot, Dispatcher, F
 from aiogram.types import (
@@ -42,6 +49,7 @@ from config import (
     CHANNEL_ES_ID,
     CHANNEL_ID_BY_LANG,
     CHANNEL_IDS,
+    MEDIA_STORAGE_CHAT_ID,
 )
 from states import ApplicationStates
 from keyboards import *
@@ -49,6 +57,7 @@ from database import (
     set_status,
     get_status,
     get_application,
+    get_admin_card_row,
     set_last_state,
     set_last_apply_at,
     set_form_data,
@@ -58,15 +67,25 @@ from database import (
     get_status_counts,
     set_admin_message_id,
     get_admin_message_id,
+    get_admin_message_ids,
     get_admin_messages_for_archive,
     reset_all_data,
     get_setting,
     set_setting,
     list_applications,
+    list_applications_page,
+    list_application_ids,
+    search_applications,
+    parse_search_query,
+    backfill_application_fields,
+    country_key,
+    mark_duplicate_application,
+    create_bulk_job,
+    set_bulk_progress_message,
     set_menu_message_id,
-    get_menu_message_id,
     set_flow_message_id,
     get_flow_message_id,
+    get_user_message_state,
     set_source,
     get_source,
     get_user_language,
@@ -78,15 +97,89 @@ from database import (
     count_posted_messages,
     update_posted_message,
     delete_posted_message,
+    get_translation_segments,
+    save_translation_segments,
+    add_translation_memory_stats,
+    get_translation_memory_stats,
+    list_broadcast_audience,
+    create_broadcast_job,
+    get_broadcast_job,
+    set_broadcast_progress_message,
 )
 try:
-    from excel_export import append_application_row, update_application_status, rebuild_excel_from_db
+    from excel_export import (
+        append_application_row,
+        update_application_status,
+        update_application_statuses,
+        rebuild_excel_from_db,
+    )
 except Exception:
     append_application_row = None
     update_application_status = None
+    update_application_statuses = None
     rebuild_excel_from_db = None
     logging.getLogger(__name__).warning("Excel export недоступен (нет openpyxl?)")
-from utils import edit_or_send
+from utils import edit_or_send, fan_out
+from callback_data import (
+    AdminAccept,
+    AdminBroadcast,
+    AdminBroadcastStop,
+    AdminBulk,
+    AdminCompact,
+    AdminCompactOpen,
+    AdminList,
+    AdminMenu,
+    AdminPhotos,
+    AdminPost,
+    AdminPostDelete,
+    AdminPostEditCancel,
+    AdminPostEditPhoto,
+    AdminPostEditText,
+    AdminPosts,
+    AdminReject,
+    AdminResetDb,
+    AdminReview,
+    AdminStatus,
+    AdminViewPhoto,
+    EditField,
+    EditPhoto,
+    RejectTemplate,
+    SetLang,
+)
+from callback_router import CallbackRouter
+from card_cache import AdminCardCache
+from coalescer import AdminCoalescer
+from deletions import DeletionScheduler
+from jobs import JobScheduler
+from leader import LeaderElection
+from broadcast import BroadcastRunner
+from bulk import BulkDecisionRunner
+from middlewares import FloodControlMiddleware, UserOrderingMiddleware
+from review_queue import ReviewQueue
+from reachability import (
+    ReachabilityRequestMiddleware,
+    ReachabilityUpdateMiddleware,
+    is_user_reachable,
+    reachability_stats,
+)
+from message_kinds import (
+    MESSAGE_KIND_CAPTION,
+    MESSAGE_KIND_TEXT,
+    MessageRegistryMiddleware,
+    content_hash,
+    edit_message_by_kind,
+    is_message_visible,
+    mark_message_visible,
+    message_kind,
+)
+from media_registry import prewarm_media, send_cached_media, send_cached_media_group
+from rate_limiter import (
+    OutboundScheduler,
+    RateLimitMiddleware,
+    PRIORITY_BACKGROUND,
+    outbound_priority,
+    set_outbound_priority,
+)
 from texts import (
     STATUS_LABELS,
     t,
@@ -95,6 +188,7 @@ from texts import (
     field_title,
     status_label,
     support_lines,
+    missing_catalog_keys,
     LANGUAGE_NAMES,
 )
 from time_utils import format_submit_time
@@ -127,6 +221,23 @@ else:
     )
 
 dp = Dispatcher(storage=MemoryStorage())
+# Админ-группа — рабочий чат бота: правки по действиям админа там не тратят групповой лимит
+# (но соблюдают паузу после RetryAfter), а фоновые правки — массовые решения, архив — идут по нему.
+outbound_scheduler = OutboundScheduler(interactive_chats=(ADMIN_GROUP_ID,))
+bot.session.middleware(RateLimitMiddleware(outbound_scheduler))
+bot.session.middleware(ReachabilityRequestMiddleware())
+bot.session.middleware(MessageRegistryMiddleware())
+dp.update.outer_middleware(ReachabilityUpdateMiddleware())
+callback_router = CallbackRouter()
+
+
+@dp.callback_query()
+async def route_callback(call: CallbackQuery, state: FSMContext):
+    # Все кнопки идут через один обработчик: маршрут ищется по префиксу за O(1).
+    if call.message:
+        mark_message_visible(call.message.chat.id, call.message.message_id)
+    if not await callback_router.dispatch(call, state=state):
+        await safe_call_answer(call)
 
 # ================= GLOBAL ERROR HANDLER =================
 
@@ -402,10 +513,12 @@ def _get_env_float(name: str, default: float, min_value: float) -> float:
     return max(min_value, value)
 
 PORTFOLIO_COOLDOWN_SECONDS = 10
+MENU_PHOTO_PATH = "media/menu.jpg"
+PORTFOLIO_REVIEW_PATHS = ["media/review1.jpg", "media/review2.jpg"]
+PORTFOLIO_STREAM_PATHS = ["media/stream1.MP4", "media/stream2.MP4"]
+PORTFOLIO_PDF_CANDIDATES = ["media/portfolio.pdf", "web/assets/portfolio.pdf"]
 PORTFOLIO_AUTO_DELETE_SECONDS = 120
-PORTFOLIO_VIDEO_LAST: dict[int, datetime] = {}
-PORTFOLIO_MEDIA_IDS: dict[int, list[int]] = {}
-PORTFOLIO_CLEANUP_TASKS: dict[int, asyncio.Task] = {}
+PORTFOLIO_VIDEO_LAST: OrderedDict[int, datetime] = OrderedDict()
 ADMIN_TEMP_MESSAGE_IDS: list[int] = []
 CAPTION_LIMIT = 1024
 DAILY_STATS_HOUR = 10
@@ -417,6 +530,8 @@ ADMIN_LIST_LIMIT = 1
 ADMIN_NOTIFY_SETTING_KEY = "admin_notify_message_id"
 ADMIN_VIEW_SETTING_KEY = "admin_view_message_id"
 ADMIN_PHOTOS_SETTING_KEY = "admin_photos_message_ids"
+ADMIN_FIND_SETTING_KEY = "admin_find_query"
+ADMIN_FIND_QUERY_LIMIT = 100
 FORCE_LANGUAGE_PICK_ON_START = os.getenv("FORCE_LANGUAGE_PICK_ON_START", "1").strip().lower() in {"1", "true", "yes"}
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
 OPENAI_TRANSLATE_MODEL = os.getenv("OPENAI_TRANSLATE_MODEL", "gpt-4o-mini").strip()
@@ -449,6 +564,19 @@ TRANSLATION_STYLE = {
 }
 MEDIA_CONTENT_TYPES = {"photo", "video", "document", "animation"}
 GENERIC_MARKER_RE = re.compile(r"\[\[(?:CE\d+|E\d+[SE]|LK\d+)\]\]")
+LOOSE_MARKER_RE = re.compile(
+    r"\[\[\s*(CE|LK|E)\s*(\d+)\s*([SE]?)\s*\]\]?|\[\s*(CE|LK|E)\s*(\d+)\s*([SE]?)\s*\]\]",
+    re.IGNORECASE,
+)
+MARKER_RUN_RE = re.compile(r"\[\[(?:CE\d+|E\d+[SE]|LK\d+)\]\](?:[ \t]*\[\[(?:CE\d+|E\d+[SE]|LK\d+)\]\])+")
+MARKER_PARTS_RE = re.compile(r"\[\[(CE|LK|E)(\d+)([SE]?)\]\]")
+TRANSLATION_SEGMENT_SEPARATOR = "[[SEG]]"
+TRANSLATION_SEGMENT_SPLIT_RE = re.compile(r"\s*\[\[SEG\]\]\s*")
+TRANSLATION_SEGMENT_BOUNDARY_RE = re.compile(r"[ \t]*\n\s*|(?<=[.!?…])[ \t]+(?=[A-ZА-ЯЁ«\"\[])")
+PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n\s*")
+TRANSLATABLE_CHAR_RE = re.compile(r"[^\W\d_]")
+MARKER_START_SPACE_RE = re.compile(r"(\[\[E\d+S\]\])([ \t]+)")
+MARKER_END_SPACE_RE = re.compile(r"([ \t]+)(\[\[E\d+E\]\])")
 CUSTOM_EMOJI_PLACEHOLDER = "⭐"
 ANONYMOUS_ADMIN_BOT_ID = 1087968824
 TRANSLATABLE_ENTITY_TYPES = {
@@ -486,6 +614,50 @@ def _env_int(name: str, default: int) -> int:
 
 
 OPENAI_HTTP_TIMEOUT_SECONDS = _env_int("OPENAI_HTTP_TIMEOUT_SECONDS", 30)
+CHANNEL_FANOUT_CONCURRENCY = _get_env_int("CHANNEL_FANOUT_CONCURRENCY", default=4, min_value=1)
+MEDIA_PREWARM_CONCURRENCY = _get_env_int("MEDIA_PREWARM_CONCURRENCY", default=2, min_value=1)
+MEDIA_PREWARM_ON_STARTUP = os.getenv("MEDIA_PREWARM_ON_STARTUP", "1").strip().lower() in {"1", "true", "yes"}
+MEDIA_PREWARM_PROGRESS_SECONDS = 2.0
+MEDIA_PREWARM_TASK: asyncio.Task | None = None
+BROADCAST_RATE_PER_SECOND = _get_env_float("BROADCAST_RATE_PER_SECOND", default=20.0, min_value=0.5)
+BROADCAST_CONCURRENCY = _get_env_int("BROADCAST_CONCURRENCY", default=5, min_value=1)
+BROADCAST_PROGRESS_SECONDS = 5.0
+BROADCAST_STATUSES = ("new", "pending", "accepted", "rejected")
+UPDATE_CONCURRENCY = _get_env_int("UPDATE_CONCURRENCY", default=32, min_value=1)
+ADMIN_COALESCE_SECONDS = _get_env_float("ADMIN_COALESCE_SECONDS", default=5.0, min_value=0.0)
+JOB_CONCURRENCY = _get_env_int("JOB_CONCURRENCY", default=2, min_value=1)
+LEADER_LEASE_SECONDS = _get_env_float("LEADER_LEASE_SECONDS", default=15.0, min_value=3.0)
+ADMIN_CARD_CACHE_SIZE = _get_env_int("ADMIN_CARD_CACHE_SIZE", default=1024, min_value=16)
+REVIEW_PREFETCH_SIZE = _get_env_int("REVIEW_PREFETCH_SIZE", default=5, min_value=1)
+# Строк на странице компактного списка: по 3 кнопки на строку, лимит Telegram — 100 кнопок.
+ADMIN_COMPACT_PAGE_SIZE = min(_get_env_int("ADMIN_COMPACT_PAGE_SIZE", default=10, min_value=1), 25)
+FLOOD_LIMITS = {
+    "callback": (_get_env_float("FLOOD_CALLBACKS_PER_SECOND", default=2.0, min_value=0.1), 6.0),
+    "message": (_get_env_float("FLOOD_MESSAGES_PER_SECOND", default=1.0, min_value=0.1), 5.0),
+    "media": (_get_env_float("FLOOD_MEDIA_PER_SECOND", default=1.0, min_value=0.1), 10.0),
+}
+
+# Состояния, где текст — ответ на вопрос анкеты: его потерю пользователь должен заметить.
+FLOOD_NOTICE_STATES = frozenset(
+    state.state for state in (*STATE_TO_FIELD, ApplicationStates.edit_field, ApplicationStates.edit_value)
+)
+
+
+async def send_flood_notice(message: Message) -> None:
+    await message.answer(tr_user(message.from_user.id, "flood_slow_down"))
+
+
+# Лишние апдейты отбрасываем до очереди пользователя, чтобы они не ждали и не занимали слоты.
+flood_control = FloodControlMiddleware(FLOOD_LIMITS, notice=send_flood_notice, notice_states=FLOOD_NOTICE_STATES)
+dp.update.outer_middleware(flood_control)
+update_ordering = UserOrderingMiddleware(UPDATE_CONCURRENCY)
+dp.update.outer_middleware(update_ordering)
+admin_coalescer = AdminCoalescer(ADMIN_COALESCE_SECONDS)
+# Владелец отложенных удалений в БД: после перезапуска с тем же именем процесс поднимает свои строки.
+# Несколько реплик на одном хосте различаются через INSTANCE_ID.
+DELETION_OWNER = (os.getenv("INSTANCE_ID") or "").strip() or socket.gethostname()
+deletion_scheduler = DeletionScheduler(bot, owner=DELETION_OWNER)
+admin_card_cache = AdminCardCache(ADMIN_CARD_CACHE_SIZE)
 
 
 def active_post_channels() -> dict[str, int]:
@@ -513,6 +685,10 @@ async def setup_bot_commands() -> None:
         BotCommand(command="crosspost", description="Алиас команды create_post"),
         BotCommand(command="stats", description="Показать статистику"),
         BotCommand(command="excel", description="Выгрузить Excel"),
+        BotCommand(command="metrics", description="Технические метрики"),
+        BotCommand(command="prewarm_media", description="Загрузить медиа в кеш Telegram"),
+        BotCommand(command="broadcast", description="Рассылка пользователям бота"),
+        BotCommand(command="find", description="Найти заявку: имя, телефон, @ник, город"),
         BotCommand(command="reset_db", description="Сбросить базу (опасно)"),
     ]
     await bot.set_my_commands(user_commands, scope=BotCommandScopeDefault())
@@ -598,6 +774,141 @@ def tokens_intact(text: str, expected_tokens: list[str]) -> bool:
     return all(text.count(token) == 1 for token in expected_tokens)
 
 
+def _marker_span_words(source_text: str | None, first: str, second: str) -> int:
+    if not source_text:
+        return 1
+    start = source_text.find(first)
+    end = source_text.find(second, start + len(first)) if start >= 0 else -1
+    if start < 0 or end < 0:
+        return 1
+    return max(1, len(source_text[start + len(first):end].split()))
+
+
+def _fix_marker_runs(text: str, order: dict[str, int]) -> str:
+    # Соседние маркеры, между которыми только пробелы, можно переставить без потери смысла.
+    result: list[str] = []
+    cursor = 0
+    for run in MARKER_RUN_RE.finditer(text):
+        tokens = GENERIC_MARKER_RE.findall(run.group(0))
+        if len(tokens) < 2:
+            continue
+        ordered = sorted(tokens, key=lambda token: order.get(token, -1))
+        if ordered == tokens:
+            continue
+        gaps = GENERIC_MARKER_RE.split(run.group(0))[1:-1]
+        rebuilt = ordered[0] + "".join(gap + token for gap, token in zip(gaps, ordered[1:]))
+        result.append(text[cursor:run.start()])
+        result.append(rebuilt)
+        cursor = run.end()
+    result.append(text[cursor:])
+    return "".join(result)
+
+
+def _normalize_marker_spacing(text: str, source_text: str | None) -> str:
+    source = source_text or ""
+
+    # Пробел, через который сдвинули маркер, нужен только между словами: рядом с пробелом,
+    # краем текста или знаком препинания он стал бы лишним («friends[[E2E]] !»).
+    def _start_spacing(match: re.Match) -> str:
+        token, spaces = match.group(1), match.group(2)
+        if f"{token}{spaces[:1]}" in source:
+            return match.group(0)
+        before = match.string[match.start() - 1:match.start()]
+        if not before or before.isspace() or before in "([{«„“\"'":
+            return token
+        return f"{spaces}{token}"
+
+    def _end_spacing(match: re.Match) -> str:
+        spaces, token = match.group(1), match.group(2)
+        if f"{spaces[-1:]}{token}" in source:
+            return match.group(0)
+        after = match.string[match.end():match.end() + 1]
+        if not after or after.isspace() or after in ".,!?:;…)]}»“\"'":
+            return token
+        return f"{token}{spaces}"
+
+    text = MARKER_START_SPACE_RE.sub(_start_spacing, text)
+    text = MARKER_END_SPACE_RE.sub(_end_spacing, text)
+    if "  " not in source:
+        text = re.sub(r"(?<=\S)[ \t]{2,}(?=\S)", " ", text)
+    return text
+
+
+def repair_translation_markers(
+    text: str,
+    expected_tokens: list[str],
+    source_text: str | None = None,
+) -> str | None:
+    if not expected_tokens:
+        return text
+    order = {token: idx for idx, token in enumerate(expected_tokens)}
+
+    def _canonical(match: re.Match) -> str:
+        kind, number, suffix = (match.group(1) or match.group(4)).upper(), match.group(2) or match.group(5), (
+            match.group(3) or match.group(6) or ""
+        ).upper()
+        if (kind == "E") != bool(suffix):
+            return match.group(0)
+        return f"[[{kind}{int(number)}{suffix}]]"
+
+    seen: set[str] = set()
+
+    def _dedupe(match: re.Match) -> str:
+        token = match.group(0)
+        if token not in order or token in seen:
+            return ""
+        seen.add(token)
+        return token
+
+    repaired = LOOSE_MARKER_RE.sub(_canonical, text)
+    repaired = GENERIC_MARKER_RE.sub(_dedupe, repaired)
+
+    for token in expected_tokens:
+        if token in seen:
+            continue
+        pair = re.fullmatch(r"\[\[E(\d+)([SE])\]\]", token)
+        if not pair:
+            # Эмодзи и ссылки несут содержимое, угадывать их позицию нельзя.
+            return None
+        is_end = pair.group(2) == "E"
+        partner = f"[[E{pair.group(1)}{'S' if is_end else 'E'}]]"
+        partner_pos = repaired.find(partner)
+        if partner_pos < 0:
+            return None
+        words = _marker_span_words(source_text, partner if is_end else token, token if is_end else partner)
+        markers = list(GENERIC_MARKER_RE.finditer(repaired))
+        if is_end:
+            lower = partner_pos + len(partner)
+            upper = next(
+                (m.start() for m in markers if m.start() >= lower and order.get(m.group(0), -1) > order[token]),
+                len(repaired),
+            )
+            span_words = list(re.finditer(r"\S+", repaired[lower:upper]))[:words]
+            insert_at = lower + span_words[-1].end() if span_words else lower
+            while insert_at > lower and repaired[insert_at - 1] in ".,!?:;…" and not (
+                source_text and re.search(rf"[.,!?:;…]{re.escape(token)}", source_text)
+            ):
+                insert_at -= 1
+        else:
+            upper = partner_pos
+            lower = max(
+                (m.end() for m in markers if m.end() <= upper and order.get(m.group(0), len(order)) < order[token]),
+                default=0,
+            )
+            span_words = list(re.finditer(r"\S+", repaired[lower:upper]))[-words:]
+            insert_at = lower + span_words[0].start() if span_words else upper
+        repaired = repaired[:insert_at] + token + repaired[insert_at:]
+        seen.add(token)
+
+    repaired = _fix_marker_runs(repaired, order)
+    repaired = _normalize_marker_spacing(repaired, source_text)
+    if source_text is None or source_text == source_text.strip():
+        repaired = repaired.strip()
+    if not tokens_intact(repaired, expected_tokens):
+        return None
+    return repaired
+
+
 def entity_to_dict(entity: MessageEntity) -> dict:
     try:
         return entity.model_dump(exclude_none=True)
@@ -744,7 +1055,10 @@ def restore_entities_from_markers(
     if not expected_tokens:
         return text, None
     if not tokens_intact(text, expected_tokens):
-        raise RuntimeError("⚠️ Переводчик повредил маркеры форматирования/ссылок. Попробуй отправить пост ещё раз.")
+        repaired_text = repair_translation_markers(text, expected_tokens)
+        if repaired_text is None:
+            raise RuntimeError("⚠️ Переводчик повредил маркеры форматирования/ссылок. Попробуй отправить пост ещё раз.")
+        text = repaired_text
 
     rich_by_id = {int(spec["id"]): spec for spec in rich_specs}
     token_actions: dict[str, tuple] = {}
@@ -923,7 +1237,12 @@ def translate_ru_to_lang_sync(ru_text: str, target_lang: str, required_tokens: l
         if not translated_text:
             continue
         if tokens and not tokens_intact(translated_text, tokens):
-            continue
+            repaired_text = repair_translation_markers(translated_text, tokens, source_text=ru_text)
+            if repaired_text is None:
+                logger.warning("Маркеры в переводе %s не восстановить, повторяю запрос (попытка %s)", target_lang, attempt + 1)
+                continue
+            logger.info("Маркеры в переводе %s восстановлены без повторного запроса", target_lang)
+            translated_text = repaired_text
         return translated_text
 
     if tokens:
@@ -931,6 +1250,141 @@ def translate_ru_to_lang_sync(ru_text: str, target_lang: str, required_tokens: l
     raise RuntimeError("⚠️ Сервис перевода вернул пустой ответ.")
 
 
+def split_marked_segments(marked_text: str) -> list[tuple[str, str]]:
+    # Режем по строкам и предложениям, но только там, где не открыта ни одна сущность.
+    segments: list[tuple[str, str]] = []
+    open_spans: set[str] = set()
+    segment_start = 0
+    scanned = 0
+    for boundary in TRANSLATION_SEGMENT_BOUNDARY_RE.finditer(marked_text):
+        for marker in MARKER_PARTS_RE.finditer(marked_text, scanned, boundary.start()):
+            if marker.group(1) != "E":
+                continue
+            if marker.group(3) == "S":
+                open_spans.add(marker.group(2))
+            else:
+                open_spans.discard(marker.group(2))
+        scanned = boundary.start()
+        if open_spans:
+            continue
+        segments.append((marked_text[segment_start:boundary.start()], boundary.group(0)))
+        segment_start = boundary.end()
+    segments.append((marked_text[segment_start:], ""))
+    return segments
+
+
+def renumber_markers(
+    text: str,
+    next_ids: dict[str, int] | None = None,
+) -> tuple[str, dict[str, str], dict[str, int]]:
+    counters = dict(next_ids or {})
+    id_map: dict[tuple[str, str], int] = {}
+    back_map: dict[str, str] = {}
+
+    def _renumber(match: re.Match) -> str:
+        kind, number, suffix = match.group(1), match.group(2), match.group(3)
+        key = (kind, number)
+        if key not in id_map:
+            id_map[key] = counters.get(kind, 0)
+            counters[kind] = id_map[key] + 1
+        token = f"[[{kind}{id_map[key]}{suffix}]]"
+        back_map[token] = match.group(0)
+        return token
+
+    return MARKER_PARTS_RE.sub(_renumber, text), back_map, counters
+
+
+def apply_marker_map(text: str, mapping: dict[str, str]) -> str:
+    return GENERIC_MARKER_RE.sub(lambda match: mapping.get(match.group(0), match.group(0)), text)
+
+
+def _is_translatable_segment(segment: str) -> bool:
+    return bool(TRANSLATABLE_CHAR_RE.search(GENERIC_MARKER_RE.sub("", segment)))
+
+
+def _translate_segment_batch_sync(local_segments: list[str], target_lang: str) -> list[str] | None:
+    batch_parts: list[str] = []
+    back_maps: list[dict[str, str]] = []
+    next_ids: dict[str, int] = {}
+    for local_text in local_segments:
+        batch_text, back_map, next_ids = renumber_markers(local_text, next_ids)
+        batch_parts.append(batch_text)
+        back_maps.append(back_map)
+    joined = f"\n\n{TRANSLATION_SEGMENT_SEPARATOR}\n\n".join(batch_parts)
+    translated = translate_ru_to_lang_sync(joined, target_lang, GENERIC_MARKER_RE.findall(joined))
+    pieces = TRANSLATION_SEGMENT_SPLIT_RE.split(translated.strip())
+    if len(pieces) != len(batch_parts):
+        logger.warning("Перевод %s вернул %s сегментов вместо %s", target_lang, len(pieces), len(batch_parts))
+        return None
+    result: list[str] = []
+    for piece, batch_text, back_map in zip(pieces, batch_parts, back_maps):
+        expected = GENERIC_MARKER_RE.findall(batch_text)
+        piece = piece.strip()
+        if not piece or not tokens_intact(piece, expected):
+            piece = repair_translation_markers(piece, expected, source_text=batch_text) if piece else None
+            if piece is None:
+                return None
+        result.append(apply_marker_map(piece, back_map))
+    return result
+
+
+def translate_marked_texts_sync(marked_texts: list[str], target_lang: str) -> list[str]:
+    documents: list[list[dict]] = []
+    sources: dict[str, str] = {}
+    for marked_text in marked_texts:
+        parts: list[dict] = []
+        for segment, separator in split_marked_segments(marked_text):
+            core = segment.strip()
+            if not _is_translatable_segment(core):
+                parts.append({"text": segment, "separator": separator})
+                continue
+            local_text, back_map, _ = renumber_markers(core)
+            key = hashlib.sha1(local_text.encode("utf-8")).hexdigest()
+            sources.setdefault(key, local_text)
+            start = segment.find(core)
+            parts.append(
+                {
+                    "key": key,
+                    "back": back_map,
+                    "lead": segment[:start],
+                    "trail": segment[start + len(core):],
+                    "separator": separator,
+                }
+            )
+        documents.append(parts)
+
+    translations = get_translation_segments(target_lang, list(sources))
+    pending = [key for key in sources if key not in translations]
+    hits = len(sources) - len(pending)
+    if pending:
+        translated = _translate_segment_batch_sync([sources[key] for key in pending], target_lang)
+        if translated is None:
+            add_translation_memory_stats(0, len(sources))
+            return [
+                translate_ru_to_lang_sync(text, target_lang, GENERIC_MARKER_RE.findall(text)) if text else ""
+                for text in marked_texts
+            ]
+        fresh = list(zip(pending, translated))
+        translations.update(fresh)
+        save_translation_segments(target_lang, [(key, sources[key], value) for key, value in fresh])
+    add_translation_memory_stats(hits, len(pending))
+    if sources:
+        logger.info("Память переводов %s: %s из %s сегментов из кэша", target_lang, hits, len(sources))
+
+    result: list[str] = []
+    for parts in documents:
+        chunks: list[str] = []
+        for part in parts:
+            if "key" in part:
+                translated_segment = apply_marker_map(translations[part["key"]], part["back"])
+                chunks.append(f"{part['lead']}{translated_segment}{part['trail']}")
+            else:
+                chunks.append(part["text"])
+            chunks.append(part["separator"])
+        result.append("".join(chunks))
+    return result
+
+
 async def translate_ru_to_lang(ru_text: str, target_lang: str, required_tokens: list[str] | None = None) -> str:
     if not ru_text:
         return ""
@@ -945,11 +1399,170 @@ async def translate_ru_to_targets(
     result: dict[str, str] = {}
     if not ru_text or not target_langs:
         return result
+    tokens = list(required_tokens or [])
     for target_lang in target_langs:
-        result[target_lang] = await translate_ru_to_lang(ru_text, target_lang, required_tokens=required_tokens)
+        translated = (await asyncio.to_thread(translate_marked_texts_sync, [ru_text], target_lang))[0]
+        if not tokens_intact(translated, tokens):
+            translated = await translate_ru_to_lang(ru_text, target_lang, required_tokens=tokens)
+        result[target_lang] = translated
     return result
 
 
+def split_paragraphs_with_entities(
+    text: str,
+    entities: list[MessageEntity] | None,
+) -> tuple[list[tuple[str, list[MessageEntity]]], list[str]]:
+    spans: list[tuple[int, int, MessageEntity]] = []
+    for entity in (entities or []):
+        start = utf16_offset_to_index(text, int(getattr(entity, "offset", 0)))
+        end = utf16_offset_to_index(text, int(getattr(entity, "offset", 0)) + int(getattr(entity, "length", 0)))
+        spans.append((start, end, entity))
+
+    bounds: list[tuple[int, int]] = []
+    separators: list[str] = []
+    start = 0
+    for brk in PARAGRAPH_BREAK_RE.finditer(text):
+        # Абзац не режем, если через разрыв тянется форматирование.
+        if any(span_start < brk.end() and span_end > brk.start() for span_start, span_end, _ in spans):
+            continue
+        bounds.append((start, brk.start()))
+        separators.append(brk.group(0))
+        start = brk.end()
+    bounds.append((start, len(text)))
+
+    paragraphs: list[tuple[str, list[MessageEntity]]] = []
+    for para_start, para_end in bounds:
+        para_entities: list[MessageEntity] = []
+        for span_start, span_end, entity in spans:
+            if span_start < para_start or span_end > para_end:
+                continue
+            data = entity_to_dict(entity)
+            data["offset"] = utf16_length(text[para_start:span_start])
+            try:
+                para_entities.append(MessageEntity(**data))
+            except Exception:
+                continue
+        paragraphs.append((text[para_start:para_end], para_entities))
+    return paragraphs, separators
+
+
+def join_paragraphs_with_entities(
+    paragraphs: list[tuple[str, list[MessageEntity] | None]],
+    separators: list[str],
+) -> tuple[str, list[MessageEntity] | None]:
+    parts: list[str] = []
+    result_entities: list[MessageEntity] = []
+    utf16_cursor = 0
+    for idx, (text, entities) in enumerate(paragraphs):
+        if idx:
+            separator = separators[idx - 1] if idx - 1 < len(separators) else "\n\n"
+            parts.append(separator)
+            utf16_cursor += utf16_length(separator)
+        for entity in (entities or []):
+            data = entity_to_dict(entity)
+            data["offset"] = int(data.get("offset", 0)) + utf16_cursor
+            try:
+                result_entities.append(MessageEntity(**data))
+            except Exception:
+                continue
+        parts.append(text)
+        utf16_cursor += utf16_length(text)
+    return "".join(parts), (result_entities or None)
+
+
+def _paragraph_signature(paragraph: tuple[str, list[MessageEntity]]) -> tuple:
+    text, entities = paragraph
+    return (
+        text.strip(),
+        tuple(
+            (
+                str(getattr(entity, "type", "") or ""),
+                int(getattr(entity, "offset", 0)),
+                int(getattr(entity, "length", 0)),
+                getattr(entity, "url", None),
+                getattr(entity, "custom_emoji_id", None),
+                getattr(entity, "language", None),
+            )
+            for entity in entities
+        ),
+    )
+
+
+async def retranslate_changed_paragraphs(
+    item: dict,
+    ru_text: str,
+    ru_entities: list[MessageEntity] | None,
+    target_langs: list[str],
+) -> tuple[dict[str, str], dict[str, list[MessageEntity] | None], list[str]]:
+    stored_texts = _post_texts(item)
+    stored_entities = _post_entities(item)
+    old_ru = stored_texts.get("ru") or ""
+    if not old_ru.strip():
+        return {}, {}, list(target_langs)
+
+    old_paragraphs, _ = split_paragraphs_with_entities(old_ru, stored_entities.get("ru"))
+    new_paragraphs, new_separators = split_paragraphs_with_entities(ru_text, ru_entities)
+
+    aligned: dict[str, list[tuple[str, list[MessageEntity]]]] = {}
+    full_langs: list[str] = []
+    for lang in target_langs:
+        stored_text = stored_texts.get(lang) or ""
+        paragraphs, _ = split_paragraphs_with_entities(stored_text, stored_entities.get(lang))
+        if stored_text.strip() and len(paragraphs) == len(old_paragraphs):
+            aligned[lang] = paragraphs
+        else:
+            full_langs.append(lang)
+    if not aligned:
+        return {}, {}, full_langs
+
+    opcodes = difflib.SequenceMatcher(
+        None,
+        [_paragraph_signature(paragraph) for paragraph in old_paragraphs],
+        [_paragraph_signature(paragraph) for paragraph in new_paragraphs],
+        autojunk=False,
+    ).get_opcodes()
+    changed = [idx for tag, _i1, _i2, j1, j2 in opcodes if tag in {"replace", "insert"} for idx in range(j1, j2)]
+    logger.info(
+        "Правка поста #%s: изменено абзацев %s из %s, полный перевод для: %s",
+        item.get("id"),
+        len(changed),
+        len(new_paragraphs),
+        ", ".join(full_langs) or "-",
+    )
+
+    marked = {
+        idx: markerize_entities_for_translation(new_paragraphs[idx][0], new_paragraphs[idx][1])
+        for idx in changed
+    }
+    texts: dict[str, str] = {}
+    entities: dict[str, list[MessageEntity] | None] = {}
+    for lang, stored_paragraphs in aligned.items():
+        translated: dict[int, tuple[str, list[MessageEntity] | None]] = {}
+        if changed:
+            marked_texts = await asyncio.to_thread(
+                translate_marked_texts_sync,
+                [marked[idx][0] for idx in changed],
+                lang,
+            )
+            for idx, translated_marked in zip(changed, marked_texts):
+                _marked_text, tokens, rich_specs, custom_specs, locked_specs = marked[idx]
+                translated[idx] = restore_entities_from_markers(
+                    translated_marked,
+                    tokens,
+                    rich_specs,
+                    custom_specs,
+                    locked_specs,
+                )
+        paragraphs: list[tuple[str, list[MessageEntity] | None]] = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                paragraphs.extend(stored_paragraphs[i1:i2])
+            elif tag in {"replace", "insert"}:
+                paragraphs.extend(translated[idx] for idx in range(j1, j2))
+        texts[lang], entities[lang] = join_paragraphs_with_entities(paragraphs, new_separators)
+    return texts, entities, full_langs
+
+
 async def is_admin_actor(chat_id: int, user_id: int | None) -> bool:
     if not user_id:
         return False
@@ -976,6 +1589,13 @@ async def can_manage_admin_group(message: Message) -> bool:
     return await is_admin_actor(message.chat.id, message.from_user.id)
 
 
+async def can_manage_admin_callback(call: CallbackQuery) -> bool:
+    # Кнопки в админ-группе видят все участники, а запускать и останавливать рассылку могут только админы.
+    if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
+        return False
+    return await is_admin_actor(ADMIN_GROUP_ID, call.from_user.id)
+
+
 async def sync_anonymous_create_post_state(enabled: bool):
     try:
         anon_ctx = dp.fsm.get_context(
@@ -1020,156 +1640,97 @@ async def send_crosspost_to_channels(
     if source_message.text and not ru_text:
         raise ValueError("⚠️ Текст поста пустой. Отправь текст заново.")
     entities_map = translated_entities or {}
-    posted_message_ids: dict[str, int] = {}
-    posted_texts: dict[str, str] = {}
-    posted_entities: dict[str, list[MessageEntity] | None] = {}
 
+    media_senders = {
+        "photo": ("photo", bot.send_photo),
+        "video": ("video", bot.send_video),
+        "document": ("document", bot.send_document),
+        "animation": ("animation", bot.send_animation),
+    }
+    file_id = None
     content_type = "text"
     if source_message.photo:
-        content_type = "photo"
+        content_type, file_id = "photo", source_message.photo[-1].file_id
     elif source_message.video:
-        content_type = "video"
+        content_type, file_id = "video", source_message.video.file_id
     elif source_message.document:
-        content_type = "document"
+        content_type, file_id = "document", source_message.document.file_id
     elif source_message.animation:
-        content_type = "animation"
+        content_type, file_id = "animation", source_message.animation.file_id
+    elif not source_message.text:
+        raise ValueError("⚠️ Поддерживаются текст, фото, видео, gif и документ.")
 
-    # RU channel gets exact copy to preserve original formatting and premium emoji 1:1.
-    ru_copy = await bot.copy_message(
-        chat_id=channels["ru"],
-        from_chat_id=source_message.chat.id,
-        message_id=source_message.message_id,
-    )
-    posted_message_ids["ru"] = int(getattr(ru_copy, "message_id", 0))
-    posted_texts["ru"] = (ru_text or "").strip()
-    posted_entities["ru"] = list(ru_entities or [])
-
-    translated_channels = [lang for lang in POST_LANG_ORDER if lang in channels and lang != "ru"]
-    if not translated_channels:
-        return {
-            "content_type": content_type,
-            "message_ids": posted_message_ids,
-            "texts": posted_texts,
-            "entities": posted_entities,
-        }
-
-    def text_for_lang(lang: str) -> str:
-        return (translated_texts.get(lang) or "").strip()
-
-    if source_message.photo:
-        file_id = source_message.photo[-1].file_id
-        for lang in translated_channels:
-            chat_id = channels[lang]
-            text = text_for_lang(lang)
-            entities = entities_map.get(lang)
-            kwargs = {"chat_id": chat_id, "photo": file_id}
-            if text:
-                text, entities = fit_caption_with_entities(text, entities)
-                kwargs["caption"] = text
-                kwargs["parse_mode"] = None
-                if entities:
-                    kwargs["caption_entities"] = entities
-            sent = await bot.send_photo(**kwargs)
-            posted_message_ids[lang] = int(sent.message_id)
-            posted_texts[lang] = text or ""
-            posted_entities[lang] = entities
-        return {
-            "content_type": content_type,
-            "message_ids": posted_message_ids,
-            "texts": posted_texts,
-            "entities": posted_entities,
-        }
-    if source_message.video:
-        file_id = source_message.video.file_id
-        for lang in translated_channels:
-            chat_id = channels[lang]
-            text = text_for_lang(lang)
-            entities = entities_map.get(lang)
-            kwargs = {"chat_id": chat_id, "video": file_id}
-            if text:
-                text, entities = fit_caption_with_entities(text, entities)
-                kwargs["caption"] = text
-                kwargs["parse_mode"] = None
-                if entities:
-                    kwargs["caption_entities"] = entities
-            sent = await bot.send_video(**kwargs)
-            posted_message_ids[lang] = int(sent.message_id)
-            posted_texts[lang] = text or ""
-            posted_entities[lang] = entities
-        return {
-            "content_type": content_type,
-            "message_ids": posted_message_ids,
-            "texts": posted_texts,
-            "entities": posted_entities,
-        }
-    if source_message.document:
-        file_id = source_message.document.file_id
-        for lang in translated_channels:
-            chat_id = channels[lang]
-            text = text_for_lang(lang)
-            entities = entities_map.get(lang)
-            kwargs = {"chat_id": chat_id, "document": file_id}
-            if text:
-                text, entities = fit_caption_with_entities(text, entities)
-                kwargs["caption"] = text
-                kwargs["parse_mode"] = None
-                if entities:
-                    kwargs["caption_entities"] = entities
-            sent = await bot.send_document(**kwargs)
-            posted_message_ids[lang] = int(sent.message_id)
-            posted_texts[lang] = text or ""
-            posted_entities[lang] = entities
-        return {
-            "content_type": content_type,
-            "message_ids": posted_message_ids,
-            "texts": posted_texts,
-            "entities": posted_entities,
-        }
-    if source_message.animation:
-        file_id = source_message.animation.file_id
-        for lang in translated_channels:
-            chat_id = channels[lang]
-            text = text_for_lang(lang)
-            entities = entities_map.get(lang)
-            kwargs = {"chat_id": chat_id, "animation": file_id}
-            if text:
-                text, entities = fit_caption_with_entities(text, entities)
-                kwargs["caption"] = text
-                kwargs["parse_mode"] = None
-                if entities:
-                    kwargs["caption_entities"] = entities
-            sent = await bot.send_animation(**kwargs)
-            posted_message_ids[lang] = int(sent.message_id)
-            posted_texts[lang] = text or ""
-            posted_entities[lang] = entities
-        return {
-            "content_type": content_type,
-            "message_ids": posted_message_ids,
-            "texts": posted_texts,
-            "entities": posted_entities,
-        }
-    if source_message.text:
-        for lang in translated_channels:
-            chat_id = channels[lang]
-            text = text_for_lang(lang)
+    # Сначала готовим все языки: ошибки длины/пустого перевода должны всплыть до первой отправки.
+    prepared: dict[str, tuple[Callable, dict, str, list[MessageEntity] | None]] = {}
+    for lang in POST_LANG_ORDER:
+        if lang not in channels or lang == "ru":
+            continue
+        text = (translated_texts.get(lang) or "").strip()
+        entities = entities_map.get(lang)
+        if content_type == "text":
             if not text:
                 raise RuntimeError(f"⚠️ Пустой перевод для {LANG_TITLES.get(lang, lang.upper())}.")
-            entities = entities_map.get(lang)
             text, entities = fit_text_with_entities(text, entities)
-            kwargs = {"chat_id": chat_id, "text": text, "parse_mode": None}
+            kwargs = {"chat_id": channels[lang], "text": text, "parse_mode": None}
             if entities:
                 kwargs["entities"] = entities
-            sent = await bot.send_message(**kwargs)
-            posted_message_ids[lang] = int(sent.message_id)
-            posted_texts[lang] = text or ""
-            posted_entities[lang] = entities
-        return {
-            "content_type": content_type,
-            "message_ids": posted_message_ids,
-            "texts": posted_texts,
-            "entities": posted_entities,
-        }
-    raise ValueError("⚠️ Поддерживаются текст, фото, видео, gif и документ.")
+            prepared[lang] = (bot.send_message, kwargs, text, entities)
+            continue
+        field, sender = media_senders[content_type]
+        kwargs = {"chat_id": channels[lang], field: file_id}
+        if text:
+            text, entities = fit_caption_with_entities(text, entities)
+            kwargs["caption"] = text
+            kwargs["parse_mode"] = None
+            if entities:
+                kwargs["caption_entities"] = entities
+        prepared[lang] = (sender, kwargs, text or "", entities)
+
+    # RU channel gets exact copy to preserve original formatting and premium emoji 1:1.
+    calls: dict[str, Callable] = {
+        "ru": functools.partial(
+            bot.copy_message,
+            chat_id=channels["ru"],
+            from_chat_id=source_message.chat.id,
+            message_id=source_message.message_id,
+        )
+    }
+    for lang, (sender, kwargs, _text, _entities) in prepared.items():
+        calls[lang] = functools.partial(sender, **kwargs)
+    results, errors = await fan_out(calls, CHANNEL_FANOUT_CONCURRENCY)
+    if not results:
+        first_error = next(iter(errors.values()), None)
+        raise RuntimeError(f"⚠️ Пост не опубликован ни в один канал: {first_error}")
+
+    posted_message_ids: dict[str, int] = {}
+    posted_texts: dict[str, str] = {}
+    posted_entities: dict[str, list[MessageEntity] | None] = {}
+    for lang, sent in results.items():
+        posted_message_ids[lang] = int(getattr(sent, "message_id", 0))
+        if lang == "ru":
+            posted_texts[lang] = (ru_text or "").strip()
+            posted_entities[lang] = list(ru_entities or [])
+        else:
+            _sender, _kwargs, posted_texts[lang], posted_entities[lang] = prepared[lang]
+    return {
+        "content_type": content_type,
+        "message_ids": posted_message_ids,
+        "texts": posted_texts,
+        "entities": posted_entities,
+        "errors": errors,
+    }
+
+
+def channel_fan_out_report(results: dict, errors: dict[str, Exception]) -> str:
+    lines: list[str] = []
+    done = [LANG_TITLES.get(lang, lang.upper()) for lang in POST_LANG_ORDER if lang in results]
+    if done:
+        lines.append(f"✅ {', '.join(done)}")
+    for lang in POST_LANG_ORDER:
+        exc = errors.get(lang)
+        if exc is not None:
+            lines.append(f"❌ {LANG_TITLES.get(lang, lang.upper())}: {html.escape(str(exc)[:200])}")
+    return "\n".join(lines)
 
 
 def entities_map_to_payload(entities_map: dict[str, list[MessageEntity] | None]) -> dict[str, list[dict]]:
@@ -1295,6 +1856,7 @@ async def persist_form_data(state: FSMContext, user_id: int):
     filtered = {k: v for k, v in data.items() if k in FORM_DATA_FIELDS and v is not None}
     if filtered:
         set_form_data(user_id, filtered)
+        admin_card_cache.invalidate(user_id)
 
 async def update_form_field(state: FSMContext, user_id: int, **kwargs):
     await state.update_data(**kwargs)
@@ -1315,10 +1877,7 @@ async def delete_user_message(m: Message):
 
 async def try_edit_message(message: Message, text: str, reply_markup=None) -> bool:
     try:
-        if message.photo or message.caption is not None:
-            await message.edit_caption(caption=text, reply_markup=reply_markup)
-        else:
-            await message.edit_text(text, reply_markup=reply_markup)
+        await edit_message_by_kind(bot, message.chat.id, message.message_id, message_kind(message), text, reply_markup)
         return True
     except TelegramBadRequest as e:
         if "message is not modified" in str(e).lower():
@@ -1342,16 +1901,14 @@ async def send_status_message(message: Message, status: str | None):
         except Exception:
             await message.answer(line)
 
-def source_label_for_user(user_id: int) -> str:
-    source = get_source(user_id)
+def source_label(source: str | None) -> str:
     if source == "site":
         return "Сайт"
-    if source == "bot":
-        return "Бот"
     return "Бот"
 
-def contact_url_for_user(user_id: int, data: dict | None) -> str:
-    source = get_source(user_id)
+def contact_url_for_user(user_id: int, data: dict | None, source: str | None = None) -> str:
+    if source is None:
+        source = get_source(user_id)
     if source == "site":
         raw = (data or {}).get("telegram", "") or ""
         username = raw.lstrip("@").strip()
@@ -1370,21 +1927,28 @@ def lang_for(user_id: int) -> str:
 def tr_user(user_id: int, key: str, **kwargs) -> str:
     return t(lang_for(user_id), key, **kwargs)
 
-def submit_time_label_for_user(user_id: int) -> str:
-    app = get_application(user_id) or {}
+def submit_time_label(app: dict) -> str:
     raw = app.get("last_apply_at") or app.get("created_at")
     if not raw:
         return "—"
     return _safe_text(format_submit_time(str(raw)))
 
+# Один проход translate: невидимые символы убираем, управляющие превращаем в пробелы,
+# HTML-спецсимволы экранируем как html.escape; пробелы затем схлопывает split/join.
+_SAFE_TEXT_TABLE = str.maketrans({
+    **{code: None for code in (*range(0x200B, 0x2010), *range(0x202A, 0x202F), 0x2060, 0xFEFF, 0xFFFD)},
+    **{code: " " for code in (*range(0x00, 0x20), 0x7F)},
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+
 def _safe_text(value) -> str:
     if value is None:
         return "—"
-    text = str(value)
-    text = re.sub(r"[\u200b-\u200f\u202a-\u202e\u2060\ufeff\ufffd]", "", text)
-    text = re.sub(r"[\x00-\x1F\x7F]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return html.escape(text)
+    return " ".join(str(value).translate(_SAFE_TEXT_TABLE).split())
 
 def extract_country_from_location(location: str | None) -> str | None:
     raw = (location or "").strip()
@@ -1462,18 +2026,40 @@ def build_admin_status_text(user_id: int, status: str) -> str:
         f"🆔 ID: {user_id}"
     )
 
+def admin_message_url(message_id: int | None) -> str | None:
+    # Ссылка на сообщение в супергруппе: t.me/c/<id без -100>/<message_id>.
+    chat = str(ADMIN_GROUP_ID)
+    if not message_id or not chat.startswith("-100"):
+        return None
+    return f"https://t.me/c/{chat[4:]}/{message_id}"
+
+def build_duplicate_line(app: dict) -> str:
+    earlier = app.get("duplicate_of")
+    if not earlier:
+        return ""
+    label = (
+        f"{_safe_text(earlier['name'] or '—')}, ID {earlier['user_id']}, "
+        f"{source_label(earlier['source'])}, {submit_time_label({'last_apply_at': earlier['submitted_at']})}"
+    )
+    url = admin_message_url(earlier["admin_message_id"])
+    if url:
+        label = f'<a href="{url}">{label}</a>'
+    return f"👯 <b>Похоже на повторную заявку</b>: {label}\n\n"
+
 def build_admin_summary(
-    data: dict,
+    app: dict,
     user_id: int,
     status: str,
     archived: bool = False,
     is_new: bool = False
 ) -> str:
+    data = app.get("data") or {}
     status_label = STATUS_LABELS.get(status, status)
     header = "🔔 <b>Новая анкета — требуется просмотр</b>\n\n" if is_new else "🧾 <b>Кратко по заявке</b>\n\n"
-    submit_time = submit_time_label_for_user(user_id)
+    submit_time = submit_time_label(app)
     text = (
         f"{header}"
+        f"{build_duplicate_line(app)}"
         f"👤 Имя: {_safe_text(data.get('name', '—'))}\n"
         f"📅 Дата рождения: {_safe_text(data.get('age', '—'))}\n"
         f"🌍 Город и страна: {_safe_text(data.get('city', '—'))}\n"
@@ -1481,7 +2067,7 @@ def build_admin_summary(
         f"🏠 Помещение без посторонних: {_safe_text(data.get('living', '—'))}\n"
         f"💬 Telegram: {_safe_text(data.get('telegram', '—'))}\n"
         f"🆔 ID: {user_id}\n"
-        f"🧭 Источник: {source_label_for_user(user_id)}\n\n"
+        f"🧭 Источник: {source_label(app.get('source'))}\n\n"
         f"🕒 Время подачи: {submit_time}\n\n"
         f"Статус: <b>{status_label}</b>"
     )
@@ -1489,11 +2075,13 @@ def build_admin_summary(
         text += "\n\n🗂 Архив"
     return text
 
-def build_admin_full_text(data: dict, user_id: int, status: str) -> str:
+def build_admin_full_text(app: dict, user_id: int, status: str) -> str:
+    data = app.get("data") or {}
     status_label = STATUS_LABELS.get(status, status)
-    submit_time = submit_time_label_for_user(user_id)
+    submit_time = submit_time_label(app)
     return (
         "📋 <b>Полная анкета</b>\n\n"
+        f"{build_duplicate_line(app)}"
         f"👤 Имя: {_safe_text(data.get('name', '—'))}\n"
         f"📅 Дата рождения: {_safe_text(data.get('age', '—'))}\n"
         f"🌍 Город и страна: {_safe_text(data.get('city', '—'))}\n"
@@ -1507,11 +2095,48 @@ def build_admin_full_text(data: dict, user_id: int, status: str) -> str:
         f"💼 Опыт: {_safe_text(data.get('experience', '—'))}\n"
         f"💬 Telegram: {_safe_text(data.get('telegram', '—'))}\n"
         f"🆔 ID: {user_id}\n"
-        f"🧭 Источник: {source_label_for_user(user_id)}\n\n"
+        f"🧭 Источник: {source_label(app.get('source'))}\n\n"
         f"🕒 Время подачи: {submit_time}\n\n"
         f"Статус: <b>{status_label}</b>"
     )
 
+ADMIN_CARD_SUMMARY = "summary"
+ADMIN_CARD_FULL = "full"
+
+def admin_card(
+    user_id: int,
+    kind: str,
+    archived: bool = False,
+    status: str | None = None,
+    updated_at: str | None = None,
+    default_status: str = "pending",
+) -> dict | None:
+    # Статус и updated_at из строки списка позволяют отдать карточку вообще без запроса к БД.
+    if status and updated_at:
+        card = admin_card_cache.get(user_id, kind, archived, status, updated_at)
+        if card is not None:
+            return card
+    app = get_admin_card_row(user_id)
+    if app is None:
+        return None
+    status = app["status"] or status or default_status
+    if not updated_at:
+        card = admin_card_cache.get(user_id, kind, archived, status, app["updated_at"])
+        if card is not None:
+            return card
+    if kind == ADMIN_CARD_FULL:
+        text = build_admin_full_text(app, user_id, status)
+    else:
+        text = build_admin_summary(app, user_id, status, archived=archived)
+    card = {
+        "status": status,
+        "text": text,
+        "data": app["data"],
+        "contact_url": contact_url_for_user(user_id, app["data"], app["source"] or ""),
+    }
+    admin_card_cache.put(user_id, kind, archived, status, app["updated_at"], card)
+    return card
+
 def admin_keyboard_for_status(user_id: int, status: str, contact_url: str | None = None):
     if status == "accepted":
         return admin_accepted_keyboard(user_id, contact_url=contact_url)
@@ -1519,18 +2144,19 @@ def admin_keyboard_for_status(user_id: int, status: str, contact_url: str | None
         return admin_rejected_keyboard(user_id, contact_url=contact_url)
     return admin_pending_keyboard(user_id, contact_url=contact_url)
 
-async def update_admin_summary_message(user_id: int, status: str) -> bool:
-    message_id = get_admin_message_id(user_id)
+async def update_admin_summary_message(user_id: int, status: str, message_id: int | None = None) -> bool:
+    message_id = message_id or get_admin_message_id(user_id)
     if not message_id:
         return False
-    data = get_form_data(user_id) or {}
-    contact_url = contact_url_for_user(user_id, data)
+    card = admin_card(user_id, ADMIN_CARD_SUMMARY, default_status=status)
+    if card is None:
+        return False
     try:
         await bot.edit_message_text(
             chat_id=ADMIN_GROUP_ID,
             message_id=message_id,
-            text=build_admin_summary(data, user_id, status),
-            reply_markup=admin_keyboard_for_status(user_id, status, contact_url=contact_url)
+            text=card["text"],
+            reply_markup=admin_keyboard_for_status(user_id, card["status"], contact_url=card["contact_url"])
         )
         return True
     except Exception:
@@ -1548,40 +2174,86 @@ def build_admin_stats_text() -> str:
         f"Отклонены: {counts['rejected']}"
     )
 
-async def daily_stats_task():
-    while True:
-        now = datetime.now()
-        target = now.replace(
-            hour=DAILY_STATS_HOUR,
-            minute=DAILY_STATS_MINUTE,
-            second=0,
-            microsecond=0
+def format_job_stats_line(name: str, job: dict) -> str:
+    next_run = job["next_run"].strftime("%d.%m %H:%M") if job["next_run"] else "—"
+    state = "выполняется" if job["running"] else f"следующий {next_run}"
+    return (
+        f"{name}: запусков {job['runs']}, ошибок {job['failures']}, "
+        f"время {job['last_duration']:.1f} с (макс. {job['max_duration']:.1f} с), {state}\n"
+    )
+
+def build_admin_metrics_text() -> str:
+    memory = get_translation_memory_stats()
+    limiter = outbound_scheduler.stats()
+    reachability = reachability_stats()
+    updates = update_ordering.stats()
+    flood = flood_control.stats()
+    coalesced = admin_coalescer.stats()
+    jobs = job_scheduler.stats()
+    leader = leader_election.stats()
+    deletions = deletion_scheduler.stats()
+    cards = admin_card_cache.stats()
+    review = review_queue.stats()
+    lookups = memory["hits"] + memory["misses"]
+    hit_ratio = (memory["hits"] * 100 / lookups) if lookups else 0.0
+    return (
+        "🛠 <b>Технические метрики</b>\n\n"
+        "<b>Память переводов</b>\n"
+        f"Сегментов в памяти: {memory['segments']}\n"
+        f"Из кэша: {memory['hits']} из {lookups} ({hit_ratio:.1f}%)\n"
+        f"Отправлено в модель: {memory['misses']}\n\n"
+        "<b>Исходящие запросы Telegram</b>\n"
+        f"В очереди: {limiter['queued']} (максимум {limiter['queued_max']})\n"
+        f"Запросов: {limiter['requests']}, ждали: {limiter['delayed']}\n"
+        f"Ожидание: среднее {limiter['wait_avg']:.2f} с, максимум {limiter['wait_max']:.2f} с\n"
+        f"RetryAfter от Telegram: {limiter['retry_after']}\n\n"
+        "<b>Обработка апдейтов</b>\n"
+        f"В работе: {updates['active']} из {updates['limit']}, ждут: {updates['waiting']} (максимум {updates['waiting_max']})\n"
+        f"Обработано: {updates['handled']}, ждали: {updates['delayed']}\n"
+        f"Ожидание: среднее {updates['wait_avg']:.2f} с, максимум {updates['wait_max']:.2f} с\n"
+        f"Отброшено флуда: кнопки {flood['rejected']['callback']}, "
+        f"сообщения {flood['rejected']['message']}, медиа {flood['rejected']['media']} "
+        f"(пользователей в памяти: {flood['users']}, предупреждений: {flood['notices']})\n\n"
+        "<b>Админ-группа</b>\n"
+        f"Событий: {coalesced['marked']}, обновлений: {coalesced['rendered']}, ждут: {coalesced['pending']}\n"
+        f"Карточки заявок: в кэше {cards['size']}, из кэша {cards['hits']}, отрисовано {cards['misses']}\n"
+        f"Разбор по очереди: готово {review['prefetched']}, сразу {review['hot']}, с ожиданием {review['cold']}, устаревших {review['stale']}\n\n"
+        "<b>Лидерство</b>\n"
+        f"Реплика: <code>{html.escape(leader['owner'])}</code>, "
+        + (f"лидер {leader['leader_for'] / 60:.0f} мин" if leader["is_leader"] else "резерв")
+        + f"\nИзбраний: {leader['elections']}, потерь: {leader['demotions']}, ошибок БД: {leader['errors']}\n\n"
+        "<b>Отложенные удаления</b>\n"
+        f"Ждут: {deletions['pending']}, удалено: {deletions['deleted']}, не удалось: {deletions['failed']}\n\n"
+        f"<b>Фоновые задачи</b> (одновременно до {jobs['limit']})\n"
+        + "".join(format_job_stats_line(name, job) for name, job in jobs["jobs"].items())
+        + "\n"
+        "<b>Недоступные пользователи</b>\n"
+        f"Заблокировали бота или удалены: {reachability['unreachable']}\n"
+        f"Пропущено вызовов: {reachability['skipped']}"
+    )
+
+async def send_daily_stats():
+    set_outbound_priority(PRIORITY_BACKGROUND)
+    await bot.send_message(ADMIN_GROUP_ID, build_admin_stats_text())
+    file_path = Path("applications.xlsx")
+    if file_path.exists():
+        await bot.send_document(
+            ADMIN_GROUP_ID,
+            FSInputFile(str(file_path))
         )
-        if target <= now:
-            target += timedelta(days=1)
-        await asyncio.sleep((target - now).total_seconds())
-        try:
-            await bot.send_message(ADMIN_GROUP_ID, build_admin_stats_text())
-            file_path = Path("applications.xlsx")
-            if file_path.exists():
-                await bot.send_document(
-                    ADMIN_GROUP_ID,
-                    FSInputFile(str(file_path))
-                )
-        except Exception:
-            logger.exception("Ошибка отправки ежедневной статистики")
 
 async def archive_admin_messages_once() -> int:
     archived = 0
     rows = get_admin_messages_for_archive(ADMIN_ARCHIVE_DAYS)
     for user_id, message_id in rows:
-        data = get_form_data(user_id) or {}
-        status = get_status(user_id) or "accepted"
+        card = admin_card(user_id, ADMIN_CARD_SUMMARY, archived=True, default_status="accepted")
+        if card is None:
+            continue
         try:
             await bot.edit_message_text(
                 chat_id=ADMIN_GROUP_ID,
                 message_id=message_id,
-                text=build_admin_summary(data, user_id, status, archived=True),
+                text=card["text"],
                 reply_markup=None
             )
             set_admin_message_id(user_id, None)
@@ -1599,13 +2271,44 @@ async def archive_admin_messages_once() -> int:
                 logger.exception("Ошибка архивации админского сообщения")
     return archived
 
-async def archive_admin_messages_task():
-    while True:
-        try:
-            await archive_admin_messages_once()
-        except Exception:
-            logger.exception("Ошибка задачи архивации")
-        await asyncio.sleep(ADMIN_ARCHIVE_CHECK_HOURS * 3600)
+async def archive_admin_messages_job():
+    set_outbound_priority(PRIORITY_BACKGROUND)
+    archived = await archive_admin_messages_once()
+    if archived:
+        logger.info("Архивировано админских сообщений: %s", archived)
+
+
+async def adopt_deletions_job():
+    # Удаления, которые запланировала и не выполнила пропавшая реплика.
+    adopted = deletion_scheduler.adopt()
+    if adopted:
+        logger.info("Подхвачены отложенные удаления пропавших реплик: %s", adopted)
+
+
+async def resume_broadcasts_job():
+    # Рассылки, созданные на другой реплике, подхватывает лидер.
+    broadcast_runner.resume()
+
+
+async def resume_bulk_decisions_job():
+    # Массовые решения, созданные на другой реплике или прерванные перезапуском.
+    bulk_runner.resume()
+
+
+# Расписания в часовом поясе отображения (APP_TIMEZONE), пропущенные за простой запуски догоняются при старте.
+# Архив карточек и чистка старых анкет, как и до расписания, выполняются ещё и сразу при старте лидера.
+job_scheduler = JobScheduler(JOB_CONCURRENCY)
+job_scheduler.add("daily_stats", f"{DAILY_STATS_MINUTE} {DAILY_STATS_HOUR} * * *", send_daily_stats)
+job_scheduler.add(
+    "archive_admin_messages",
+    f"0 */{ADMIN_ARCHIVE_CHECK_HOURS} * * *",
+    archive_admin_messages_job,
+    run_on_start=True,
+)
+job_scheduler.add("cleanup_old_form_data", "30 4 * * *", cleanup_old_form_data, run_on_start=True)
+job_scheduler.add("resume_broadcasts", "* * * * *", resume_broadcasts_job, catch_up=False)
+job_scheduler.add("resume_bulk_decisions", "* * * * *", resume_bulk_decisions_job, catch_up=False)
+job_scheduler.add("adopt_deletions", "* * * * *", adopt_deletions_job, catch_up=False)
 
 async def ensure_admin_menu_posted():
     try:
@@ -1798,14 +2501,15 @@ async def update_admin_photos(user_id: int):
     except Exception:
         logger.exception("Ошибка отправки фото админу")
 
-async def notify_admin_new_application():
+async def notify_admin_new_application(new_count: int = 1):
     try:
         counts = get_status_counts()
     except Exception:
         logger.exception("Не удалось получить статистику для уведомления")
         counts = {"pending": 0}
+    title = f"Новые анкеты: +{new_count}" if new_count > 1 else "Новая анкета"
     text = (
-        "🔔 <b>Новая анкета</b>\n\n"
+        f"🔔 <b>{title}</b>\n\n"
         f"Ожидают подтверждения: <b>{counts.get('pending', 0)}</b>\n"
         "Открой админ-меню, чтобы просмотреть ✨"
     )
@@ -1821,6 +2525,11 @@ async def notify_admin_new_application():
     except Exception:
         logger.exception("Ошибка уведомления о заявке")
 
+def schedule_new_application_admin_updates():
+    # Пачка заявок даёт одно уведомление «+N» и одно обновление меню за окно ADMIN_COALESCE_SECONDS.
+    admin_coalescer.mark_dirty("notify", notify_admin_new_application)
+    admin_coalescer.mark_dirty("menu", lambda _count: ensure_admin_menu_posted())
+
 async def set_admin_menu_message_id(message_id: int):
     stored_id = get_setting(ADMIN_MENU_SETTING_KEY)
     if stored_id and stored_id.isdigit() and int(stored_id) != message_id:
@@ -1877,19 +2586,32 @@ async def send_admin_list(
         pages = (total + ADMIN_LIST_LIMIT - 1) // ADMIN_LIST_LIMIT
         current = slice_items[0]
         user_id = current["user_id"]
-        item_status = current["status"] or status or "pending"
-        data = get_form_data(user_id) or {}
-        contact_url = contact_url_for_user(user_id, data)
+        card = admin_card(
+            user_id,
+            ADMIN_CARD_FULL,
+            status=current["status"],
+            updated_at=current["updated_at"],
+            default_status=status or "pending",
+        )
+        if card is None:
+            # Заявку удалили между выборкой списка и отрисовкой.
+            await update_admin_menu_message(
+                f"🤍 {label}: пока пусто ✨",
+                admin_menu_keyboard(get_status_counts())
+            )
+            return
+        item_status = card["status"]
+        data = card["data"]
         text = (
             f"🗂 <b>{label}</b>\n\n"
             f"Заявка <b>{offset + 1}</b> из <b>{total}</b>\n"
             f"Страница: <b>{page}/{pages}</b>\n\n"
-            f"{build_admin_full_text(data, user_id, item_status)}"
+            f"{card['text']}"
         )
         photo_id = data.get("photo_face") or data.get("photo_full")
         await update_admin_view_message(
             text,
-            admin_list_view_keyboard(user_id, item_status, filter_key, offset, total, ADMIN_LIST_LIMIT, contact_url=contact_url),
+            admin_list_view_keyboard(user_id, item_status, filter_key, offset, total, ADMIN_LIST_LIMIT, contact_url=card["contact_url"]),
             photo_id
         )
     except Exception:
@@ -1900,6 +2622,351 @@ async def send_admin_list(
         )
 
 
+def build_admin_compact_row(number: int, item: dict) -> str:
+    data = item["data"]
+    status_icon = STATUS_LABELS.get(item["status"], "•").split(" ", 1)[0]
+    fields = [
+        _safe_text(data.get("name", "—")),
+        _safe_text(data.get("age", "—")),
+        _safe_text(submission_country(data)),
+        _safe_text(data.get("telegram", "—")),
+    ]
+    return f"<b>{number}.</b> {status_icon} " + " · ".join(fields)
+
+async def show_admin_find_page(offset: int = 0):
+    query = get_setting(ADMIN_FIND_SETTING_KEY) or ""
+    limit = ADMIN_COMPACT_PAGE_SIZE
+    offset = max(offset, 0) // limit * limit
+    items, total = search_applications(query, limit, offset)
+    if not items and total and offset:
+        offset = (total - 1) // limit * limit
+        items, total = search_applications(query, limit, offset)
+    safe_query = _safe_text(query)
+    if not items:
+        await update_admin_menu_message(
+            f"🔎 По запросу «{safe_query}» ничего не нашлось",
+            admin_find_page_keyboard(0, 0, limit, ())
+        )
+        return
+    page = offset // limit + 1
+    pages = (total + limit - 1) // limit
+    lines = [build_admin_compact_row(number, item) for number, item in enumerate(items, start=offset + 1)]
+    text = (
+        f"🔎 <b>Поиск:</b> {safe_query}\n"
+        f"{offset + 1}–{offset + len(items)} из <b>{total}</b>, страница {page}/{pages}\n\n"
+        + "\n".join(lines)
+        + "\n\n✅/❌ — решение, 👁 — карточка с фото"
+    )
+    keyboard_items = tuple(
+        (number, item["user_id"], item["status"] or "new")
+        for number, item in enumerate(items, start=offset + 1)
+    )
+    await update_admin_menu_message(text, admin_find_page_keyboard(offset, total, limit, keyboard_items))
+
+async def show_admin_compact_page(filter_key: str, offset: int = 0):
+    # Одна текстовая правка админ-меню на страницу вместо edit_message_media на каждую заявку.
+    if filter_key == ADMIN_FIND_FILTER_KEY:
+        await show_admin_find_page(offset)
+        return
+    status = None if filter_key == "all" else filter_key
+    label = _admin_list_label(filter_key)
+    limit = ADMIN_COMPACT_PAGE_SIZE
+    offset = max(offset, 0) // limit * limit
+    items, total = list_applications_page(status, limit, offset)
+    if not items and total and offset:
+        # Страница опустела после решений — показываем последнюю непустую.
+        offset = (total - 1) // limit * limit
+        items, total = list_applications_page(status, limit, offset)
+    if not items:
+        await update_admin_menu_message(
+            f"🤍 {label}: пока пусто ✨",
+            admin_compact_page_keyboard(filter_key, 0, 0, limit, ())
+        )
+        return
+    page = offset // limit + 1
+    pages = (total + limit - 1) // limit
+    lines = [build_admin_compact_row(number, item) for number, item in enumerate(items, start=offset + 1)]
+    text = (
+        f"🗒 <b>{label}</b>\n"
+        f"{offset + 1}–{offset + len(items)} из <b>{total}</b>, страница {page}/{pages}\n\n"
+        + "\n".join(lines)
+        + "\n\n✅/❌ — решение, 👁 — карточка с фото"
+    )
+    keyboard_items = tuple(
+        (number, item["user_id"], item["status"] or "pending")
+        for number, item in enumerate(items, start=offset + 1)
+    )
+    await update_admin_menu_message(
+        text,
+        admin_compact_page_keyboard(filter_key, offset, total, limit, keyboard_items)
+    )
+
+async def return_admin_after_decision(mode: str | None, filter_key: str | None, offset: int | None):
+    if mode == "review":
+        await show_next_review_card()
+        # Счётчики в меню догонят отдельной правкой, не задерживая следующую карточку.
+        admin_coalescer.mark_dirty("menu", refresh_admin_menu_in_background)
+        return
+    if mode == "compact" and filter_key:
+        await clear_admin_view_message()
+        await show_admin_compact_page(filter_key, offset or 0)
+        return
+    await post_admin_menu()
+
+async def refresh_admin_menu_in_background(_count: int) -> None:
+    with outbound_priority(PRIORITY_BACKGROUND):
+        await ensure_admin_menu_posted()
+
+async def notify_candidate_decision(uid: int, caption: str, lang: str) -> None:
+    try:
+        if not is_site_source(uid):
+            await send_or_edit_user_menu(uid, caption, lang=lang)
+            await clear_user_flow_message(uid)
+    except Exception:
+        logger.exception("Ошибка отправки меню кандидату %s после решения", uid)
+
+def record_admin_decision(uid: int, status: str) -> None:
+    set_status(uid, status)
+    admin_card_cache.invalidate(uid)
+    review_queue.decided(uid)
+    if update_application_status:
+        try:
+            update_application_status(uid, status)
+        except Exception:
+            logger.exception("Ошибка обновления статуса в Excel")
+
+DECISION_FOLLOWUP_TASKS: set[asyncio.Task] = set()
+
+async def _decision_followup(uid: int, status: str, caption: str, lang: str) -> None:
+    # Фоновый приоритет: правка карточки в группе встаёт в очередь после следующей карточки разбора.
+    set_outbound_priority(PRIORITY_BACKGROUND)
+    await notify_candidate_decision(uid, caption, lang)
+    await update_admin_summary_message(uid, status)
+
+async def complete_admin_decision(uid: int, status: str, caption: str, lang: str, return_to: tuple) -> None:
+    if return_to[0] in {"review", "compact"}:
+        record_admin_decision(uid, status)
+        try:
+            await return_admin_after_decision(*return_to)
+        except Exception:
+            logger.exception("Ошибка показа следующей заявки")
+        # Следующая карточка или страница уже на экране; личный чат кандидата ограничен сообщением
+        # в секунду, поэтому уведомление и правку его карточки в группе доделываем в фоне.
+        task = asyncio.create_task(_decision_followup(uid, status, caption, lang), name=f"decision_followup_{uid}")
+        DECISION_FOLLOWUP_TASKS.add(task)
+        task.add_done_callback(DECISION_FOLLOWUP_TASKS.discard)
+        return
+    await notify_candidate_decision(uid, caption, lang)
+    record_admin_decision(uid, status)
+    await update_admin_summary_message(uid, status)
+    try:
+        await return_admin_after_decision(*return_to)
+    except Exception:
+        logger.exception("Ошибка возврата в админ-меню")
+
+def load_review_window(limit: int, exclude: set[int]) -> tuple[list[dict], int]:
+    items, total = list_applications_page("pending", limit + len(exclude), 0)
+    window = []
+    for item in items:
+        if item["user_id"] in exclude:
+            continue
+        card = admin_card(item["user_id"], ADMIN_CARD_FULL, status=item["status"], updated_at=item["updated_at"])
+        if card is None:
+            continue
+        data = card["data"]
+        window.append({
+            "user_id": item["user_id"],
+            "card": card,
+            "photo_id": data.get("photo_face") or data.get("photo_full"),
+        })
+        if len(window) >= limit:
+            break
+    return window, total
+
+review_queue = ReviewQueue(load_review_window, get_status, REVIEW_PREFETCH_SIZE)
+
+async def show_next_review_card():
+    item = await review_queue.next()
+    if item is None:
+        await clear_admin_view_message()
+        await update_admin_menu_message(
+            "🤍 Все заявки на рассмотрении разобраны ✨",
+            admin_menu_keyboard(get_status_counts())
+        )
+        return
+    card = item["card"]
+    text = (
+        f"▶️ <b>Разбор заявок</b> · в очереди {review_queue.total}\n\n"
+        f"{card['text']}"
+    )
+    await update_admin_view_message(
+        text,
+        admin_review_keyboard(item["user_id"], contact_url=card["contact_url"]),
+        item["photo_id"]
+    )
+
+async def show_admin_bulk_page(selected: set[int], offset: int = 0) -> int:
+    limit = ADMIN_COMPACT_PAGE_SIZE
+    offset = max(offset, 0) // limit * limit
+    items, total = list_applications_page("pending", limit, offset)
+    if not items and total and offset:
+        offset = (total - 1) // limit * limit
+        items, total = list_applications_page("pending", limit, offset)
+    lines = [
+        ("☑ " if item["user_id"] in selected else "☐ ") + build_admin_compact_row(number, item)
+        for number, item in enumerate(items, start=offset + 1)
+    ]
+    text = (
+        "☑️ <b>Массовое решение</b> · ожидают подтверждения\n"
+        f"Выбрано: <b>{len(selected)}</b> из {total}\n\n"
+        + ("\n".join(lines) if lines else "🤍 Заявок на рассмотрении нет ✨")
+    )
+    keyboard_items = tuple(
+        (number, item["user_id"], item["user_id"] in selected)
+        for number, item in enumerate(items, start=offset + 1)
+    )
+    await update_admin_menu_message(
+        text,
+        admin_bulk_page_keyboard(offset, total, limit, keyboard_items, len(selected))
+    )
+    return offset
+
+def _bulk_action_title(status: str, count: int) -> str:
+    verb = "Принять" if status == "accepted" else "Отклонить"
+    return f"{verb} заявок: <b>{count}</b>"
+
+async def apply_bulk_decision(state: FSMContext, data: dict):
+    status = data.get("bulk_action")
+    selected = [int(user_id) for user_id in data.get("bulk_selected") or []]
+    if status not in {"accepted", "rejected"} or not selected:
+        await show_admin_bulk_page(set(selected), int(data.get("bulk_offset") or 0))
+        return
+    job_id, changed = create_bulk_job(selected, status, data.get("bulk_reason"))
+    await state.clear()
+    for user_id in changed:
+        admin_card_cache.invalidate(user_id)
+        review_queue.decided(user_id)
+    if not changed:
+        await update_admin_menu_message(
+            "🤍 Выбранные заявки уже разобраны ✨",
+            admin_menu_keyboard(get_status_counts())
+        )
+        return
+    try:
+        progress = await bot.send_message(ADMIN_GROUP_ID, f"⏳ {_bulk_action_title(status, len(changed))}…")
+        set_bulk_progress_message(job_id, progress.message_id)
+    except Exception:
+        logger.exception("Не удалось отправить прогресс массового решения")
+    # Как и рассылки, массовые решения выполняет лидер; на остальных репликах он подхватит задачу в течение минуты.
+    if leader_election.is_leader:
+        bulk_runner.start(job_id)
+    await show_admin_compact_page("pending", 0)
+
+async def notify_bulk_decision(user_id: int, job: dict) -> bool:
+    if is_site_source(user_id):
+        return True
+    if job["status"] == "accepted":
+        user_lang = lang_for(user_id)
+        caption = build_menu_caption_with_status(
+            "accepted",
+            t(user_lang, "accept_caption"),
+            lang=user_lang,
+            tail=t(user_lang, "approved_tail")
+        )
+    else:
+        user_lang = submission_lang_for_user(user_id)
+        reason = auto_reject_reason(job["reason_code"] or "", user_lang) or ""
+        caption = build_menu_caption_with_status(
+            "rejected",
+            t(user_lang, "menu_caption"),
+            lang=user_lang,
+            intro=t(user_lang, "rejected_reason_intro", reason=reason)
+        )
+    sent = await send_or_edit_user_menu(user_id, caption, lang=user_lang)
+    await clear_user_flow_message(user_id)
+    return sent
+
+async def finish_bulk_decision(job: dict):
+    if update_application_statuses:
+        try:
+            update_application_statuses({user_id: job["status"] for user_id in job["user_ids"]})
+        except Exception:
+            logger.exception("Ошибка обновления статусов в Excel")
+    # Правим только карточки, которые есть в группе. Приоритет фоновый: правки встают в очередь
+    # лимита админ-группы после действий админа и не забирают у них последний токен.
+    set_outbound_priority(PRIORITY_BACKGROUND)
+    message_ids = get_admin_message_ids(job["user_ids"])
+    job["cards_total"] = len(message_ids)
+    job["cards_done"] = 0
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    last_report = time.monotonic()
+
+    async def edit_card(user_id: int, message_id: int):
+        nonlocal last_report
+        async with semaphore:
+            try:
+                await update_admin_summary_message(user_id, job["status"], message_id=message_id)
+            except Exception:
+                logger.exception("Не удалось обновить карточку %s после массового решения", user_id)
+        job["cards_done"] += 1
+        now = time.monotonic()
+        if now - last_report >= BROADCAST_PROGRESS_SECONDS:
+            last_report = now
+            job["elapsed"] = now - job["started_at"]
+            try:
+                await report_bulk_progress(job)
+            except Exception:
+                logger.exception("Ошибка обновления прогресса массового решения #%s", job["id"])
+
+    await asyncio.gather(*(edit_card(user_id, message_id) for user_id, message_id in message_ids.items()))
+    admin_coalescer.mark_dirty("menu", lambda _count: ensure_admin_menu_posted())
+
+def format_bulk_progress(job: dict) -> str:
+    done = job["notified"] + job["unreachable"] + job["failed"]
+    action = "Принятие" if job["status"] == "accepted" else "Отклонение"
+    title = f"{'✅' if job['finished'] else '⏳'} {action} заявок: <b>{job['total']}</b>"
+    if job["finished"]:
+        title += " — готово"
+    lines = [
+        title,
+        f"Уведомлено: {job['notified']} из {job['total']}",
+        f"Недоступны: {job['unreachable']}",
+        f"Ошибки: {job['failed']}",
+    ]
+    if job["notifications_done"] and not job["finished"]:
+        if "cards_total" in job:
+            lines.append(f"Обновляю карточки в админ-группе: {job['cards_done']} из {job['cards_total']}…")
+        else:
+            lines.append("Обновляю карточки в админ-группе…")
+    elif not job["finished"] and done and job["elapsed"] > 0:
+        rate = done / job["elapsed"]
+        lines.append(f"Осталось: ~{_format_eta((job['total'] - done) / rate)}")
+    else:
+        lines.append(f"Время: {_format_eta(job['elapsed'])}")
+    return "\n".join(lines)
+
+async def report_bulk_progress(job: dict) -> None:
+    if not job.get("progress_message_id"):
+        return
+    try:
+        await bot.edit_message_text(
+            format_bulk_progress(job),
+            chat_id=ADMIN_GROUP_ID,
+            message_id=job["progress_message_id"],
+        )
+    except TelegramBadRequest as exc:
+        if not _is_not_modified_error(exc):
+            raise
+
+bulk_runner = BulkDecisionRunner(
+    notify_bulk_decision,
+    finish_bulk_decision,
+    rate_per_second=BROADCAST_RATE_PER_SECOND,
+    concurrency=BROADCAST_CONCURRENCY,
+    progress_interval=BROADCAST_PROGRESS_SECONDS,
+    on_progress=report_bulk_progress,
+)
+
 def _post_message_ids(item: dict | None) -> dict[str, int]:
     payload = (item or {}).get("message_ids", {})
     if not isinstance(payload, dict):
@@ -1993,27 +3060,37 @@ async def show_admin_posted_posts(offset: int = 0) -> tuple[dict | None, int, in
     return item, offset, total
 
 
-async def delete_post_from_channels(item: dict) -> None:
-    message_ids = _post_message_ids(item)
-    for lang, message_id in message_ids.items():
+async def delete_post_from_channels(item: dict) -> tuple[dict, dict[str, Exception]]:
+    calls: dict[str, Callable] = {}
+    for lang, message_id in _post_message_ids(item).items():
         chat_id = CHANNEL_ID_BY_LANG.get(lang)
         if not isinstance(chat_id, int):
             continue
-        try:
-            await bot.delete_message(chat_id, message_id)
-        except Exception:
-            logger.exception("Не удалось удалить пост из канала %s (message_id=%s)", lang, message_id)
+        calls[lang] = functools.partial(bot.delete_message, chat_id, message_id)
+    results, errors = await fan_out(calls, CHANNEL_FANOUT_CONCURRENCY)
+    for lang, exc in errors.items():
+        logger.error("Не удалось удалить пост из канала %s: %s", lang, exc)
+    return results, errors
 
 
 def _is_not_modified_error(exc: Exception) -> bool:
     return "message is not modified" in str(exc).lower()
 
 
+async def _edit_ignoring_not_modified(method: Callable, kwargs: dict):
+    try:
+        return await method(**kwargs)
+    except TelegramBadRequest as exc:
+        if not _is_not_modified_error(exc):
+            raise
+        return None
+
+
 async def edit_post_text_in_channels(
     item: dict,
     texts_map: dict[str, str],
     entities_map: dict[str, list[MessageEntity] | None],
-) -> tuple[dict[str, str], dict[str, list[MessageEntity] | None]]:
+) -> tuple[dict[str, str], dict[str, list[MessageEntity] | None], dict[str, Exception]]:
     message_ids = _post_message_ids(item)
     content_type = str(item.get("content_type") or "text").strip().lower()
     current_texts = _post_texts(item)
@@ -2022,6 +3099,8 @@ async def edit_post_text_in_channels(
     final_texts = dict(current_texts)
     final_entities: dict[str, list[MessageEntity] | None] = dict(current_entities)
 
+    prepared: dict[str, tuple[str, list[MessageEntity] | None]] = {}
+    calls: dict[str, Callable] = {}
     for lang, message_id in message_ids.items():
         chat_id = CHANNEL_ID_BY_LANG.get(lang)
         if not isinstance(chat_id, int):
@@ -2041,11 +3120,7 @@ async def edit_post_text_in_channels(
             }
             if entities:
                 kwargs["entities"] = entities
-            try:
-                await bot.edit_message_text(**kwargs)
-            except TelegramBadRequest as exc:
-                if not _is_not_modified_error(exc):
-                    raise
+            calls[lang] = functools.partial(_edit_ignoring_not_modified, bot.edit_message_text, kwargs)
         else:
             if text:
                 text, entities = fit_caption_with_entities(text, entities)
@@ -2059,23 +3134,20 @@ async def edit_post_text_in_channels(
             }
             if entities:
                 kwargs["caption_entities"] = entities
-            try:
-                await bot.edit_message_caption(**kwargs)
-            except TelegramBadRequest as exc:
-                if not _is_not_modified_error(exc):
-                    raise
-
-        final_texts[lang] = text
-        final_entities[lang] = entities
+            calls[lang] = functools.partial(_edit_ignoring_not_modified, bot.edit_message_caption, kwargs)
+        prepared[lang] = (text, entities)
 
-    return final_texts, final_entities
+    results, errors = await fan_out(calls, CHANNEL_FANOUT_CONCURRENCY)
+    for lang in results:
+        final_texts[lang], final_entities[lang] = prepared[lang]
+    return final_texts, final_entities, errors
 
 
 async def replace_post_media_in_channels(
     item: dict,
     new_file_id: str,
     expected_content_type: str,
-) -> tuple[dict[str, str], dict[str, list[MessageEntity] | None]]:
+) -> tuple[dict[str, str], dict[str, list[MessageEntity] | None], dict[str, Exception]]:
     content_type = str(item.get("content_type") or "").strip().lower()
     normalized_expected = (expected_content_type or "").strip().lower()
     if content_type not in MEDIA_CONTENT_TYPES:
@@ -2100,6 +3172,8 @@ async def replace_post_media_in_channels(
     final_texts = dict(texts)
     final_entities: dict[str, list[MessageEntity] | None] = dict(entities_map)
 
+    prepared: dict[str, tuple[str, list[MessageEntity] | None]] = {}
+    calls: dict[str, Callable] = {}
     for lang, message_id in message_ids.items():
         chat_id = CHANNEL_ID_BY_LANG.get(lang)
         if not isinstance(chat_id, int):
@@ -2115,21 +3189,18 @@ async def replace_post_media_in_channels(
         if caption:
             media_kwargs["caption"] = caption
             if entities:
-                media_kwargs["caption_entities"] = entities
-        media = media_class(**media_kwargs)
-        try:
-            await bot.edit_message_media(
-                chat_id=chat_id,
-                message_id=message_id,
-                media=media,
-            )
-        except TelegramBadRequest as exc:
-            if not _is_not_modified_error(exc):
-                raise
-        final_texts[lang] = caption
-        final_entities[lang] = entities
+                media_kwargs["caption_entities"] = entities
+        calls[lang] = functools.partial(
+            _edit_ignoring_not_modified,
+            bot.edit_message_media,
+            {"chat_id": chat_id, "message_id": message_id, "media": media_class(**media_kwargs)},
+        )
+        prepared[lang] = (caption, entities)
 
-    return final_texts, final_entities
+    results, errors = await fan_out(calls, CHANNEL_FANOUT_CONCURRENCY)
+    for lang in results:
+        final_texts[lang], final_entities[lang] = prepared[lang]
+    return final_texts, final_entities, errors
 
 async def send_menu(
     message: Message,
@@ -2170,20 +3241,25 @@ async def send_or_edit_user_menu(
     caption: str,
     lang: str | None = None,
 ) -> bool:
+    if not is_user_reachable(user_id):
+        return False
     locale = normalize_lang(lang or lang_for(user_id))
-    message_id = get_menu_message_id(user_id)
+    markup = main_menu(locale)
+    digest = content_hash(caption, markup)
+    menu = get_user_message_state(user_id)["menu"]
+    message_id = menu["id"]
+    kind = menu["kind"] or MESSAGE_KIND_CAPTION
     if message_id:
+        # Меню не изменилось, а кнопку нажали прямо на нём — запрос в Telegram не нужен.
+        if menu["hash"] == digest and is_message_visible(user_id, message_id):
+            return True
         try:
-            await bot.edit_message_caption(
-                chat_id=user_id,
-                message_id=message_id,
-                caption=caption,
-                reply_markup=main_menu(locale)
-            )
+            await edit_message_by_kind(bot, user_id, message_id, kind, caption, markup)
             return True
         except TelegramBadRequest as e:
             text = str(e).lower()
             if "message is not modified" in text:
+                set_menu_message_id(user_id, message_id, kind, digest)
                 return True
             # fall through to send new menu on other edit errors
         except TelegramForbiddenError:
@@ -2197,13 +3273,16 @@ async def send_or_edit_user_menu(
         except Exception:
             pass
     try:
-        msg = await bot.send_photo(
-            user_id,
-            FSInputFile("media/menu.jpg"),
-            caption=caption,
-            reply_markup=main_menu(locale)
+        msg = await send_cached_media(
+            MENU_PHOTO_PATH,
+            lambda photo: bot.send_photo(
+                user_id,
+                photo,
+                caption=caption,
+                reply_markup=markup
+            ),
         )
-        set_menu_message_id(user_id, msg.message_id)
+        set_menu_message_id(user_id, msg.message_id, MESSAGE_KIND_CAPTION, digest)
         return True
     except TelegramForbiddenError:
         logger.warning("Нет прав на отправку меню пользователю")
@@ -2217,19 +3296,23 @@ async def send_or_edit_user_text(
     text: str,
     reply_markup=None
 ) -> bool:
-    message_id = get_flow_message_id(user_id)
+    if not is_user_reachable(user_id):
+        return False
+    digest = content_hash(text, reply_markup)
+    messages = get_user_message_state(user_id)
+    flow = messages["flow"]
+    message_id = flow["id"]
     if message_id:
+        kind = flow["kind"] or MESSAGE_KIND_TEXT
+        if flow["hash"] == digest and is_message_visible(user_id, message_id):
+            return True
         try:
-            await bot.edit_message_text(
-                chat_id=user_id,
-                message_id=message_id,
-                text=text,
-                reply_markup=reply_markup
-            )
+            await edit_message_by_kind(bot, user_id, message_id, kind, text, reply_markup)
             return True
         except TelegramBadRequest as e:
             err = str(e).lower()
             if "message is not modified" in err:
+                set_flow_message_id(user_id, message_id, kind, digest)
                 return True
             # Message can be deleted/not editable. Fall back to sending a new one.
             logger.warning("edit_message_text failed for user %s: %s", user_id, e)
@@ -2239,19 +3322,19 @@ async def send_or_edit_user_text(
         except Exception:
             logger.exception("Не удалось обновить сообщение пользователя, пробую отправить новое")
     else:
-        menu_id = get_menu_message_id(user_id)
-        if menu_id and len(text) <= CAPTION_LIMIT:
+        menu = messages["menu"]
+        menu_id = menu["id"]
+        menu_kind = menu["kind"] or MESSAGE_KIND_CAPTION
+        if menu_id and (menu_kind != MESSAGE_KIND_CAPTION or len(text) <= CAPTION_LIMIT):
+            if menu["hash"] == digest and is_message_visible(user_id, menu_id):
+                return True
             try:
-                await bot.edit_message_caption(
-                    chat_id=user_id,
-                    message_id=menu_id,
-                    caption=text,
-                    reply_markup=reply_markup
-                )
+                await edit_message_by_kind(bot, user_id, menu_id, menu_kind, text, reply_markup)
                 return True
             except TelegramBadRequest as e:
                 err = str(e).lower()
                 if "message is not modified" in err:
+                    set_menu_message_id(user_id, menu_id, menu_kind, digest)
                     return True
                 # Menu caption can be missing/not editable. Fall back to sending a new message.
                 logger.warning("edit_message_caption failed for user %s: %s", user_id, e)
@@ -2271,7 +3354,7 @@ async def send_or_edit_user_text(
             text,
             reply_markup=reply_markup
         )
-        set_flow_message_id(user_id, msg.message_id)
+        set_flow_message_id(user_id, msg.message_id, MESSAGE_KIND_TEXT, digest)
         return True
     except TelegramForbiddenError:
         logger.warning("Нет прав на отправку сообщения пользователю")
@@ -2282,7 +3365,7 @@ async def send_or_edit_user_text(
 
 async def clear_user_flow_message(user_id: int):
     message_id = get_flow_message_id(user_id)
-    if not message_id:
+    if not message_id or not is_user_reachable(user_id):
         return
     try:
         await bot.delete_message(user_id, message_id)
@@ -2291,38 +3374,10 @@ async def clear_user_flow_message(user_id: int):
     set_flow_message_id(user_id, None)
 
 async def clear_portfolio_media(user_id: int):
-    cleanup_task = PORTFOLIO_CLEANUP_TASKS.pop(user_id, None)
-    if cleanup_task and not cleanup_task.done():
-        cleanup_task.cancel()
-    ids = PORTFOLIO_MEDIA_IDS.pop(user_id, [])
-    for message_id in ids:
-        try:
-            await bot.delete_message(user_id, message_id)
-        except Exception:
-            pass
-
-async def _delayed_portfolio_cleanup(user_id: int, delay_seconds: int):
-    try:
-        await asyncio.sleep(delay_seconds)
-        await clear_portfolio_media(user_id)
-    except asyncio.CancelledError:
-        pass
-    except Exception:
-        logger.exception("Ошибка автоочистки портфолио-медиа")
-
-def schedule_portfolio_cleanup(user_id: int):
-    old = PORTFOLIO_CLEANUP_TASKS.pop(user_id, None)
-    if old and not old.done():
-        old.cancel()
-    PORTFOLIO_CLEANUP_TASKS[user_id] = asyncio.create_task(
-        _delayed_portfolio_cleanup(user_id, PORTFOLIO_AUTO_DELETE_SECONDS)
-    )
+    await deletion_scheduler.delete_now(user_id, tag="portfolio")
 
 def track_portfolio_media(user_id: int, message_ids: list[int]):
-    if not message_ids:
-        return
-    PORTFOLIO_MEDIA_IDS.setdefault(user_id, []).extend(message_ids)
-    schedule_portfolio_cleanup(user_id)
+    deletion_scheduler.schedule(user_id, message_ids, PORTFOLIO_AUTO_DELETE_SECONDS, tag="portfolio")
 
 def track_admin_temp_message(message_id: int | None):
     if not message_id:
@@ -2355,9 +3410,10 @@ async def start_application(message: Message, state: FSMContext, user_id: int |
     )
     edited = False
     if message and message.chat.type == "private":
-        edited = await try_edit_message(message, question, reply_markup=form_keyboard(lang))
+        markup = form_keyboard(lang)
+        edited = await try_edit_message(message, question, reply_markup=markup)
         if edited:
-            set_menu_message_id(target_user_id, message.message_id)
+            set_menu_message_id(target_user_id, message.message_id, message_kind(message), content_hash(question, markup))
     if not edited:
         sent = await send_or_edit_user_text(
             target_user_id,
@@ -2369,6 +3425,7 @@ async def start_application(message: Message, state: FSMContext, user_id: int |
             set_last_state(target_user_id, None)
             return False
     set_status(target_user_id, "new")
+    admin_card_cache.invalidate(target_user_id)
     set_last_state(target_user_id, ApplicationStates.name.state)
     return True
 
@@ -2423,7 +3480,7 @@ async def start(message: Message, state: FSMContext):
     except Exception:
         logger.exception("Ошибка в /start")
 
-@dp.callback_query(F.data == "main_menu")
+@callback_router.exact("main_menu")
 async def main_menu_handler(call: CallbackQuery, state: FSMContext):
     if not call.message or call.message.chat.type != "private":
         await safe_call_answer(call, t("ru", "open_private_prompt"), show_alert=True)
@@ -2451,7 +3508,7 @@ async def language_command(message: Message):
     )
 
 
-@dp.callback_query(F.data == "language_menu")
+@callback_router.exact("language_menu")
 async def language_menu_handler(call: CallbackQuery):
     if not call.message or call.message.chat.type != "private":
         await safe_call_answer(call, t("ru", "open_private_prompt"), show_alert=True)
@@ -2465,14 +3522,14 @@ async def language_menu_handler(call: CallbackQuery):
     await safe_call_answer(call)
 
 
-@dp.callback_query(F.data.startswith("set_lang:"))
-async def set_language_handler(call: CallbackQuery, state: FSMContext):
+@callback_router.route(SetLang)
+async def set_language_handler(call: CallbackQuery, state: FSMContext, callback_data: SetLang):
     try:
         if not call.message or call.message.chat.type != "private":
             await safe_call_answer(call, t("ru", "open_private_prompt"), show_alert=True)
             return
         await safe_call_answer(call)
-        lang_code = call.data.split(":", 1)[1].strip().lower()
+        lang_code = callback_data.lang.strip().lower()
         if lang_code not in LANGUAGE_NAMES:
             lang_code = "ru"
         set_user_language(call.from_user.id, lang_code)
@@ -2504,7 +3561,7 @@ async def set_language_handler(call: CallbackQuery, state: FSMContext):
         await safe_call_answer(call, t("ru", "temp_error_retry"), show_alert=True)
 # ================= APPLY =================
 
-@dp.callback_query(F.data == "apply")
+@callback_router.exact("apply")
 async def apply(call: CallbackQuery, state: FSMContext):
     try:
         if not call.message or call.message.chat.type != "private":
@@ -2566,7 +3623,7 @@ async def apply(call: CallbackQuery, state: FSMContext):
         logger.exception("Ошибка в apply")
         await safe_call_answer(call, t(lang_for(call.from_user.id), "temp_error_retry"), show_alert=True)
 
-@dp.callback_query(F.data == "apply_restart")
+@callback_router.exact("apply_restart")
 async def apply_restart(call: CallbackQuery, state: FSMContext):
     try:
         if not call.message or call.message.chat.type != "private":
@@ -2592,7 +3649,7 @@ async def apply_restart(call: CallbackQuery, state: FSMContext):
         logger.exception("Ошибка в apply_restart")
         await safe_call_answer(call, t(lang_for(call.from_user.id), "temp_error_retry"), show_alert=True)
 
-@dp.callback_query(F.data == "form_continue")
+@callback_router.exact("form_continue")
 async def form_continue(call: CallbackQuery, state: FSMContext):
     try:
         if not call.message or call.message.chat.type != "private":
@@ -2671,7 +3728,7 @@ async def form_continue(call: CallbackQuery, state: FSMContext):
         logger.exception("Ошибка в form_continue")
         await safe_call_answer(call, t(lang_for(call.from_user.id), "temp_error_retry"), show_alert=True)
 
-@dp.callback_query(F.data == "form_restart")
+@callback_router.exact("form_restart")
 async def form_restart(call: CallbackQuery, state: FSMContext):
     try:
         if not call.message or call.message.chat.type != "private":
@@ -3043,7 +4100,7 @@ async def reject_reason_non_text(m: Message, state: FSMContext):
         reject_reason_keyboard()
     )
 
-@dp.callback_query(F.data == "form_back")
+@callback_router.exact("form_back")
 async def form_back(call: CallbackQuery, state: FSMContext):
     try:
         await safe_call_answer(call)
@@ -3107,7 +4164,7 @@ async def form_back(call: CallbackQuery, state: FSMContext):
         await safe_call_answer(call, "Ошибка возврата на предыдущий шаг", show_alert=False)
 # ================= MAIN MENU HANDLERS =================
 
-@dp.callback_query(F.data == "about_work")
+@callback_router.exact("about_work")
 async def about_work(call: CallbackQuery):
     lang = lang_for(call.from_user.id)
     await clear_portfolio_media(call.from_user.id)
@@ -3118,7 +4175,7 @@ async def about_work(call: CallbackQuery):
     )
 
 
-@dp.callback_query(F.data == "about_platforms")
+@callback_router.exact("about_platforms")
 async def about_platforms(call: CallbackQuery):
     lang = lang_for(call.from_user.id)
     await clear_portfolio_media(call.from_user.id)
@@ -3129,7 +4186,7 @@ async def about_platforms(call: CallbackQuery):
     )
 
 
-@dp.callback_query(F.data == "about_income")
+@callback_router.exact("about_income")
 async def about_income(call: CallbackQuery):
     lang = lang_for(call.from_user.id)
     await clear_portfolio_media(call.from_user.id)
@@ -3139,7 +4196,7 @@ async def about_income(call: CallbackQuery):
         reply_markup=about_menu(lang)
     )
 
-@dp.callback_query(F.data == "portfolio")
+@callback_router.exact("portfolio")
 async def portfolio(call: CallbackQuery):
     try:
         lang = lang_for(call.from_user.id)
@@ -3153,7 +4210,7 @@ async def portfolio(call: CallbackQuery):
         logger.exception("Ошибка в portfolio")
         await safe_call_answer(call, "Не удалось открыть раздел", show_alert=False)
 
-@dp.callback_query(F.data == "about")
+@callback_router.exact("about")
 async def about(call: CallbackQuery):
     try:
         lang = lang_for(call.from_user.id)
@@ -3167,7 +4224,7 @@ async def about(call: CallbackQuery):
         logger.exception("Ошибка в about")
         await safe_call_answer(call, "Не удалось открыть раздел", show_alert=False)
 
-@dp.callback_query(F.data == "contact")
+@callback_router.exact("contact")
 async def contact(call: CallbackQuery):
     try:
         lang = lang_for(call.from_user.id)
@@ -3182,7 +4239,7 @@ async def contact(call: CallbackQuery):
         logger.exception("Ошибка в contact")
         await safe_call_answer(call, "Не удалось открыть раздел", show_alert=False)
 
-@dp.callback_query(F.data == "back")
+@callback_router.exact("back")
 async def back_handler(call: CallbackQuery, state: FSMContext):
     try:
         if not call.message:
@@ -3197,7 +4254,7 @@ async def back_handler(call: CallbackQuery, state: FSMContext):
 
 # ================= PREVIEW =================
 
-@dp.callback_query(F.data == "preview_edit")
+@callback_router.exact("preview_edit")
 async def preview_edit(call: CallbackQuery):
     try:
         lang = lang_for(call.from_user.id)
@@ -3214,13 +4271,10 @@ async def preview_edit(call: CallbackQuery):
         logger.exception("Ошибка в preview_edit")
         await safe_call_answer(call, "Не удалось открыть редактирование", show_alert=False)
 
-@dp.callback_query(F.data.startswith("edit:"))
-async def edit_field(call: CallbackQuery, state: FSMContext):
+@callback_router.route(EditField)
+async def edit_field(call: CallbackQuery, state: FSMContext, callback_data: EditField):
     try:
-        if ":" not in call.data:
-            await safe_call_answer(call, "Некорректная команда", show_alert=False)
-            return
-        field = call.data.split(":", 1)[1]
+        field = callback_data.field
 
         await state.update_data(edit_field=field)
         await state.set_state(ApplicationStates.edit_value)
@@ -3336,7 +4390,7 @@ async def save_edited_value(m: Message, state: FSMContext):
     await show_preview(m, state)
 
 
-@dp.callback_query(F.data == "preview_edit_photo")
+@callback_router.exact("preview_edit_photo")
 async def preview_edit_photo(call: CallbackQuery):
     try:
         lang = lang_for(call.from_user.id)
@@ -3353,13 +4407,10 @@ async def preview_edit_photo(call: CallbackQuery):
         logger.exception("Ошибка в preview_edit_photo")
         await safe_call_answer(call, "Не удалось открыть замену фото", show_alert=False)
 
-@dp.callback_query(F.data.startswith("edit_photo:"))
-async def edit_photo(call: CallbackQuery, state: FSMContext):
+@callback_router.route(EditPhoto)
+async def edit_photo(call: CallbackQuery, state: FSMContext, callback_data: EditPhoto):
     try:
-        if ":" not in call.data:
-            await safe_call_answer(call, "Некорректная команда", show_alert=False)
-            return
-        photo_type = call.data.split(":", 1)[1]
+        photo_type = callback_data.kind
 
         await state.update_data(edit_photo=photo_type)
 
@@ -3428,7 +4479,7 @@ async def reject_text_when_waiting_photo(m: Message, state: FSMContext):
             )
         )
 
-@dp.callback_query(F.data == "preview_back")
+@callback_router.exact("preview_back")
 async def preview_back(call: CallbackQuery, state: FSMContext):
     try:
         await safe_call_answer(call)
@@ -3475,7 +4526,7 @@ async def show_preview(m: Message, state: FSMContext, user_id: int | None = None
 
 # ================= CONFIRM SEND =================
 
-@dp.callback_query(F.data == "preview_confirm")
+@callback_router.exact("preview_confirm")
 async def preview_confirm(call: CallbackQuery, state: FSMContext):
     try:
         lang = lang_for(call.from_user.id)
@@ -3514,7 +4565,14 @@ async def preview_confirm(call: CallbackQuery, state: FSMContext):
         await gentle_typing(call.message.chat.id)
 
         set_source(user.id, "bot")
+        try:
+            earlier = mark_duplicate_application(user.id, extra_telegram=user.username)
+            if earlier is not None:
+                logger.info("APPLY_DUPLICATE user_id=%s earlier=%s", user.id, earlier)
+        except Exception:
+            logger.exception("Не удалось проверить заявку на повтор")
         set_status(user.id, "pending")
+        admin_card_cache.invalidate(user.id)
         set_last_apply_at(user.id)
         if append_application_row:
             try:
@@ -3522,14 +4580,7 @@ async def preview_confirm(call: CallbackQuery, state: FSMContext):
             except Exception:
                 logger.exception("Ошибка записи в Excel")
         await state.clear()
-        try:
-            await notify_admin_new_application()
-        except Exception:
-            logger.exception("Ошибка уведомления админов о новой заявке")
-        try:
-            await ensure_admin_menu_posted()
-        except Exception:
-            logger.exception("Ошибка обновления админ-меню после заявки")
+        schedule_new_application_admin_updates()
         try:
             caption = build_menu_caption_with_status(
                 "pending",
@@ -3550,7 +4601,7 @@ async def preview_confirm(call: CallbackQuery, state: FSMContext):
         logger.exception("Ошибка в preview_confirm")
         await safe_call_answer(call, t(lang_for(call.from_user.id), "temp_error_retry"), show_alert=True)
 
-@dp.callback_query(F.data == "edit_cancel")
+@callback_router.exact("edit_cancel")
 async def edit_cancel(call: CallbackQuery, state: FSMContext):
     try:
         await safe_call_answer(call)
@@ -3566,57 +4617,48 @@ async def edit_cancel(call: CallbackQuery, state: FSMContext):
 
 # ================= ADMIN =================
 
-@dp.callback_query(F.data.startswith("admin_accept:"))
-async def admin_accept(call: CallbackQuery):
+@callback_router.route(AdminAccept)
+async def admin_accept(call: CallbackQuery, callback_data: AdminAccept):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
         await safe_call_answer(call)
-        parts = call.data.split(":")
-        uid = int(parts[1])
-        view_mode = len(parts) > 2 and parts[2] == "view"
-        try:
-            user_lang = lang_for(uid)
-            caption = build_menu_caption_with_status(
-                "accepted",
-                t(user_lang, "accept_caption"),
-                lang=user_lang,
-                tail=t(user_lang, "approved_tail")
-            )
-            if not is_site_source(uid):
-                await send_or_edit_user_menu(uid, caption, lang=user_lang)
-                await clear_user_flow_message(uid)
-        except Exception:
-            logger.exception("Ошибка отправки меню после принятия")
-        set_status(uid, "accepted")
-        if update_application_status:
-            try:
-                update_application_status(uid, "accepted")
-            except Exception:
-                logger.exception("Ошибка обновления статуса в Excel")
-        await update_admin_summary_message(uid, "accepted")
-        try:
-            await post_admin_menu()
-        except Exception:
-            logger.exception("Ошибка возврата в админ-меню")
+        uid = callback_data.user_id
+        user_lang = lang_for(uid)
+        caption = build_menu_caption_with_status(
+            "accepted",
+            t(user_lang, "accept_caption"),
+            lang=user_lang,
+            tail=t(user_lang, "approved_tail")
+        )
+        await complete_admin_decision(
+            uid,
+            "accepted",
+            caption,
+            user_lang,
+            (callback_data.mode, callback_data.filter_key, callback_data.offset)
+        )
         await safe_call_answer(call, "Принято")
     except Exception:
         logger.exception("Ошибка в admin_accept")
         await safe_call_answer(call, "Ошибка при принятии заявки", show_alert=True)
 
-@dp.callback_query(F.data.startswith("admin_reject:"))
-async def admin_reject(call: CallbackQuery, state: FSMContext):
+@callback_router.route(AdminReject)
+async def admin_reject(call: CallbackQuery, state: FSMContext, callback_data: AdminReject):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
         await safe_call_answer(call)
-        parts = call.data.split(":")
-        uid = int(parts[1])
-        view_mode = len(parts) > 2 and parts[2] == "view"
+        uid = callback_data.user_id
+        view_mode = callback_data.mode == "view"
         await state.set_state(ApplicationStates.admin_reject_reason)
-        await state.update_data(reject_uid=uid, reject_view=view_mode)
+        await state.update_data(
+            reject_uid=uid,
+            reject_view=view_mode,
+            reject_return=[callback_data.mode, callback_data.filter_key, callback_data.offset],
+        )
         await update_admin_menu_message(
             "✍️ Укажи причину отказа:\n\n"
             "Можно выбрать готовый вариант или написать свой текст.",
@@ -3627,14 +4669,14 @@ async def admin_reject(call: CallbackQuery, state: FSMContext):
         logger.exception("Ошибка в admin_reject")
         await safe_call_answer(call, "Ошибка при открытии отказа", show_alert=True)
 
-@dp.callback_query(F.data.startswith("reject_tpl:"))
-async def reject_template(call: CallbackQuery, state: FSMContext):
+@callback_router.route(RejectTemplate)
+async def reject_template(call: CallbackQuery, state: FSMContext, callback_data: RejectTemplate):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
         await safe_call_answer(call)
-        tpl_code = call.data.split(":", 1)[1]
+        tpl_code = callback_data.code
         state_data = await state.get_data()
         uid = state_data.get("reject_uid")
         if not uid:
@@ -3656,31 +4698,20 @@ async def reject_template(call: CallbackQuery, state: FSMContext):
             await safe_call_answer(call, "🤍 Шаблон не найден")
             return
 
-        try:
-            intro = t(user_lang, "rejected_reason_intro", reason=reason)
-            caption = build_menu_caption_with_status(
-                "rejected",
-                t(user_lang, "menu_caption"),
-                lang=user_lang,
-                intro=intro
-            )
-            if not is_site_source(uid):
-                await send_or_edit_user_menu(uid, caption, lang=user_lang)
-                await clear_user_flow_message(uid)
-        except Exception:
-            logger.exception("Ошибка отправки меню после отказа")
-        set_status(uid, "rejected")
-        if update_application_status:
-            try:
-                update_application_status(uid, "rejected")
-            except Exception:
-                logger.exception("Ошибка обновления статуса в Excel")
-        await update_admin_summary_message(uid, "rejected")
-        try:
-            await post_admin_menu()
-        except Exception:
-            logger.exception("Ошибка возврата в админ-меню")
+        caption = build_menu_caption_with_status(
+            "rejected",
+            t(user_lang, "menu_caption"),
+            lang=user_lang,
+            intro=t(user_lang, "rejected_reason_intro", reason=reason)
+        )
         await state.clear()
+        await complete_admin_decision(
+            uid,
+            "rejected",
+            caption,
+            user_lang,
+            tuple(state_data.get("reject_return") or (None, None, None))
+        )
         await safe_call_answer(call)
     except Exception:
         logger.exception("Ошибка в reject_template")
@@ -3698,63 +4729,49 @@ async def reject_reason(m: Message, state: FSMContext):
             await state.clear()
             return
 
-        try:
-            form_data = get_form_data(uid) or {}
-            user_lang = submission_lang_for_user(uid, form_data)
-            intro = t(user_lang, "rejected_reason_intro", reason=m.text)
-            caption = build_menu_caption_with_status(
-                "rejected",
-                t(user_lang, "menu_caption"),
-                lang=user_lang,
-                intro=intro
-            )
-            if not is_site_source(uid):
-                await send_or_edit_user_menu(uid, caption, lang=user_lang)
-                await clear_user_flow_message(uid)
-        except Exception:
-            logger.exception("Ошибка отправки меню после отказа")
-        set_status(uid, "rejected")
-        if update_application_status:
-            try:
-                update_application_status(uid, "rejected")
-            except Exception:
-                logger.exception("Ошибка обновления статуса в Excel")
-        await update_admin_summary_message(uid, "rejected")
-        try:
-            await post_admin_menu()
-        except Exception:
-            logger.exception("Ошибка возврата в админ-меню")
+        form_data = get_form_data(uid) or {}
+        user_lang = submission_lang_for_user(uid, form_data)
+        caption = build_menu_caption_with_status(
+            "rejected",
+            t(user_lang, "menu_caption"),
+            lang=user_lang,
+            intro=t(user_lang, "rejected_reason_intro", reason=m.text)
+        )
         await state.clear()
+        await complete_admin_decision(
+            uid,
+            "rejected",
+            caption,
+            user_lang,
+            tuple(data.get("reject_return") or (None, None, None))
+        )
     except Exception:
         logger.exception("Ошибка в reject_reason")
 
-@dp.callback_query(F.data.startswith("admin_status:"))
-async def admin_status(call: CallbackQuery):
+@callback_router.route(AdminStatus)
+async def admin_status(call: CallbackQuery, callback_data: AdminStatus):
     try:
-        _, uid, status = call.data.split(":", 2)
-        status_label = STATUS_LABELS.get(status, status)
+        status_label = STATUS_LABELS.get(callback_data.status, callback_data.status)
         await safe_call_answer(call, f"Статус: {status_label}", show_alert=False)
     except Exception:
         await safe_call_answer(call, "Статус обновлён", show_alert=False)
 
-@dp.callback_query(F.data.startswith("admin_photos:"))
-async def admin_photos(call: CallbackQuery):
+@callback_router.route(AdminPhotos)
+async def admin_photos(call: CallbackQuery, callback_data: AdminPhotos):
     try:
         if not call.message:
             await safe_call_answer(call, "Сообщение недоступно", show_alert=False)
             return
-        uid = int(call.data.split(":", 1)[1])
-        data = get_form_data(uid) or {}
-        contact_url = contact_url_for_user(uid, data)
+        uid = callback_data.user_id
+        card = admin_card(uid, ADMIN_CARD_FULL)
+        data = card["data"] if card else {}
         photo_id = data.get("photo_face") or data.get("photo_full")
         if not photo_id:
             await safe_call_answer(call, "Фото не найдено", show_alert=False)
             return
-        status = get_status(uid) or "pending"
-        text = build_admin_full_text(data, uid, status)
         await update_admin_view_message(
-            text,
-            admin_list_view_keyboard(uid, status, "all", 0, 1, ADMIN_LIST_LIMIT, contact_url=contact_url),
+            card["text"],
+            admin_list_view_keyboard(uid, card["status"], "all", 0, 1, ADMIN_LIST_LIMIT, contact_url=card["contact_url"]),
             photo_id
         )
         await safe_call_answer(call)
@@ -3866,9 +4883,15 @@ async def admin_create_post_submit(message: Message, state: FSMContext):
 
         await state.clear()
         await sync_anonymous_create_post_state(enabled=False)
-        langs = ", ".join(LANG_TITLES[lang] for lang in POST_LANG_ORDER if lang in channels)
+        errors = posted.get("errors") or {}
+        if errors:
+            report = channel_fan_out_report(posted.get("message_ids", {}), errors)
+            menu_text = f"⚠️ Пост опубликован частично:\n{report}"
+        else:
+            langs = ", ".join(LANG_TITLES[lang] for lang in POST_LANG_ORDER if lang in channels)
+            menu_text = f"✅ Пост опубликован в каналы: {langs}"
         await update_admin_menu_message(
-            f"✅ Пост опубликован в каналы: {langs}",
+            menu_text,
             admin_menu_keyboard(get_status_counts())
         )
     except ValueError as exc:
@@ -3886,7 +4909,7 @@ async def admin_menu(message: Message, state: FSMContext):
     await clear_admin_temp_messages()
     await ensure_admin_menu_posted()
 
-@dp.callback_query(F.data == "admin_post:cancel")
+@callback_router.exact(AdminPost(action="cancel").pack())
 async def admin_create_post_cancel(call: CallbackQuery, state: FSMContext):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
@@ -3900,21 +4923,22 @@ async def admin_create_post_cancel(call: CallbackQuery, state: FSMContext):
         logger.exception("Ошибка отмены режима создания поста")
         await safe_call_answer(call, "Не удалось отменить", show_alert=False)
 
-@dp.callback_query(F.data.startswith("admin_menu:"))
-async def admin_menu_action(call: CallbackQuery, state: FSMContext):
+@callback_router.route(AdminMenu)
+async def admin_menu_action(call: CallbackQuery, state: FSMContext, callback_data: AdminMenu):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
         await safe_call_answer(call)
         await clear_admin_temp_messages()
-        action = call.data.split(":", 1)[1]
+        action = callback_data.action
         if action != "create_post":
             current_state = await state.get_state()
             if current_state in {
                 ApplicationStates.admin_create_post.state,
                 ApplicationStates.admin_edit_post_text.state,
                 ApplicationStates.admin_edit_post_photo.state,
+                ApplicationStates.admin_bulk_select.state,
             }:
                 await state.clear()
                 if current_state == ApplicationStates.admin_create_post.state:
@@ -3992,36 +5016,157 @@ async def admin_menu_action(call: CallbackQuery, state: FSMContext):
         logger.exception("Ошибка в admin_menu_action")
         await safe_call_answer(call, "Ошибка выполнения команды", show_alert=False)
 
-@dp.callback_query(F.data.startswith("admin_list:"))
-async def admin_list_pagination(call: CallbackQuery):
+@callback_router.route(AdminList)
+async def admin_list_pagination(call: CallbackQuery, callback_data: AdminList):
     try:
-        _, filter_key, offset_raw = call.data.split(":", 2)
-        offset = int(offset_raw)
+        await send_admin_list(call, callback_data.filter_key, callback_data.offset)
     except Exception:
-        await safe_call_answer(call, "Ошибка пагинации", show_alert=False)
-        return
+        logger.exception("Ошибка пагинации списка")
+        await safe_call_answer(call, "Не удалось открыть страницу", show_alert=False)
+
+@callback_router.route(AdminReview)
+async def admin_review(call: CallbackQuery, callback_data: AdminReview):
     try:
-        await send_admin_list(call, filter_key, offset)
+        if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
+            await safe_call_answer(call, "Недостаточно прав", show_alert=True)
+            return
+        await safe_call_answer(call)
+        if callback_data.action == "start":
+            await clear_admin_notify()
+            review_queue.restart()
+        elif callback_data.action == "skip" and callback_data.user_id:
+            review_queue.skip(callback_data.user_id)
+        await show_next_review_card()
     except Exception:
-        logger.exception("Ошибка пагинации списка")
+        logger.exception("Ошибка разбора заявок по очереди")
+        await safe_call_answer(call, "Не удалось открыть заявку", show_alert=False)
+
+@callback_router.route(AdminBulk)
+async def admin_bulk(call: CallbackQuery, state: FSMContext, callback_data: AdminBulk):
+    try:
+        if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
+            await safe_call_answer(call, "Недостаточно прав", show_alert=True)
+            return
+        action = callback_data.action
+        value = callback_data.value
+        # На нажатие отвечаем один раз: ошибку шаблона показываем в этом же ответе.
+        if action == "reject_tpl" and not auto_reject_reason(value or "", "ru"):
+            await safe_call_answer(call, "🤍 Шаблон не найден")
+            return
+        await safe_call_answer(call)
+        if action == "start":
+            await clear_admin_view_message()
+            await state.set_state(ApplicationStates.admin_bulk_select)
+            await state.update_data(bulk_selected=[], bulk_offset=0, bulk_action=None, bulk_reason=None)
+        elif await state.get_state() != ApplicationStates.admin_bulk_select.state:
+            # Кнопки выбора от прошлого сеанса (выход, перезапуск бота) — возвращаем к списку.
+            await show_admin_compact_page("pending", 0)
+            return
+        data = await state.get_data()
+        selected = {int(user_id) for user_id in data.get("bulk_selected") or []}
+        offset = int(data.get("bulk_offset") or 0)
+        limit = ADMIN_COMPACT_PAGE_SIZE
+        if action == "cancel":
+            await state.clear()
+            await show_admin_compact_page("pending", offset)
+            return
+        if action == "confirm":
+            await apply_bulk_decision(state, data)
+            return
+        if action in {"accept", "reject_tpl"} and selected:
+            status = "accepted" if action == "accept" else "rejected"
+            reason = None
+            if action == "reject_tpl":
+                reason = auto_reject_reason(value or "", "ru")
+            await state.update_data(bulk_action=status, bulk_reason=value if reason else None)
+            text = f"{_bulk_action_title(status, len(selected))}?\n\n"
+            if reason:
+                text += f"Причина: {html.escape(reason)}\n(кандидаты получат её на языке своей заявки)\n\n"
+            text += "Кандидаты получат уведомление, прогресс будет в отдельном сообщении."
+            await update_admin_menu_message(text, admin_bulk_confirm_keyboard())
+            return
+        if action == "reject" and selected:
+            await update_admin_menu_message(
+                f"{_bulk_action_title('rejected', len(selected))}\n\nВыбери причину отказа:",
+                admin_bulk_reject_keyboard()
+            )
+            return
+        if action == "toggle" and value:
+            selected ^= {int(value)}
+        elif action == "page" and value is not None:
+            offset = int(value)
+        elif action == "select_page":
+            items, _ = list_applications_page("pending", limit, int(value or offset))
+            selected.update(item["user_id"] for item in items)
+        elif action == "select_all":
+            selected.update(list_application_ids("pending"))
+        elif action == "clear":
+            selected.clear()
+        offset = await show_admin_bulk_page(selected, offset)
+        await state.update_data(bulk_selected=sorted(selected), bulk_offset=offset)
+    except Exception:
+        logger.exception("Ошибка массового решения по заявкам")
+        await safe_call_answer(call, "Не удалось выполнить действие", show_alert=False)
+
+@callback_router.route(AdminCompact)
+async def admin_compact_page(call: CallbackQuery, callback_data: AdminCompact):
+    try:
+        if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
+            await safe_call_answer(call, "Недостаточно прав", show_alert=True)
+            return
+        await safe_call_answer(call)
+        await clear_admin_notify()
+        await clear_admin_view_message()
+        await show_admin_compact_page(callback_data.filter_key, callback_data.offset)
+    except Exception:
+        logger.exception("Ошибка компактного списка заявок")
         await safe_call_answer(call, "Не удалось открыть страницу", show_alert=False)
 
-@dp.callback_query(F.data.startswith("admin_view_photo:"))
-async def admin_view_photo(call: CallbackQuery):
+@callback_router.route(AdminCompactOpen)
+async def admin_compact_open(call: CallbackQuery, callback_data: AdminCompactOpen):
+    try:
+        if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
+            await safe_call_answer(call, "Недостаточно прав", show_alert=True)
+            return
+        uid = callback_data.user_id
+        card = admin_card(uid, ADMIN_CARD_FULL)
+        if card is None:
+            await safe_call_answer(call, "Заявка не найдена", show_alert=False)
+            return
+        await safe_call_answer(call)
+        data = card["data"]
+        await update_admin_view_message(
+            card["text"],
+            admin_compact_card_keyboard(
+                uid,
+                card["status"],
+                callback_data.filter_key,
+                callback_data.offset,
+                contact_url=card["contact_url"],
+            ),
+            data.get("photo_face") or data.get("photo_full")
+        )
+    except Exception:
+        logger.exception("Ошибка открытия карточки из компактного списка")
+        await safe_call_answer(call, "Не удалось открыть карточку", show_alert=False)
+
+@callback_router.route(AdminViewPhoto)
+async def admin_view_photo(call: CallbackQuery, callback_data: AdminViewPhoto):
     try:
         if not call.message:
             await safe_call_answer(call, "Сообщение недоступно", show_alert=False)
             return
-        _, uid_raw, photo_type, filter_key, offset_raw = call.data.split(":", 4)
-        uid = int(uid_raw)
-        offset = int(offset_raw)
-        data = get_form_data(uid) or {}
-        contact_url = contact_url_for_user(uid, data)
+        uid = callback_data.user_id
+        photo_type = callback_data.kind
+        filter_key = callback_data.filter_key
+        offset = callback_data.offset
+        card = admin_card(uid, ADMIN_CARD_FULL)
+        data = card["data"] if card else {}
         photo_id = data.get("photo_face") if photo_type == "face" else data.get("photo_full")
         if not photo_id:
             await safe_call_answer(call, "Фото не найдено", show_alert=False)
             return
-        status = get_status(uid) or "pending"
+        status = card["status"]
         label = _admin_list_label(filter_key)
         total = len(list_applications(None if filter_key == "all" else filter_key))
         if total == 0:
@@ -4033,11 +5178,11 @@ async def admin_view_photo(call: CallbackQuery):
             f"🗂 <b>{label}</b>\n\n"
             f"Заявка <b>{offset + 1}</b> из <b>{total}</b>\n"
             f"Страница: <b>{page}/{pages}</b>\n\n"
-            f"{build_admin_full_text(data, uid, status)}"
+            f"{card['text']}"
         )
         await update_admin_view_message(
             text,
-            admin_list_view_keyboard(uid, status, filter_key, offset, total, ADMIN_LIST_LIMIT, contact_url=contact_url),
+            admin_list_view_keyboard(uid, status, filter_key, offset, total, ADMIN_LIST_LIMIT, contact_url=card["contact_url"]),
             photo_id
         )
         await safe_call_answer(call)
@@ -4045,55 +5190,55 @@ async def admin_view_photo(call: CallbackQuery):
         logger.exception("Ошибка переключения фото")
         await safe_call_answer(call, "Не удалось показать фото", show_alert=False)
 
-@dp.callback_query(F.data.startswith("admin_posts:"))
-async def admin_posts_pagination(call: CallbackQuery):
+@callback_router.route(AdminPosts)
+async def admin_posts_pagination(call: CallbackQuery, callback_data: AdminPosts):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
-        _, offset_raw = call.data.split(":", 1)
-        offset = int(offset_raw)
-        await show_admin_posted_posts(offset)
+        await show_admin_posted_posts(callback_data.offset)
         await safe_call_answer(call)
     except Exception:
         logger.exception("Ошибка открытия выложенных постов")
         await safe_call_answer(call, "Не удалось открыть посты", show_alert=False)
 
 
-@dp.callback_query(F.data.startswith("admin_post_delete:"))
-async def admin_post_delete(call: CallbackQuery):
+@callback_router.route(AdminPostDelete)
+async def admin_post_delete(call: CallbackQuery, callback_data: AdminPostDelete):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
-        _, post_id_raw, offset_raw = call.data.split(":", 2)
-        post_id = int(post_id_raw)
-        offset = int(offset_raw)
+        post_id = callback_data.post_id
+        offset = callback_data.offset
         item = get_posted_message(post_id)
         if not item:
             await safe_call_answer(call, "Пост не найден", show_alert=False)
             await show_admin_posted_posts(offset)
             return
-        await delete_post_from_channels(item)
+        _, errors = await delete_post_from_channels(item)
         delete_posted_message(post_id)
         _, _, total = await show_admin_posted_posts(offset)
         if total == 0:
             await post_admin_menu()
-        await safe_call_answer(call, "Удалено")
+        if errors:
+            failed = ", ".join(LANG_TITLES.get(lang, lang.upper()) for lang in POST_LANG_ORDER if lang in errors)
+            await safe_call_answer(call, f"Удалено, но не из каналов: {failed}", show_alert=True)
+        else:
+            await safe_call_answer(call, "Удалено")
     except Exception:
         logger.exception("Ошибка удаления выложенного поста")
         await safe_call_answer(call, "Не удалось удалить пост", show_alert=False)
 
 
-@dp.callback_query(F.data.startswith("admin_post_edit_text:"))
-async def admin_post_edit_text(call: CallbackQuery, state: FSMContext):
+@callback_router.route(AdminPostEditText)
+async def admin_post_edit_text(call: CallbackQuery, state: FSMContext, callback_data: AdminPostEditText):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
-        _, post_id_raw, offset_raw = call.data.split(":", 2)
-        post_id = int(post_id_raw)
-        offset = int(offset_raw)
+        post_id = callback_data.post_id
+        offset = callback_data.offset
         item = get_posted_message(post_id)
         if not item:
             await safe_call_answer(call, "Пост не найден", show_alert=False)
@@ -4164,15 +5309,14 @@ def extract_media_file_id_for_post(message: Message, content_type: str) -> str |
     return None
 
 
-@dp.callback_query(F.data.startswith("admin_post_edit_photo:"))
-async def admin_post_edit_photo(call: CallbackQuery, state: FSMContext):
+@callback_router.route(AdminPostEditPhoto)
+async def admin_post_edit_photo(call: CallbackQuery, state: FSMContext, callback_data: AdminPostEditPhoto):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
-        _, post_id_raw, offset_raw = call.data.split(":", 2)
-        post_id = int(post_id_raw)
-        offset = int(offset_raw)
+        post_id = callback_data.post_id
+        offset = callback_data.offset
         item = get_posted_message(post_id)
         if not item:
             await safe_call_answer(call, "Пост не найден", show_alert=False)
@@ -4195,15 +5339,13 @@ async def admin_post_edit_photo(call: CallbackQuery, state: FSMContext):
         await safe_call_answer(call, "Не удалось открыть замену медиа", show_alert=False)
 
 
-@dp.callback_query(F.data.startswith("admin_post_edit_cancel:"))
-async def admin_post_edit_cancel(call: CallbackQuery, state: FSMContext):
+@callback_router.route(AdminPostEditCancel)
+async def admin_post_edit_cancel(call: CallbackQuery, state: FSMContext, callback_data: AdminPostEditCancel):
     try:
         if not call.message or call.message.chat.id != ADMIN_GROUP_ID:
             await safe_call_answer(call, "Недостаточно прав", show_alert=True)
             return
-        _, post_id_raw, offset_raw = call.data.split(":", 2)
-        _ = int(post_id_raw)
-        offset = int(offset_raw)
+        offset = callback_data.offset
         await state.clear()
         await show_admin_posted_posts(offset)
         await safe_call_answer(call, "Отменено")
@@ -4241,8 +5383,12 @@ async def admin_post_edit_text_submit(message: Message, state: FSMContext):
 
         message_ids = _post_message_ids(item)
         target_langs = [lang for lang in POST_LANG_ORDER if lang in message_ids and lang != "ru"]
-        translated_texts: dict[str, str] = {}
-        translated_entities: dict[str, list[MessageEntity] | None] = {}
+        translated_texts, translated_entities, full_langs = await retranslate_changed_paragraphs(
+            item,
+            ru_text,
+            ru_entities,
+            target_langs,
+        )
 
         marked_text, required_tokens, rich_specs, custom_specs, locked_specs = markerize_entities_for_translation(
             ru_text,
@@ -4250,10 +5396,10 @@ async def admin_post_edit_text_submit(message: Message, state: FSMContext):
         )
         translated_marked = await translate_ru_to_targets(
             marked_text,
-            target_langs,
+            full_langs,
             required_tokens=required_tokens,
         )
-        for lang in target_langs:
+        for lang in full_langs:
             translated_marked_text = translated_marked.get(lang, "")
             restored_text, restored_entities = restore_entities_from_markers(
                 translated_marked_text,
@@ -4267,7 +5413,7 @@ async def admin_post_edit_text_submit(message: Message, state: FSMContext):
 
         texts_map = {"ru": ru_text, **translated_texts}
         entities_map = {"ru": ru_entities, **translated_entities}
-        final_texts, final_entities = await edit_post_text_in_channels(item, texts_map, entities_map)
+        final_texts, final_entities, errors = await edit_post_text_in_channels(item, texts_map, entities_map)
         update_posted_message(
             post_id,
             texts=final_texts,
@@ -4275,6 +5421,13 @@ async def admin_post_edit_text_submit(message: Message, state: FSMContext):
         )
         await state.clear()
         await show_admin_posted_posts(offset)
+        if errors:
+            report = channel_fan_out_report(
+                {lang: True for lang in _post_message_ids(item) if lang not in errors},
+                errors,
+            )
+            notice = await message.answer(f"⚠️ Текст обновлён не во всех каналах:\n{report}")
+            track_admin_temp_message(notice.message_id)
         try:
             await message.delete()
         except Exception:
@@ -4310,7 +5463,7 @@ async def admin_post_edit_photo_submit(message: Message, state: FSMContext):
             await message.answer(f"⚠️ Отправь именно {media_name} одним сообщением.")
             return
 
-        final_texts, final_entities = await replace_post_media_in_channels(
+        final_texts, final_entities, errors = await replace_post_media_in_channels(
             item,
             new_file_id,
             expected_type,
@@ -4322,6 +5475,13 @@ async def admin_post_edit_photo_submit(message: Message, state: FSMContext):
         )
         await state.clear()
         await show_admin_posted_posts(offset)
+        if errors:
+            report = channel_fan_out_report(
+                {lang: True for lang in _post_message_ids(item) if lang not in errors},
+                errors,
+            )
+            notice = await message.answer(f"⚠️ Медиа заменено не во всех каналах:\n{report}")
+            track_admin_temp_message(notice.message_id)
         try:
             await message.delete()
         except Exception:
@@ -4339,10 +5499,12 @@ async def admin_reset_db(message: Message):
         confirm_reset_db_keyboard()
     )
 
-@dp.callback_query(F.data == "admin_reset_db:confirm")
+@callback_router.exact(AdminResetDb(action="confirm").pack())
 async def admin_reset_db_confirm(call: CallbackQuery):
     try:
         reset_all_data()
+        admin_card_cache.clear()
+        review_queue.restart()
         file_path = Path("applications.xlsx")
         if file_path.exists():
             file_path.unlink()
@@ -4358,13 +5520,13 @@ async def admin_reset_db_confirm(call: CallbackQuery):
         )
     await safe_call_answer(call)
 
-@dp.callback_query(F.data == "admin_reset_db:cancel")
+@callback_router.exact(AdminResetDb(action="cancel").pack())
 async def admin_reset_db_cancel(call: CallbackQuery):
     await post_admin_menu()
     await safe_call_answer(call, "Отменено")
 
         
-@dp.callback_query(F.data == "portfolio_reviews")
+@callback_router.exact("portfolio_reviews")
 async def portfolio_reviews(call: CallbackQuery):
     try:
         lang = lang_for(call.from_user.id)
@@ -4372,17 +5534,18 @@ async def portfolio_reviews(call: CallbackQuery):
             await safe_call_answer(call, t(lang, "temp_error_retry"), show_alert=False)
             return
         await clear_portfolio_media(call.from_user.id)
-        messages = await call.message.answer_media_group([
-            InputMediaPhoto(media=FSInputFile("media/review1.jpg")),
-            InputMediaPhoto(media=FSInputFile("media/review2.jpg")),
-        ])
+        messages = await send_cached_media_group(
+            PORTFOLIO_REVIEW_PATHS,
+            InputMediaPhoto,
+            call.message.answer_media_group,
+        )
         track_portfolio_media(call.from_user.id, [m.message_id for m in messages])
         await safe_call_answer(call)
     except Exception:
         logger.exception("Ошибка в portfolio_reviews")
         await safe_call_answer(call, t(lang_for(call.from_user.id), "portfolio_send_error"), show_alert=False)
 
-@dp.callback_query(F.data == "portfolio_videos")
+@callback_router.exact("portfolio_videos")
 async def portfolio_streams(call: CallbackQuery):
     try:
         lang = lang_for(call.from_user.id)
@@ -4396,17 +5559,25 @@ async def portfolio_streams(call: CallbackQuery):
             await safe_call_answer(call, t(lang, "video_cooldown"))
             return
         PORTFOLIO_VIDEO_LAST[call.from_user.id] = now
-        messages = await call.message.answer_media_group([
-            InputMediaVideo(media=FSInputFile("media/stream1.MP4")),
-            InputMediaVideo(media=FSInputFile("media/stream2.MP4")),
-        ])
+        PORTFOLIO_VIDEO_LAST.move_to_end(call.from_user.id)
+        # Отметки старше кулдауна уже ни на что не влияют — держим только свежие.
+        while PORTFOLIO_VIDEO_LAST:
+            oldest = next(iter(PORTFOLIO_VIDEO_LAST.values()))
+            if (now - oldest).total_seconds() < PORTFOLIO_COOLDOWN_SECONDS:
+                break
+            PORTFOLIO_VIDEO_LAST.popitem(last=False)
+        messages = await send_cached_media_group(
+            PORTFOLIO_STREAM_PATHS,
+            InputMediaVideo,
+            call.message.answer_media_group,
+        )
         track_portfolio_media(call.from_user.id, [m.message_id for m in messages])
         await safe_call_answer(call)
     except Exception:
         logger.exception("Ошибка в portfolio_streams")
         await safe_call_answer(call, t(lang_for(call.from_user.id), "video_send_error"), show_alert=False)
 
-@dp.callback_query(F.data == "portfolio_pdf")
+@callback_router.exact("portfolio_pdf")
 async def portfolio_pdf(call: CallbackQuery):
     try:
         lang = lang_for(call.from_user.id)
@@ -4415,22 +5586,227 @@ async def portfolio_pdf(call: CallbackQuery):
             return
         await clear_portfolio_media(call.from_user.id)
         base_dir = Path(__file__).resolve().parent
-        candidates = [
-            base_dir / "media" / "portfolio.pdf",
-            base_dir / "web" / "assets" / "portfolio.pdf",
-        ]
-        pdf_path = next((p for p in candidates if p.exists()), None)
+        pdf_path = next((base_dir / p for p in PORTFOLIO_PDF_CANDIDATES if (base_dir / p).exists()), None)
         if not pdf_path:
             raise FileNotFoundError("portfolio.pdf не найден ни в media, ни в web/assets")
-        msg = await call.message.answer_document(
-            FSInputFile(str(pdf_path))
-        )
+        msg = await send_cached_media(pdf_path, call.message.answer_document)
         track_portfolio_media(call.from_user.id, [msg.message_id])
         await safe_call_answer(call)
     except Exception:
         logger.exception("Ошибка в portfolio_pdf")
         await safe_call_answer(call, t(lang_for(call.from_user.id), "pdf_send_error"), show_alert=False)
 
+# ================= BROADCAST =================
+
+def parse_broadcast_filters(text: str) -> dict:
+    filters: dict = {}
+    for token in (text or "").split()[1:]:
+        key, sep, value = token.partition("=")
+        key = key.strip().lower()
+        value = value.strip().lower()
+        if not sep or not value:
+            raise ValueError(f"⚠️ Не понял фильтр «{html.escape(token)}». Формат: status=accepted lang=en source=bot country=brasil")
+        if key == "status":
+            statuses = [item for item in value.split(",") if item]
+            unknown = [item for item in statuses if item not in BROADCAST_STATUSES]
+            if unknown:
+                raise ValueError("⚠️ Неизвестный статус: " + html.escape(", ".join(unknown)))
+            filters["status"] = statuses
+        elif key == "lang":
+            if value not in LANGUAGE_NAMES:
+                raise ValueError(f"⚠️ Неизвестный язык: {html.escape(value)}")
+            filters["lang"] = value
+        elif key == "source":
+            filters["source"] = value
+        elif key == "country":
+            filters["country"] = country_key(value)
+        else:
+            raise ValueError(f"⚠️ Неизвестный фильтр: {html.escape(key)}")
+    return filters
+
+
+def broadcast_audience(filters: dict) -> list[int]:
+    return list_broadcast_audience(
+        statuses=filters.get("status"),
+        lang=filters.get("lang"),
+        source=filters.get("source"),
+        country=filters.get("country"),
+    )
+
+
+def format_broadcast_filters(filters: dict) -> str:
+    parts = []
+    if filters.get("status"):
+        parts.append("статус: " + ", ".join(status_label(status, "ru") for status in filters["status"]))
+    if filters.get("lang"):
+        parts.append("язык: " + html.escape(LANGUAGE_NAMES.get(filters["lang"], filters["lang"])))
+    if filters.get("source"):
+        parts.append("источник: " + html.escape(filters["source"]))
+    if filters.get("country"):
+        parts.append("страна: " + html.escape(filters["country"]))
+    return "; ".join(parts) or "все пользователи"
+
+
+def _format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "неизвестно"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} с"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes} мин {seconds} с"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} ч {minutes} мин"
+
+
+def format_broadcast_progress(job: dict, stats: dict) -> str:
+    counts = job["counts"]
+    done = counts["sent"] + counts["failed"] + counts["unreachable"]
+    titles = {
+        "done": "✅ Рассылка #{id} завершена",
+        "cancelled": "⛔ Рассылка #{id} остановлена",
+        "failed": "⚠️ Рассылка #{id} прервана",
+    }
+    title = titles.get(job["status"], "📣 Рассылка #{id}").format(id=job["id"])
+    lines = [
+        title,
+        f"Аудитория: {format_broadcast_filters(job['filters'])}",
+        f"Обработано: {done} из {job['total']}",
+        f"Доставлено: {counts['sent']}",
+        f"Недоступны: {counts['unreachable']}",
+        f"Ошибки: {counts['failed']}",
+    ]
+    if stats.get("rate"):
+        lines.append(f"Скорость: {stats['rate']:.1f} сообщ./с")
+    if job["status"] == "running":
+        lines.append(f"Осталось: ~{_format_eta(stats.get('eta'))}")
+    return "\n".join(lines)
+
+
+async def report_broadcast_progress(job: dict, stats: dict) -> None:
+    if not job.get("progress_chat_id") or not job.get("progress_message_id"):
+        return
+    reply_markup = admin_broadcast_progress_keyboard(job["id"]) if job["status"] == "running" else None
+    try:
+        await bot.edit_message_text(
+            format_broadcast_progress(job, stats),
+            chat_id=job["progress_chat_id"],
+            message_id=job["progress_message_id"],
+            reply_markup=reply_markup,
+        )
+    except TelegramBadRequest as exc:
+        if "message is not modified" not in str(exc).lower():
+            raise
+
+
+broadcast_runner = BroadcastRunner(
+    bot,
+    rate_per_second=BROADCAST_RATE_PER_SECOND,
+    concurrency=BROADCAST_CONCURRENCY,
+    progress_interval=BROADCAST_PROGRESS_SECONDS,
+    on_progress=report_broadcast_progress,
+)
+
+
+@dp.message(Command("broadcast"), F.chat.id == ADMIN_GROUP_ID)
+async def admin_broadcast_command(message: Message, state: FSMContext):
+    if not await can_manage_admin_group(message):
+        await message.answer("Недостаточно прав")
+        return
+    try:
+        filters = parse_broadcast_filters(message.text or "")
+    except ValueError as exc:
+        await message.answer(str(exc))
+        return
+    total = len(broadcast_audience(filters))
+    if not total:
+        await message.answer(f"🤍 Нет получателей ({format_broadcast_filters(filters)}).")
+        return
+    await state.set_state(ApplicationStates.admin_broadcast_message)
+    await state.update_data(broadcast_filters=filters)
+    await message.answer(
+        f"📣 Получателей: {total} ({format_broadcast_filters(filters)}).\n"
+        "Отправь сообщение для рассылки — оно будет скопировано пользователям как есть.",
+        reply_markup=admin_broadcast_cancel_keyboard(),
+    )
+
+
+@dp.message(StateFilter(ApplicationStates.admin_broadcast_message), F.chat.id == ADMIN_GROUP_ID)
+async def admin_broadcast_message_submit(message: Message, state: FSMContext):
+    if message.text and message.text.strip().startswith("/"):
+        await message.answer("⚠️ Сейчас включён режим рассылки. Отправь сообщение или нажми «Отменить».")
+        return
+    if message.media_group_id:
+        await message.answer("⚠️ Альбомы не поддерживаются. Отправь одно сообщение.")
+        return
+    data = await state.get_data()
+    filters = data.get("broadcast_filters") or {}
+    total = len(broadcast_audience(filters))
+    await state.set_state(ApplicationStates.admin_broadcast_confirm)
+    await state.update_data(broadcast_chat_id=message.chat.id, broadcast_message_id=message.message_id)
+    await message.reply(
+        f"Разослать это сообщение? Получателей: {total} ({format_broadcast_filters(filters)}).",
+        reply_markup=admin_broadcast_confirm_keyboard(total),
+    )
+
+
+@callback_router.route(AdminBroadcast)
+async def admin_broadcast_action(call: CallbackQuery, state: FSMContext, callback_data: AdminBroadcast):
+    if not await can_manage_admin_callback(call):
+        await safe_call_answer(call, "Недостаточно прав", show_alert=True)
+        return
+    action = callback_data.action
+    if action == "cancel":
+        await state.clear()
+        await safe_call_answer(call, "Отменено")
+        try:
+            await call.message.edit_text("❌ Рассылка отменена.")
+        except TelegramBadRequest:
+            pass
+        return
+    if await state.get_state() != ApplicationStates.admin_broadcast_confirm.state:
+        await safe_call_answer(call, "Рассылка уже запущена или устарела", show_alert=True)
+        return
+    data = await state.get_data()
+    await state.clear()
+    filters = data.get("broadcast_filters") or {}
+    user_ids = broadcast_audience(filters)
+    if not user_ids:
+        await safe_call_answer(call, "Нет получателей", show_alert=True)
+        return
+    try:
+        job_id = create_broadcast_job(
+            data["broadcast_chat_id"],
+            data["broadcast_message_id"],
+            filters,
+            user_ids,
+        )
+        set_broadcast_progress_message(job_id, call.message.chat.id, call.message.message_id)
+    except Exception:
+        logger.exception("Не удалось создать рассылку")
+        await safe_call_answer(call, "Не удалось создать рассылку", show_alert=True)
+        return
+    await safe_call_answer(call, "Рассылка запущена")
+    job = get_broadcast_job(job_id)
+    if job:
+        await report_broadcast_progress(job, {})
+    # На остальных репликах задача остаётся в очереди, лидер подхватит её в течение минуты.
+    if leader_election.is_leader:
+        broadcast_runner.start(job_id)
+
+
+@callback_router.route(AdminBroadcastStop)
+async def admin_broadcast_stop(call: CallbackQuery, callback_data: AdminBroadcastStop):
+    if not await can_manage_admin_callback(call):
+        await safe_call_answer(call, "Недостаточно прав", show_alert=True)
+        return
+    if await broadcast_runner.cancel(callback_data.job_id):
+        await safe_call_answer(call, "Рассылка остановлена")
+    else:
+        await safe_call_answer(call, "Рассылка уже завершена", show_alert=False)
+
+
 # ================= ADMIN STATS =================
 
 @dp.message(F.text == "/stats", F.chat.id == ADMIN_GROUP_ID)
@@ -4439,6 +5815,45 @@ async def admin_stats(message: Message):
     msg = await message.answer(build_admin_stats_text())
     track_admin_temp_message(msg.message_id)
 
+@dp.message(F.text == "/metrics", F.chat.id == ADMIN_GROUP_ID)
+async def admin_metrics(message: Message):
+    await clear_admin_temp_messages()
+    msg = await message.answer(build_admin_metrics_text())
+    track_admin_temp_message(msg.message_id)
+
+@dp.message(Command("find"), F.chat.id == ADMIN_GROUP_ID)
+async def admin_find(message: Message):
+    await clear_admin_temp_messages()
+    parts = (message.text or "").split(maxsplit=1)
+    query = parts[1].strip()[:ADMIN_FIND_QUERY_LIMIT] if len(parts) > 1 else ""
+    terms, filters = parse_search_query(query)
+    if not terms and not filters:
+        msg = await message.answer(
+            "🔎 Что искать? Например: /find Анна, /find +7 912, /find @nick, /find Lisboa\n"
+            "Фильтры: status=pending country=brasil lang=pt phone=+5511999999999 telegram=@nick birthdate=01.02.2000"
+        )
+        track_admin_temp_message(msg.message_id)
+        return
+    invalid = [key for key, value in filters.items() if value is None]
+    if invalid:
+        msg = await message.answer("⚠️ Не понял фильтр: " + ", ".join(invalid))
+        track_admin_temp_message(msg.message_id)
+        return
+    set_setting(ADMIN_FIND_SETTING_KEY, query)
+    await clear_admin_view_message()
+    await show_admin_find_page(0)
+
+@dp.message(F.text == "/prewarm_media", F.chat.id == ADMIN_GROUP_ID)
+async def admin_prewarm_media(message: Message):
+    await clear_admin_temp_messages()
+    if MEDIA_PREWARM_TASK is not None and not MEDIA_PREWARM_TASK.done():
+        msg = await message.answer("⏳ Предзагрузка медиа уже идёт.")
+        track_admin_temp_message(msg.message_id)
+        return
+    progress_msg = await message.answer("⏳ Предзагрузка медиа: подготовка...")
+    track_admin_temp_message(progress_msg.message_id)
+    start_media_prewarm(progress_message=progress_msg, force=True)
+
 @dp.message(F.text == "/excel", F.chat.id == ADMIN_GROUP_ID)
 async def admin_excel(message: Message):
     await clear_admin_temp_messages()
@@ -4455,6 +5870,117 @@ async def admin_excel(message: Message):
     track_admin_temp_message(msg.message_id)
 # ================= RUN =================
 
+def format_media_prewarm_report(report: dict, finished: bool = False) -> str:
+    title = "✅ Предзагрузка медиа завершена" if finished else "⏳ Предзагрузка медиа"
+    lines = [
+        f"{title}: {report['done']}/{report['total']}",
+        f"Загружено: {report['uploaded']}",
+        f"Уже в кеше: {report['cached']}",
+    ]
+    if report["failed"]:
+        lines.append("Ошибки: " + ", ".join(report["failed"]))
+    return "\n".join(lines)
+
+
+async def run_media_prewarm(progress_message: Message | None = None, force: bool = False) -> dict | None:
+    set_outbound_priority(PRIORITY_BACKGROUND)
+    # Без отдельного чата-хранилища грузим в админ-группу и сразу удаляем сообщения.
+    storage_chat_id = MEDIA_STORAGE_CHAT_ID or ADMIN_GROUP_ID
+    delete_after = MEDIA_STORAGE_CHAT_ID is None
+    last_edit = 0.0
+
+    async def on_progress(report: dict) -> None:
+        nonlocal last_edit
+        if progress_message is None:
+            return
+        now = asyncio.get_running_loop().time()
+        if report["done"] < report["total"] and now - last_edit < MEDIA_PREWARM_PROGRESS_SECONDS:
+            return
+        last_edit = now
+        try:
+            await progress_message.edit_text(format_media_prewarm_report(report))
+        except TelegramBadRequest:
+            pass
+
+    try:
+        report = await prewarm_media(
+            bot,
+            storage_chat_id,
+            concurrency=MEDIA_PREWARM_CONCURRENCY,
+            delete_after=delete_after,
+            force=force,
+            progress=on_progress,
+        )
+    except Exception:
+        logger.exception("Ошибка предзагрузки медиа")
+        return None
+    logger.info(
+        "Предзагрузка медиа: загружено %s, в кеше %s, ошибок %s",
+        report["uploaded"],
+        report["cached"],
+        len(report["failed"]),
+    )
+    if progress_message is not None:
+        try:
+            await progress_message.edit_text(format_media_prewarm_report(report, finished=True))
+        except TelegramBadRequest:
+            pass
+    return report
+
+
+def start_media_prewarm(progress_message: Message | None = None, force: bool = False) -> asyncio.Task:
+    global MEDIA_PREWARM_TASK
+    if MEDIA_PREWARM_TASK is None or MEDIA_PREWARM_TASK.done():
+        MEDIA_PREWARM_TASK = asyncio.create_task(
+            run_media_prewarm(progress_message=progress_message, force=force),
+            name="media_prewarm_task",
+        )
+    return MEDIA_PREWARM_TASK
+
+
+async def on_leader_elected():
+    try:
+        await adopt_deletions_job()
+    except Exception:
+        logger.exception("Не удалось подхватить отложенные удаления")
+    try:
+        indexed = await asyncio.to_thread(backfill_application_fields)
+        if indexed:
+            logger.info("Поля анкет и поисковый индекс дозаполнены: %s", indexed)
+    except Exception:
+        logger.exception("Не удалось дозаполнить поля анкет")
+    await ensure_admin_menu_posted()
+    job_scheduler.start()
+    if MEDIA_PREWARM_ON_STARTUP:
+        start_media_prewarm()
+    try:
+        broadcast_runner.resume()
+    except Exception:
+        logger.exception("Не удалось возобновить рассылки")
+    try:
+        bulk_runner.resume()
+    except Exception:
+        logger.exception("Не удалось возобновить массовые решения")
+
+
+async def on_leader_demoted():
+    # Другая реплика уже подхватила расписание и рассылки — всё фоновое здесь останавливаем.
+    await job_scheduler.shutdown()
+    await broadcast_runner.shutdown()
+    await bulk_runner.shutdown()
+    if MEDIA_PREWARM_TASK is not None and not MEDIA_PREWARM_TASK.done():
+        MEDIA_PREWARM_TASK.cancel()
+        await asyncio.gather(MEDIA_PREWARM_TASK, return_exceptions=True)
+
+
+leader_election = LeaderElection(
+    "bot",
+    lease_seconds=LEADER_LEASE_SECONDS,
+    on_elected=on_leader_elected,
+    on_demoted=on_leader_demoted,
+)
+
+
 async def main():
     logger.info("БОТ ЗАПУЩЕН")
     try:
@@ -4466,15 +5992,10 @@ async def main():
     missing_langs = missing_crosspost_langs(channels)
     if missing_langs:
         logger.warning("Не настроены каналы кросспоста: %s", ", ".join(missing_langs))
-    try:
-        cleanup_old_form_data()
-    except Exception:
-        logger.exception("Ошибка очистки старых данных")
-    await ensure_admin_menu_posted()
-    tasks = [
-        asyncio.create_task(daily_stats_task(), name="daily_stats_task"),
-        asyncio.create_task(archive_admin_messages_task(), name="archive_admin_messages_task"),
-    ]
+    for table, keys in missing_catalog_keys().items():
+        logger.warning("Нет переводов (%s), используется русский: %s", table, ", ".join(keys))
+    deletion_scheduler.start()
+    leader_election.start()
     try:
         try:
             await bot.delete_webhook(drop_pending_updates=False)
@@ -4482,9 +6003,17 @@ async def main():
             logger.exception("Не удалось удалить webhook перед polling")
         await run_polling_forever()
     finally:
-        for task in tasks:
-            task.cancel()
-        await asyncio.gather(*tasks, return_exceptions=True)
+        if MEDIA_PREWARM_TASK is not None:
+            MEDIA_PREWARM_TASK.cancel()
+            await asyncio.gather(MEDIA_PREWARM_TASK, return_exceptions=True)
+        await leader_election.stop()
+        await deletion_scheduler.shutdown()
+        # Решения из «Разбора» уже записаны: дожидаемся уведомлений кандидатам и правок карточек, а не отменяем их.
+        await asyncio.gather(*DECISION_FOLLOWUP_TASKS, return_exceptions=True)
+        await review_queue.shutdown()
+        await bulk_runner.shutdown()
+        await broadcast_runner.shutdown()
+        await admin_coalescer.flush()
         await bot.session.close()
 
 
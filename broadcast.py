@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from database import (
+    get_broadcast_job,
+    get_broadcast_job_status,
+    get_pending_broadcast_recipients,
+    list_broadcast_job_ids,
+    set_broadcast_job_status,
+    set_broadcast_recipient_results,
+)
+from rate_limiter import PRIORITY_BACKGROUND, TokenBucket, set_outbound_priority
+from reachability import is_unreachable_error, is_user_reachable
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_BATCH_SIZE = 50
+# Если исходное сообщение удалили из админ-группы, продолжать рассылку бессмысленно.
+SOURCE_MISSING_MARKERS = (
+    "message to copy not found",
+    "message_id_invalid",
+)
+
+
+class BroadcastSourceMissing(Exception):
+    pass
+
+
+def classify_send_error(exc: Exception) -> str:
+    if isinstance(exc, TelegramBadRequest):
+        if any(marker in str(exc).lower() for marker in SOURCE_MISSING_MARKERS):
+            raise BroadcastSourceMissing(str(exc)) from exc
+    if is_unreachable_error(exc):
+        return "unreachable"
+    return "failed"
+
+
+class BroadcastRunner:
+    def __init__(
+        self,
+        bot,
+        rate_per_second: float = 20.0,
+        concurrency: int = 5,
+        progress_interval: float = 5.0,
+        on_progress: Callable[[dict, dict], Awaitable[None]] | None = None,
+    ):
+        self.bot = bot
+        self.rate_per_second = rate_per_second
+        self.concurrency = max(1, concurrency)
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+        self.tasks: dict[int, asyncio.Task] = {}
+
+    def is_running(self, job_id: int) -> bool:
+        task = self.tasks.get(job_id)
+        return task is not None and not task.done()
+
+    def start(self, job_id: int) -> asyncio.Task:
+        task = self.tasks.get(job_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._run(job_id), name=f"broadcast_job_{job_id}")
+            self.tasks[job_id] = task
+            task.add_done_callback(lambda _task, key=job_id: self._forget(key, _task))
+        return task
+
+    def _forget(self, job_id: int, task: asyncio.Task) -> None:
+        if self.tasks.get(job_id) is task:
+            del self.tasks[job_id]
+
+    def resume(self) -> list[int]:
+        job_ids = list_broadcast_job_ids(("pending", "running"))
+        for job_id in job_ids:
+            self.start(job_id)
+        if job_ids:
+            logger.info("Возобновлены рассылки: %s", ", ".join(str(job_id) for job_id in job_ids))
+        return job_ids
+
+    async def cancel(self, job_id: int) -> bool:
+        job = get_broadcast_job(job_id)
+        if not job or job["status"] not in {"pending", "running"}:
+            return False
+        set_broadcast_job_status(job_id, "cancelled")
+        task = self.tasks.get(job_id)
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self._report(job_id, {"rate": 0.0, "finished": True})
+        return True
+
+    async def shutdown(self) -> None:
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _report(self, job_id: int, stats: dict) -> None:
+        if self.on_progress is None:
+            return
+        job = get_broadcast_job(job_id)
+        if not job:
+            return
+        rate = stats.get("rate") or 0.0
+        pending = job["counts"]["pending"]
+        if not pending:
+            stats["eta"] = 0.0
+        else:
+            stats["eta"] = pending / rate if rate > 0 else None
+        try:
+            await self.on_progress(job, stats)
+        except Exception:
+            logger.exception("Ошибка обновления прогресса рассылки #%s", job_id)
+
+    async def _send_one(self, job: dict, user_id: int, bucket: TokenBucket) -> tuple[int, str, str | None] | None:
+        if not is_user_reachable(user_id):
+            return user_id, "unreachable", "skipped: marked unreachable"
+        while True:
+            wait = bucket.delay(time.monotonic())
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        bucket.take(time.monotonic())
+        try:
+            await self.bot.copy_message(
+                chat_id=user_id,
+                from_chat_id=job["source_chat_id"],
+                message_id=job["source_message_id"],
+            )
+        except TelegramRetryAfter as exc:
+            # Middleware уже исчерпал повторы: оставляем получателя в очереди и притормаживаем всю рассылку.
+            bucket.block(time.monotonic(), exc.retry_after)
+            return None
+        except Exception as exc:
+            status = classify_send_error(exc)
+            return user_id, status, str(exc)[:500]
+        return user_id, "sent", None
+
+    async def _run(self, job_id: int) -> None:
+        set_outbound_priority(PRIORITY_BACKGROUND)
+        job = get_broadcast_job(job_id)
+        if not job or job["status"] not in {"pending", "running"}:
+            return
+        set_broadcast_job_status(job_id, "running")
+        bucket = TokenBucket(self.rate_per_second, max(1.0, self.rate_per_second))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started_at = time.monotonic()
+        processed = 0
+        last_report = 0.0
+
+        async def guarded(user_id: int, completed: list, source_missing: list):
+            async with semaphore:
+                if source_missing:
+                    return
+                try:
+                    result = await self._send_one(job, user_id, bucket)
+                except BroadcastSourceMissing as exc:
+                    source_missing.append(exc)
+                    return
+                if result is not None:
+                    completed.append(result)
+
+        try:
+            while True:
+                # Остановить рассылку могли с другой реплики — проверяем статус перед каждой пачкой.
+                if get_broadcast_job_status(job_id) != "running":
+                    logger.info("Рассылка #%s остановлена извне", job_id)
+                    return
+                batch = get_pending_broadcast_recipients(job_id, BROADCAST_BATCH_SIZE)
+                if not batch:
+                    break
+                completed: list[tuple[int, str, str | None]] = []
+                source_missing: list[BroadcastSourceMissing] = []
+                try:
+                    await asyncio.gather(*(guarded(user_id, completed, source_missing) for user_id in batch))
+                finally:
+                    # Результаты пишем и при отмене (остановка, смена лидера): иначе resume повторит
+                    # отправку тем, кто сообщение уже получил.
+                    if completed:
+                        set_broadcast_recipient_results(job_id, completed)
+                processed += len(completed)
+                if source_missing:
+                    raise source_missing[0]
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    rate = processed / max(now - started_at, 0.001)
+                    await self._report(job_id, {"rate": rate, "finished": False})
+        except BroadcastSourceMissing:
+            logger.warning("Рассылка #%s остановлена: исходное сообщение не найдено", job_id)
+            set_broadcast_job_status(job_id, "failed")
+            await self._report(job_id, {"rate": 0.0, "finished": True})
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Ошибка рассылки #%s", job_id)
+            set_broadcast_job_status(job_id, "failed")
+            await self._report(job_id, {"rate": 0.0, "finished": True})
+            return
+        set_broadcast_job_status(job_id, "done")
+        elapsed = time.monotonic() - started_at
+        logger.info("Рассылка #%s завершена: %s получателей за %.1f с", job_id, processed, elapsed)
+        await self._report(
+            job_id,
+            {"rate": processed / max(elapsed, 0.001), "finished": True},
+        )
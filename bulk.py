@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from database import get_bulk_job, list_bulk_job_ids, set_bulk_job_state, set_bulk_job_user_results
+from rate_limiter import PRIORITY_BACKGROUND, TokenBucket, set_outbound_priority
+from reachability import is_user_reachable
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 50
+
+
+class BulkDecisionRunner:
+    # Статусы заявок и задача записываются одной транзакцией (create_bulk_job) до запуска.
+    # Здесь в фоне и с ограничением скорости уведомляем кандидатов, результат по каждому сохраняем,
+    # а в конце один раз вызываем finish (Excel, карточки в админ-группе, меню).
+    # Прерванную задачу (перезапуск, смена лидера) resume доводит до конца без повторных уведомлений.
+    def __init__(
+        self,
+        notify: Callable[[int, dict], Awaitable[bool | None]],
+        finish: Callable[[dict], Awaitable[None]],
+        rate_per_second: float = 20.0,
+        concurrency: int = 5,
+        progress_interval: float = 5.0,
+        on_progress: Callable[[dict], Awaitable[None]] | None = None,
+    ):
+        self.notify = notify
+        self.finish = finish
+        self.rate_per_second = rate_per_second
+        self.concurrency = max(1, concurrency)
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def start(self, job_id: int) -> asyncio.Task:
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._run(job_id), name=f"bulk_decision_{job_id}")
+            self._tasks[job_id] = task
+            task.add_done_callback(lambda _task, key=job_id: self._forget(key, _task))
+        return task
+
+    def _forget(self, job_id: int, task: asyncio.Task) -> None:
+        if self._tasks.get(job_id) is task:
+            del self._tasks[job_id]
+
+    def resume(self) -> list[int]:
+        job_ids = [job_id for job_id in list_bulk_job_ids() if job_id not in self._tasks]
+        for job_id in job_ids:
+            self.start(job_id)
+        if job_ids:
+            logger.info("Возобновлены массовые решения: %s", ", ".join(str(job_id) for job_id in job_ids))
+        return job_ids
+
+    def _load(self, job_id: int) -> dict | None:
+        stored = get_bulk_job(job_id)
+        if not stored or stored["state"] not in {"running", "finishing"}:
+            return None
+        counts = stored["counts"]
+        return {
+            "id": stored["id"],
+            "status": stored["decision"],
+            "user_ids": stored["user_ids"],
+            "pending": stored["pending"] if stored["state"] == "running" else [],
+            "total": stored["total"],
+            "notified": counts["notified"],
+            "unreachable": counts["unreachable"],
+            "failed": counts["failed"],
+            "notifications_done": False,
+            "finished": False,
+            "started_at": time.monotonic(),
+            "elapsed": 0.0,
+            "reason_code": stored["reason_code"],
+            "progress_message_id": stored["progress_message_id"],
+        }
+
+    async def _report(self, job: dict) -> None:
+        if self.on_progress is None:
+            return
+        job["elapsed"] = time.monotonic() - job["started_at"]
+        try:
+            await self.on_progress(job)
+        except Exception:
+            logger.exception("Ошибка обновления прогресса массового решения #%s", job["id"])
+
+    async def _notify_one(self, job: dict, user_id: int, bucket: TokenBucket) -> str:
+        if not is_user_reachable(user_id):
+            return "unreachable"
+        for _ in range(2):
+            while True:
+                wait = bucket.delay(time.monotonic())
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            bucket.take(time.monotonic())
+            try:
+                if await self.notify(user_id, job) is not False:
+                    return "notified"
+                break
+            except TelegramRetryAfter as exc:
+                # Притормаживаем всю пачку и пробуем ещё раз.
+                bucket.block(time.monotonic(), exc.retry_after)
+            except Exception:
+                logger.exception("Не удалось уведомить кандидата %s (массовое решение #%s)", user_id, job["id"])
+                break
+        return "failed"
+
+    async def _run(self, job_id: int) -> None:
+        set_outbound_priority(PRIORITY_BACKGROUND)
+        job = self._load(job_id)
+        if job is None:
+            return
+        bucket = TokenBucket(self.rate_per_second, max(1.0, self.rate_per_second))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_report = time.monotonic()
+
+        async def guarded(user_id: int, completed: list):
+            nonlocal last_report
+            async with semaphore:
+                status = await self._notify_one(job, user_id, bucket)
+            job[status] += 1
+            completed.append((user_id, status))
+            now = time.monotonic()
+            if now - last_report >= self.progress_interval:
+                last_report = now
+                await self._report(job)
+
+        pending = job["pending"]
+        for start in range(0, len(pending), BULK_BATCH_SIZE):
+            completed: list[tuple[int, str]] = []
+            try:
+                await asyncio.gather(*(guarded(user_id, completed) for user_id in pending[start:start + BULK_BATCH_SIZE]))
+            finally:
+                # Сохраняем и при отмене: после перезапуска уведомлённым второй раз не пишем.
+                set_bulk_job_user_results(job_id, completed)
+        set_bulk_job_state(job_id, "finishing")
+        job["notifications_done"] = True
+        await self._report(job)
+        try:
+            await self.finish(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Ошибка завершения массового решения #%s", job["id"])
+        set_bulk_job_state(job_id, "done")
+        job["finished"] = True
+        await self._report(job)
+        logger.info(
+            "Массовое решение #%s (%s): %s заявок за %.1f с",
+            job["id"], job["status"], job["total"], job["elapsed"],
+        )
+
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks.values())
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
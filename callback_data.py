@@ -0,0 +1,144 @@
+from aiogram.filters.callback_data import CallbackData
+
+
+class CompatCallbackData(CallbackData, prefix="compat"):
+    # Старые кнопки в чатах остаются без необязательных хвостовых полей
+    # (например, "admin_accept:123" без ":view"): недостающие поля берут значение
+    # по умолчанию, а пустые хвосты при упаковке не дописываются.
+    @classmethod
+    def unpack(cls, value: str):
+        prefix, *parts = value.split(cls.__separator__)
+        if prefix != cls.__prefix__:
+            raise ValueError(f"Bad prefix ({prefix!r} != {cls.__prefix__!r})")
+        if len(parts) > len(cls.model_fields):
+            raise TypeError(f"Callback data {cls.__name__!r} got too many arguments")
+        payload = {}
+        for (name, field), part in zip(cls.model_fields.items(), parts):
+            if part == "" and not field.is_required():
+                continue
+            payload[name] = part
+        return cls(**payload)
+
+    def pack(self) -> str:
+        parts = super().pack().split(self.__separator__)
+        fields = list(self.model_fields.values())
+        while len(parts) > 1 and parts[-1] == "" and not fields[len(parts) - 2].is_required():
+            parts.pop()
+        return self.__separator__.join(parts)
+
+
+class SetLang(CompatCallbackData, prefix="set_lang"):
+    lang: str
+
+
+class EditField(CompatCallbackData, prefix="edit"):
+    field: str
+
+
+class EditPhoto(CompatCallbackData, prefix="edit_photo"):
+    kind: str
+
+
+class AdminAccept(CompatCallbackData, prefix="admin_accept"):
+    user_id: int
+    mode: str | None = None
+    # Для mode="compact": на какую страницу компактного списка вернуться после решения.
+    filter_key: str | None = None
+    offset: int | None = None
+
+
+class AdminReject(CompatCallbackData, prefix="admin_reject"):
+    user_id: int
+    mode: str | None = None
+    filter_key: str | None = None
+    offset: int | None = None
+
+
+class RejectTemplate(CompatCallbackData, prefix="reject_tpl"):
+    code: str
+
+
+class AdminStatus(CompatCallbackData, prefix="admin_status"):
+    user_id: int
+    status: str
+
+
+class AdminPhotos(CompatCallbackData, prefix="admin_photos"):
+    user_id: int
+
+
+class AdminMenu(CompatCallbackData, prefix="admin_menu"):
+    action: str
+
+
+class AdminPost(CompatCallbackData, prefix="admin_post"):
+    action: str
+
+
+class AdminResetDb(CompatCallbackData, prefix="admin_reset_db"):
+    action: str
+
+
+class AdminList(CompatCallbackData, prefix="admin_list"):
+    filter_key: str
+    offset: int = 0
+
+
+class AdminReview(CompatCallbackData, prefix="admin_review"):
+    action: str
+    user_id: int | None = None
+
+
+class AdminBulk(CompatCallbackData, prefix="admin_bulk"):
+    action: str
+    value: str | None = None
+
+
+class AdminCompact(CompatCallbackData, prefix="admin_compact"):
+    filter_key: str
+    offset: int = 0
+
+
+class AdminCompactOpen(CompatCallbackData, prefix="admin_compact_open"):
+    user_id: int
+    filter_key: str
+    offset: int = 0
+
+
+class AdminViewPhoto(CompatCallbackData, prefix="admin_view_photo"):
+    user_id: int
+    kind: str
+    filter_key: str
+    offset: int = 0
+
+
+class AdminPosts(CompatCallbackData, prefix="admin_posts"):
+    offset: int = 0
+
+
+class AdminPostDelete(CompatCallbackData, prefix="admin_post_delete"):
+    post_id: int
+    offset: int = 0
+
+
+class AdminPostEditText(CompatCallbackData, prefix="admin_post_edit_text"):
+    post_id: int
+    offset: int = 0
+
+
+class AdminPostEditPhoto(CompatCallbackData, prefix="admin_post_edit_photo"):
+    post_id: int
+    offset: int = 0
+
+
+class AdminPostEditCancel(CompatCallbackData, prefix="admin_post_edit_cancel"):
+    post_id: int
+    offset: int = 0
+
+
+class AdminBroadcast(CompatCallbackData, prefix="admin_broadcast"):
+    action: str
+
+
+class AdminBroadcastStop(CompatCallbackData, prefix="admin_broadcast_stop"):
+    job_id: int
@@ -0,0 +1,76 @@
+import inspect
+import logging
+from typing import Awaitable, Callable
+
+from aiogram.types import CallbackQuery
+
+from callback_data import CompatCallbackData
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackRoute:
+    __slots__ = ("handler", "factory", "params")
+
+    def __init__(self, handler: Callable[..., Awaitable], factory: type[CompatCallbackData] | None):
+        self.handler = handler
+        self.factory = factory
+        self.params = frozenset(inspect.signature(handler).parameters)
+
+
+class CallbackRouter:
+    def __init__(self, separator: str = ":"):
+        self.separator = separator
+        self._exact: dict[str, CallbackRoute] = {}
+        self._prefixed: dict[str, CallbackRoute] = {}
+        self.unmatched = 0
+        self.invalid = 0
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._prefixed)
+
+    def exact(self, *values: str):
+        def decorator(handler):
+            for value in values:
+                if value in self._exact:
+                    raise ValueError(f"Callback {value!r} уже зарегистрирован")
+                self._exact[value] = CallbackRoute(handler, None)
+            return handler
+
+        return decorator
+
+    def route(self, factory: type[CompatCallbackData]):
+        def decorator(handler):
+            prefix = factory.__prefix__
+            if prefix in self._prefixed:
+                raise ValueError(f"Префикс callback {prefix!r} уже зарегистрирован")
+            self._prefixed[prefix] = CallbackRoute(handler, factory)
+            return handler
+
+        return decorator
+
+    def resolve(self, data: str) -> tuple[CallbackRoute, CompatCallbackData | None] | None:
+        route = self._exact.get(data)
+        if route is not None:
+            return route, None
+        route = self._prefixed.get(data.split(self.separator, 1)[0])
+        if route is None:
+            self.unmatched += 1
+            return None
+        try:
+            return route, route.factory.unpack(data)
+        except (TypeError, ValueError) as exc:
+            self.invalid += 1
+            logger.warning("Некорректные callback-данные %r: %s", data, exc)
+            return None
+
+    async def dispatch(self, call: CallbackQuery, **context) -> bool:
+        resolved = self.resolve(call.data or "")
+        if resolved is None:
+            return False
+        route, callback_data = resolved
+        kwargs = {name: value for name, value in context.items() if name in route.params}
+        if callback_data is not None and "callback_data" in route.params:
+            kwargs["callback_data"] = callback_data
+        await route.handler(call, **kwargs)
+        return True
@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+DEFAULT_CARD_CACHE_SIZE = 1024
+
+
+class AdminCardCache:
+    # Готовые HTML-карточки заявок для админ-группы. На пользователя и вид карточки держим одну версию:
+    # она годится, пока совпадают статус и updated_at из БД (его обновляет любая запись в applications,
+    # в том числе с сайта и с другой реплики), старые версии просто вытесняются.
+    def __init__(self, maxsize: int = DEFAULT_CARD_CACHE_SIZE):
+        self.maxsize = max(1, maxsize)
+        self._cards: OrderedDict[tuple[int, str, bool], tuple[tuple[str, str | None], dict]] = OrderedDict()
+        self._kinds: set[tuple[str, bool]] = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, kind: str, archived: bool, status: str, updated_at: str | None) -> dict | None:
+        key = (user_id, kind, archived)
+        entry = self._cards.get(key)
+        if entry is None or entry[0] != (status, updated_at):
+            self.misses += 1
+            return None
+        self._cards.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user_id: int, kind: str, archived: bool, status: str, updated_at: str | None, card: dict) -> None:
+        key = (user_id, kind, archived)
+        self._kinds.add((kind, archived))
+        self._cards[key] = ((status, updated_at), card)
+        self._cards.move_to_end(key)
+        while len(self._cards) > self.maxsize:
+            self._cards.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        for kind, archived in self._kinds:
+            if self._cards.pop((user_id, kind, archived), None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._cards.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cards),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 5.0
+
+
+class AdminCoalescer:
+    # Ключ помечается «грязным», а отрисовка происходит не чаще раза за окно:
+    # одиночное событие рендерится сразу, пачка событий внутри окна схлопывается в один вызов.
+    def __init__(self, window: float = DEFAULT_WINDOW_SECONDS):
+        self.window = window
+        self._renders: dict[str, Callable[[int], Awaitable[None]]] = {}
+        self._marks: dict[str, int] = {}
+        self._last_run: dict[str, float] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._rendering: set[str] = set()
+        self._closing = False
+        self.marked = 0
+        self.rendered = 0
+
+    def mark_dirty(self, key: str, render: Callable[[int], Awaitable[None]]) -> None:
+        self.marked += 1
+        self._renders[key] = render
+        self._marks[key] = self._marks.get(key, 0) + 1
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            self._tasks[key] = asyncio.create_task(self._run(key), name=f"admin_coalesce_{key}")
+
+    async def _run(self, key: str) -> None:
+        # Пока идёт отрисовка, могут прийти новые отметки — их забираем следующим проходом.
+        while key in self._renders:
+            delay = self._last_run.get(key, 0.0) + self.window - time.monotonic()
+            if delay > 0 and not self._closing:
+                await asyncio.sleep(delay)
+            await self._render(key)
+
+    async def _render(self, key: str) -> None:
+        render = self._renders.pop(key, None)
+        count = self._marks.pop(key, 0)
+        if render is None:
+            return
+        self._last_run[key] = time.monotonic()
+        self.rendered += 1
+        self._rendering.add(key)
+        try:
+            await render(count)
+        except Exception:
+            logger.exception("Ошибка отложенного обновления админ-группы (%s)", key)
+        finally:
+            self._rendering.discard(key)
+
+    async def flush(self) -> None:
+        # Отрисовку, которая уже идёт, не прерываем: её отметки уже сняты и повторно не выполнятся.
+        # Отменяем только ожидание окна, оставшееся дорисовываем сразу.
+        self._closing = True
+        tasks = list(self._tasks.items())
+        for key, task in tasks:
+            if key not in self._rendering:
+                task.cancel()
+        await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+        self._tasks.clear()
+        for key in list(self._renders):
+            await self._render(key)
+
+    def stats(self) -> dict:
+        return {"marked": self.marked, "rendered": self.rendered, "pending": len(self._renders)}
+
+
+class ThreadedCoalescer:
+    def __init__(self, window: float = DEFAULT_WINDOW_SECONDS):
+        self.window = window
+        self._lock = threading.Lock()
+        self._renders: dict[str, Callable[[int], None]] = {}
+        self._marks: dict[str, int] = {}
+        self._last_run: dict[str, float] = {}
+        self._timers: dict[str, threading.Timer] = {}
+        # Все запущенные и ещё не завершившиеся таймеры, включая те, что уже рисуют.
+        self._alive: set[threading.Timer] = set()
+
+    def mark_dirty(self, key: str, render: Callable[[int], None]) -> None:
+        with self._lock:
+            self._renders[key] = render
+            self._marks[key] = self._marks.get(key, 0) + 1
+            if key in self._timers:
+                return
+            delay = max(0.0, self._last_run.get(key, 0.0) + self.window - time.monotonic())
+            timer = threading.Timer(delay, self._render, args=(key,))
+            timer.daemon = True
+            self._timers[key] = timer
+            self._alive.add(timer)
+        timer.start()
+
+    def _render(self, key: str) -> None:
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            render = self._renders.pop(key, None)
+            count = self._marks.pop(key, 0)
+            self._last_run[key] = time.monotonic()
+        try:
+            self._call(key, render, count)
+        finally:
+            with self._lock:
+                self._alive.discard(timer)
+
+    @staticmethod
+    def _call(key: str, render: Callable[[int], None] | None, count: int) -> None:
+        if render is None:
+            return
+        try:
+            render(count)
+        except Exception as err:
+            print("Coalesced admin update error:", key, err)
+
+    def flush(self) -> None:
+        # Таймеры — daemon-потоки: без flush при остановке сервера отложенные правки пропали бы.
+        with self._lock:
+            pending = list(self._timers.values())
+            self._timers.clear()
+            alive = list(self._alive)
+        for timer in pending:
+            timer.cancel()
+        current = threading.current_thread()
+        for timer in alive:
+            if timer is not current:
+                timer.join()
+        with self._lock:
+            renders = [(key, render, self._marks.pop(key, 0)) for key, render in self._renders.items()]
+            self._renders.clear()
+            self._alive.difference_update(pending)
+        for key, render, count in renders:
+            self._call(key, render, count)
@@ -30,7 +30,7 @@ def _get_env(name: str, required: bool = True) -> str | None:
 
 def _get_int_env(name: str, required: bool = True) -> int | None:
     value = _get_env(name, required=required)
-    if value is None:
+    if value is None or value.strip() == "":
         return None
     try:
         return int(value)
@@ -114,4 +114,5 @@ CHANNEL_ID_BY_LANG = {
 }
 CHANNEL_IDS = _dedupe_ids([CHANNEL_ID, CHANNEL_EN_ID, CHANNEL_PT_ID, CHANNEL_ES_ID])
 ADMIN_USERNAME = _get_env("ADMIN_USERNAME", required=True)
+MEDIA_STORAGE_CHAT_ID = _get_int_env("MEDIA_STORAGE_CHAT_ID", required=False)
 SITE_URL = (_get_env("SITE_URL", required=False) or "https://streamflowagency.com").strip().rstrip("/")
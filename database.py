@@ -1,10 +1,16 @@
+import hashlib
 import importlib
 import json
 import os
+import re
 import sqlite3
 import threading
+import time
+import unicodedata
 import urllib.parse
 import ssl
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 
@@ -74,8 +80,30 @@ def _reconnect_postgres_locked():
         pass
 
 
+# Внутри _transaction переподключение потеряло бы уже выполненные запросы: ошибку отдаём наверх.
+_IN_TRANSACTION = False
+
+
+@contextmanager
+def _transaction():
+    # Вызывать под DB_LOCK. Коммит при успехе, откат и исключение при любой ошибке.
+    global _IN_TRANSACTION
+    _IN_TRANSACTION = True
+    try:
+        yield
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            if DB_KIND == "postgres":
+                _reconnect_postgres_locked()
+        raise
+    finally:
+        _IN_TRANSACTION = False
+
+
 def _execute(sql: str, params: tuple = ()):
-    global conn, cursor
     query = _sql(sql)
     attempts = 0
     while True:
@@ -83,7 +111,25 @@ def _execute(sql: str, params: tuple = ()):
             cursor.execute(query, params)
             return
         except Exception as exc:
-            if DB_KIND != "postgres" or not _is_retryable_db_error(exc):
+            if DB_KIND != "postgres" or not _is_retryable_db_error(exc) or _IN_TRANSACTION:
+                raise
+            attempts += 1
+            if attempts > 2:
+                raise
+            _reconnect_postgres_locked()
+
+def _executemany(sql: str, rows: list[tuple]):
+    # Пакетная вставка/обновление с теми же плейсхолдерами и переподключением, что у _execute.
+    if not rows:
+        return
+    query = _sql(sql)
+    attempts = 0
+    while True:
+        try:
+            cursor.executemany(query, rows)
+            return
+        except Exception as exc:
+            if DB_KIND != "postgres" or not _is_retryable_db_error(exc) or _IN_TRANSACTION:
                 raise
             attempts += 1
             if attempts > 2:
@@ -216,9 +262,184 @@ with DB_LOCK:
         """)
     conn.commit()
 
+with DB_LOCK:
+    _execute("""
+    CREATE TABLE IF NOT EXISTS translation_memory (
+        lang TEXT NOT NULL,
+        source_hash TEXT NOT NULL,
+        source_text TEXT,
+        translated_text TEXT,
+        hits INTEGER DEFAULT 0,
+        created_at TEXT,
+        last_used_at TEXT,
+        PRIMARY KEY (lang, source_hash)
+    )
+    """)
+    conn.commit()
+
+with DB_LOCK:
+    _execute("""
+    CREATE TABLE IF NOT EXISTS media_files (
+        path TEXT PRIMARY KEY,
+        content_hash TEXT,
+        file_id TEXT,
+        updated_at TEXT
+    )
+    """)
+    conn.commit()
+
+with DB_LOCK:
+    if DB_KIND == "postgres":
+        _execute("""
+        CREATE TABLE IF NOT EXISTS broadcast_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            created_at TEXT,
+            updated_at TEXT,
+            status TEXT,
+            source_chat_id BIGINT,
+            source_message_id BIGINT,
+            filters_json TEXT,
+            total INTEGER DEFAULT 0,
+            progress_chat_id BIGINT,
+            progress_message_id BIGINT,
+            started_at TEXT,
+            finished_at TEXT
+        )
+        """)
+    else:
+        _execute("""
+        CREATE TABLE IF NOT EXISTS broadcast_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT,
+            updated_at TEXT,
+            status TEXT,
+            source_chat_id INTEGER,
+            source_message_id INTEGER,
+            filters_json TEXT,
+            total INTEGER DEFAULT 0,
+            progress_chat_id INTEGER,
+            progress_message_id INTEGER,
+            started_at TEXT,
+            finished_at TEXT
+        )
+        """)
+    _execute("""
+    CREATE TABLE IF NOT EXISTS broadcast_recipients (
+        job_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        error TEXT,
+        updated_at TEXT,
+        PRIMARY KEY (job_id, user_id)
+    )
+    """)
+    _execute(
+        "CREATE INDEX IF NOT EXISTS idx_broadcast_recipients_status "
+        "ON broadcast_recipients (job_id, status)"
+    )
+    conn.commit()
+
+# Массовое решение: статусы заявок меняются вместе с созданием задачи, а уведомления кандидатов
+# и правки карточек доделываются по этим таблицам и после перезапуска.
+with DB_LOCK:
+    if DB_KIND == "postgres":
+        _execute("""
+        CREATE TABLE IF NOT EXISTS bulk_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            created_at TEXT,
+            updated_at TEXT,
+            state TEXT,
+            decision TEXT,
+            reason_code TEXT,
+            total INTEGER DEFAULT 0,
+            progress_message_id BIGINT,
+            finished_at TEXT
+        )
+        """)
+    else:
+        _execute("""
+        CREATE TABLE IF NOT EXISTS bulk_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT,
+            updated_at TEXT,
+            state TEXT,
+            decision TEXT,
+            reason_code TEXT,
+            total INTEGER DEFAULT 0,
+            progress_message_id INTEGER,
+            finished_at TEXT
+        )
+        """)
+    _execute("""
+    CREATE TABLE IF NOT EXISTS bulk_job_users (
+        job_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        updated_at TEXT,
+        PRIMARY KEY (job_id, user_id)
+    )
+    """)
+    conn.commit()
+
+with DB_LOCK:
+    _execute("""
+    CREATE TABLE IF NOT EXISTS job_runs (
+        name TEXT PRIMARY KEY,
+        last_slot TEXT,
+        started_at TEXT,
+        finished_at TEXT,
+        status TEXT,
+        error TEXT,
+        duration_ms INTEGER,
+        runs INTEGER DEFAULT 0,
+        failures INTEGER DEFAULT 0
+    )
+    """)
+    conn.commit()
+
+with DB_LOCK:
+    _execute("""
+    CREATE TABLE IF NOT EXISTS scheduled_deletions (
+        chat_id BIGINT NOT NULL,
+        message_id BIGINT NOT NULL,
+        due_at BIGINT NOT NULL,
+        tag TEXT,
+        created_at TEXT,
+        PRIMARY KEY (chat_id, message_id)
+    )
+    """)
+    conn.commit()
+
+with DB_LOCK:
+    _execute("""
+    CREATE TABLE IF NOT EXISTS leader_leases (
+        name TEXT PRIMARY KEY,
+        owner TEXT,
+        expires_at BIGINT,
+        renewed_at TEXT
+    )
+    """)
+    conn.commit()
+
 def _now_ts() -> str:
     return datetime.now(timezone.utc).isoformat()
 
+# Страницы списков заявок: WHERE status ... ORDER BY updated_at DESC LIMIT/OFFSET.
+APPLICATIONS_STATUS_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_applications_status_updated "
+    "ON applications (status, updated_at)"
+)
+
+# Выборки по полям анкеты: «на рассмотрении из Бразилии», «заявки с этим телефоном».
+# Телефон и ник заодно служат индексом личности для поиска повторных заявок.
+APPLICATION_FIELD_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_applications_country_status ON applications (country, status, updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_applications_lang_status ON applications (lang, status, updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_applications_phone ON applications (phone)",
+    "CREATE INDEX IF NOT EXISTS idx_applications_telegram ON applications (telegram)",
+    "CREATE INDEX IF NOT EXISTS idx_applications_birthdate ON applications (birthdate)",
+)
+
 def _ensure_columns():
     with DB_LOCK:
         if DB_KIND == "sqlite":
@@ -243,10 +464,28 @@ def _ensure_columns():
                 alter.append("ALTER TABLE applications ADD COLUMN flow_message_id INTEGER")
             if "source" not in cols:
                 alter.append("ALTER TABLE applications ADD COLUMN source TEXT")
+            if "unreachable_at" not in cols:
+                alter.append("ALTER TABLE applications ADD COLUMN unreachable_at TEXT")
+            if "unreachable_reason" not in cols:
+                alter.append("ALTER TABLE applications ADD COLUMN unreachable_reason TEXT")
+            for column in (
+                "menu_message_kind", "menu_message_hash", "flow_message_kind", "flow_message_hash", "search_text",
+                "name", "phone", "telegram", "country", "lang", "birthdate",
+            ):
+                if column not in cols:
+                    alter.append(f"ALTER TABLE applications ADD COLUMN {column} TEXT")
+            for column in ("fields_version", "duplicate_of"):
+                if column not in cols:
+                    alter.append(f"ALTER TABLE applications ADD COLUMN {column} INTEGER")
+            _execute("PRAGMA table_info(scheduled_deletions)")
+            if "owner" not in {row[1] for row in cursor.fetchall()}:
+                alter.append("ALTER TABLE scheduled_deletions ADD COLUMN owner TEXT")
             for stmt in alter:
                 _execute(stmt)
-            if alter:
-                conn.commit()
+            _execute(APPLICATIONS_STATUS_INDEX)
+            for stmt in APPLICATION_FIELD_INDEXES:
+                _execute(stmt)
+            conn.commit()
             return
 
         alter_statements = [
@@ -259,6 +498,24 @@ def _ensure_columns():
             "ALTER TABLE applications ADD COLUMN IF NOT EXISTS menu_message_id BIGINT",
             "ALTER TABLE applications ADD COLUMN IF NOT EXISTS flow_message_id BIGINT",
             "ALTER TABLE applications ADD COLUMN IF NOT EXISTS source TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS unreachable_at TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS unreachable_reason TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS menu_message_kind TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS menu_message_hash TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS flow_message_kind TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS flow_message_hash TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS search_text TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS name TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS phone TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS telegram TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS country TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS lang TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS birthdate TEXT",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS fields_version INTEGER",
+            "ALTER TABLE applications ADD COLUMN IF NOT EXISTS duplicate_of BIGINT",
+            "ALTER TABLE scheduled_deletions ADD COLUMN IF NOT EXISTS owner TEXT",
+            APPLICATIONS_STATUS_INDEX,
+            *APPLICATION_FIELD_INDEXES,
         ]
         try:
             for statement in alter_statements:
@@ -278,6 +535,183 @@ def _ensure_columns():
 
 _ensure_columns()
 
+# Поиск /find: в search_text лежат нормализованные поля анкеты (имя, телефон, ник, город),
+# его пишут те же запросы, что и data_json. На SQLite поверх колонки — FTS5 с триггерами,
+# на Postgres — GIN по tsvector и триграммам.
+SEARCH_TSV_SQL = "to_tsvector('simple', coalesce(search_text, ''))"
+_SEARCH_FTS = False
+_SEARCH_TRIGRAM = False
+
+def _ensure_search_index():
+    global _SEARCH_FTS, _SEARCH_TRIGRAM
+    with DB_LOCK:
+        if DB_KIND == "sqlite":
+            try:
+                _execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'applications_fts'")
+                created = cursor.fetchone() is None
+                _execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5("
+                    "search_text, content='applications', content_rowid='user_id', "
+                    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+                _execute(
+                    "CREATE TRIGGER IF NOT EXISTS applications_fts_ai AFTER INSERT ON applications BEGIN "
+                    "INSERT INTO applications_fts (rowid, search_text) VALUES (new.user_id, new.search_text); "
+                    "END"
+                )
+                _execute(
+                    "CREATE TRIGGER IF NOT EXISTS applications_fts_ad AFTER DELETE ON applications BEGIN "
+                    "INSERT INTO applications_fts (applications_fts, rowid, search_text) "
+                    "VALUES ('delete', old.user_id, old.search_text); "
+                    "END"
+                )
+                _execute(
+                    "CREATE TRIGGER IF NOT EXISTS applications_fts_au AFTER UPDATE OF search_text ON applications BEGIN "
+                    "INSERT INTO applications_fts (applications_fts, rowid, search_text) "
+                    "VALUES ('delete', old.user_id, old.search_text); "
+                    "INSERT INTO applications_fts (rowid, search_text) VALUES (new.user_id, new.search_text); "
+                    "END"
+                )
+                if created:
+                    _execute("INSERT INTO applications_fts (applications_fts) VALUES ('rebuild')")
+                conn.commit()
+                _SEARCH_FTS = True
+            except Exception as err:
+                conn.rollback()
+                print(f"[db] warning: fts5 unavailable, /find falls back to LIKE: {err}")
+            return
+
+        try:
+            _execute(
+                "CREATE INDEX IF NOT EXISTS idx_applications_search_tsv "
+                f"ON applications USING GIN ({SEARCH_TSV_SQL})"
+            )
+            conn.commit()
+        except Exception as err:
+            conn.rollback()
+            print(f"[db] warning: search tsvector index failed: {err}")
+        try:
+            _execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            _execute(
+                "CREATE INDEX IF NOT EXISTS idx_applications_search_trgm "
+                "ON applications USING GIN (search_text gin_trgm_ops)"
+            )
+            conn.commit()
+            _SEARCH_TRIGRAM = True
+        except Exception as err:
+            conn.rollback()
+            print(f"[db] warning: pg_trgm unavailable, /find uses only tsvector: {err}")
+
+_ensure_search_index()
+
+_TELEGRAM_PREFIX_RE = re.compile(r"^(?:https?://)?(?:www\.)?(?:t|telegram)\.me/|^@+", re.IGNORECASE)
+_PHONE_QUERY_RE = re.compile(r"[\d\s()+\-.]+")
+_SEARCH_TERM_RE = re.compile(r"[^\W_]+")
+_BIRTHDATE_FORMATS = ("%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d")
+
+def _search_words(value) -> str:
+    return " ".join(str(value or "").casefold().split())
+
+def _phone_digits(value) -> str:
+    return re.sub(r"\D", "", str(value or ""))
+
+def telegram_handle(value) -> str:
+    return _TELEGRAM_PREFIX_RE.sub("", str(value or "").strip()).strip("/").casefold()
+
+def phone_e164(value) -> str | None:
+    raw = str(value or "").strip()
+    digits = _phone_digits(raw)
+    if raw.startswith("00"):
+        digits = digits[2:]
+    elif not raw.startswith("+") and len(digits) == 11 and digits.startswith("8"):
+        # Российский формат 8XXXXXXXXXX.
+        digits = "7" + digits[1:]
+    if not 7 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+def country_key(value) -> str | None:
+    text = unicodedata.normalize("NFKD", _search_words(str(value or "").replace("_", " ")))
+    return "".join(ch for ch in text if not unicodedata.combining(ch)) or None
+
+def birthdate_iso(value) -> str | None:
+    text = str(value or "").strip()
+    for fmt in _BIRTHDATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+def application_search_text(data: dict | None) -> str:
+    if not isinstance(data, dict):
+        return ""
+    parts = [
+        _search_words(data.get("name")),
+        telegram_handle(data.get("telegram")),
+        _search_words(data.get("city")),
+    ]
+    # Телефон индексируем в E.164, как и колонку phone: «8 (912)…» и «+7 912…» дают одни цифры.
+    phone = phone_e164(data.get("phone"))
+    digits = phone[1:] if phone else _phone_digits(data.get("phone"))
+    if digits:
+        parts.append(digits)
+        if len(digits) > 10:
+            # Хвост без кода страны: номер часто ищут так, как его диктуют, «9123456789».
+            parts.append(digits[-10:])
+    return " ".join(part for part in parts if part)
+
+# Поля анкеты, вынесенные из data_json в отдельные колонки с индексами. Пишутся вместе с data_json;
+# строки со старой версией набора дозаполняет backfill_application_fields.
+APPLICATION_FIELD_COLUMNS = ("search_text", "name", "phone", "telegram", "country", "lang", "birthdate", "fields_version")
+APPLICATION_FIELDS_VERSION = 2
+
+def application_fields(data: dict | None, default_lang: str | None = None) -> tuple:
+    if not isinstance(data, dict):
+        data = {}
+    lang = str(data.get("lang") or default_lang or "").strip().lower()
+    return (
+        application_search_text(data),
+        " ".join(str(data.get("name") or "").split()) or None,
+        phone_e164(data.get("phone")),
+        telegram_handle(data.get("telegram")) or None,
+        country_key(data.get("country")),
+        lang if lang in SUPPORTED_LANGUAGES else None,
+        birthdate_iso(data.get("age")),
+        APPLICATION_FIELDS_VERSION,
+    )
+
+# Фильтры key=value в /find и рассылке: колонка и нормализация значения.
+APPLICATION_FILTERS = {
+    "status": ("status", lambda value: value.strip().lower() or None),
+    "country": ("country", country_key),
+    "lang": ("lang", lambda value: value.strip().lower() or None),
+    "phone": ("phone", phone_e164),
+    "telegram": ("telegram", lambda value: telegram_handle(value) or None),
+    "birthdate": ("birthdate", birthdate_iso),
+}
+
+def parse_search_query(query: str) -> tuple[list[str], dict[str, str | None]]:
+    words = []
+    filters = {}
+    for token in str(query or "").split():
+        key, sep, value = token.partition("=")
+        key = key.strip().lower()
+        if sep and key in APPLICATION_FILTERS:
+            filters[key] = APPLICATION_FILTERS[key][1](value)
+        else:
+            words.append(token)
+    return search_query_terms(" ".join(words)), filters
+
+def search_query_terms(query: str) -> list[str]:
+    query = str(query or "").strip()
+    if _PHONE_QUERY_RE.fullmatch(query):
+        phone = phone_e164(query)
+        digits = phone[1:] if phone else _phone_digits(query)
+        if len(digits) >= 3:
+            return [digits]
+    return _SEARCH_TERM_RE.findall(telegram_handle(query) if query.startswith("@") else query.casefold())
+
 def set_status(user_id: int, status: str):
     ts = _now_ts()
     with DB_LOCK:
@@ -298,6 +732,43 @@ def set_status(user_id: int, status: str):
             )
         conn.commit()
 
+BULK_STATUS_CHUNK = 500
+
+def _set_statuses_locked(user_ids: list[int], status: str, from_status: str, ts: str) -> list[int]:
+    changed: list[int] = []
+    for start in range(0, len(user_ids), BULK_STATUS_CHUNK):
+        chunk = tuple(user_ids[start:start + BULK_STATUS_CHUNK])
+        marks = ", ".join("?" * len(chunk))
+        if DB_KIND == "postgres":
+            _execute(
+                "UPDATE applications SET status = ?, updated_at = ? "
+                f"WHERE status = ? AND user_id IN ({marks}) RETURNING user_id",
+                (status, ts, from_status, *chunk)
+            )
+            changed.extend(int(row[0]) for row in cursor.fetchall())
+            continue
+        _execute(
+            f"SELECT user_id FROM applications WHERE status = ? AND user_id IN ({marks})",
+            (from_status, *chunk)
+        )
+        matched = [int(row[0]) for row in cursor.fetchall()]
+        if matched:
+            _execute(
+                "UPDATE applications SET status = ?, updated_at = ? "
+                f"WHERE status = ? AND user_id IN ({', '.join('?' * len(matched))})",
+                (status, ts, from_status, *matched)
+            )
+            changed.extend(matched)
+    return changed
+
+def list_application_ids(status: str) -> list[int]:
+    with DB_LOCK:
+        _execute(
+            "SELECT user_id FROM applications WHERE status = ? ORDER BY updated_at DESC",
+            (status,)
+        )
+        return [int(row[0]) for row in cursor.fetchall()]
+
 def set_last_state(user_id: int, last_state: str | None):
     ts = _now_ts()
     with DB_LOCK:
@@ -338,45 +809,64 @@ def set_last_apply_at(user_id: int):
             )
         conn.commit()
 
+_FIELD_NAMES = ", ".join(APPLICATION_FIELD_COLUMNS)
+_FIELD_PLACEHOLDERS = ", ".join("?" for _ in APPLICATION_FIELD_COLUMNS)
+_FIELD_ASSIGNMENTS = ", ".join(f"{column} = ?" for column in APPLICATION_FIELD_COLUMNS)
+_FIELD_CLEAR = ", ".join(f"{column} = NULL" for column in APPLICATION_FIELD_COLUMNS)
+_FIELD_EXCLUDED = ", ".join(f"{column} = excluded.{column}" for column in APPLICATION_FIELD_COLUMNS)
+
 def set_form_data(user_id: int, data: dict):
     ts = _now_ts()
     payload = json.dumps(data, ensure_ascii=False)
     with DB_LOCK:
+        # Анкета из бота не хранит язык — в колонку lang идёт язык, выбранный пользователем.
         _execute(
-            "SELECT 1 FROM applications WHERE user_id = ?",
-            (user_id,)
+            "SELECT (SELECT 1 FROM applications WHERE user_id = ?), (SELECT value FROM settings WHERE key = ?)",
+            (user_id, _lang_setting_key(user_id))
         )
-        exists = cursor.fetchone() is not None
+        row = cursor.fetchone()
+        exists = row[0] is not None
+        fields = application_fields(data, default_lang=row[1])
         if exists:
             _execute(
-                "UPDATE applications SET data_json = ?, updated_at = ? WHERE user_id = ?",
-                (payload, ts, user_id)
+                f"UPDATE applications SET data_json = ?, {_FIELD_ASSIGNMENTS}, updated_at = ? WHERE user_id = ?",
+                (payload, *fields, ts, user_id)
             )
         else:
             _execute(
-                "INSERT INTO applications (user_id, data_json, created_at, updated_at) VALUES (?, ?, ?, ?)",
-                (user_id, payload, ts, ts)
+                f"INSERT INTO applications (user_id, data_json, {_FIELD_NAMES}, created_at, updated_at) "
+                f"VALUES (?, ?, {_FIELD_PLACEHOLDERS}, ?, ?)",
+                (user_id, payload, *fields, ts, ts)
             )
         conn.commit()
 
-def save_web_application(user_id: int, data: dict, source: str | None = None, status: str = "pending"):
+def save_web_application(
+    user_id: int,
+    data: dict,
+    source: str | None = None,
+    status: str = "pending",
+    duplicate_of: int | None = None,
+):
     ts = _now_ts()
     payload = json.dumps(data, ensure_ascii=False)
+    fields = application_fields(data)
     with DB_LOCK:
         _execute(
-            """
+            f"""
             INSERT INTO applications (
-                user_id, status, created_at, updated_at, last_apply_at, data_json, source
+                user_id, status, created_at, updated_at, last_apply_at, data_json, source, duplicate_of, {_FIELD_NAMES}
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, {_FIELD_PLACEHOLDERS})
             ON CONFLICT(user_id) DO UPDATE SET
                 status = excluded.status,
                 updated_at = excluded.updated_at,
                 last_apply_at = excluded.last_apply_at,
                 data_json = excluded.data_json,
-                source = excluded.source
+                source = excluded.source,
+                duplicate_of = excluded.duplicate_of,
+                {_FIELD_EXCLUDED}
             """,
-            (user_id, status, ts, ts, ts, payload, source)
+            (user_id, status, ts, ts, ts, payload, source, duplicate_of, *fields)
         )
         conn.commit()
 
@@ -411,7 +901,27 @@ def get_admin_message_id(user_id: int) -> int | None:
             return None
         return row[0]
 
-def set_menu_message_id(user_id: int, message_id: int | None):
+def get_admin_message_ids(user_ids: list[int]) -> dict[int, int]:
+    # Только заявки, у которых в админ-группе есть карточка.
+    result: dict[int, int] = {}
+    with DB_LOCK:
+        for start in range(0, len(user_ids), BULK_STATUS_CHUNK):
+            chunk = tuple(user_ids[start:start + BULK_STATUS_CHUNK])
+            marks = ", ".join("?" for _ in chunk)
+            _execute(
+                f"SELECT user_id, admin_message_id FROM applications "
+                f"WHERE user_id IN ({marks}) AND admin_message_id IS NOT NULL",
+                chunk
+            )
+            result.update((int(row[0]), int(row[1])) for row in cursor.fetchall())
+    return result
+
+def set_menu_message_id(
+    user_id: int,
+    message_id: int | None,
+    kind: str | None = None,
+    content_hash: str | None = None,
+):
     ts = _now_ts()
     with DB_LOCK:
         _execute(
@@ -421,15 +931,19 @@ def set_menu_message_id(user_id: int, message_id: int | None):
         exists = cursor.fetchone() is not None
         if exists:
             _execute(
-                "UPDATE applications SET menu_message_id = ?, updated_at = ? WHERE user_id = ?",
-                (message_id, ts, user_id)
+                "UPDATE applications SET menu_message_id = ?, menu_message_kind = ?, menu_message_hash = ?, "
+                "updated_at = ? WHERE user_id = ?",
+                (message_id, kind, content_hash, ts, user_id)
             )
         else:
             _execute(
-                "INSERT INTO applications (user_id, menu_message_id, created_at, updated_at) VALUES (?, ?, ?, ?)",
-                (user_id, message_id, ts, ts)
+                "INSERT INTO applications "
+                "(user_id, menu_message_id, menu_message_kind, menu_message_hash, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, message_id, kind, content_hash, ts, ts)
             )
         conn.commit()
+        _update_tracked_user_message(user_id, 0, message_id)
 
 def set_source(user_id: int, source: str | None):
     ts = _now_ts()
@@ -473,7 +987,12 @@ def get_menu_message_id(user_id: int) -> int | None:
             return None
         return row[0]
 
-def set_flow_message_id(user_id: int, message_id: int | None):
+def set_flow_message_id(
+    user_id: int,
+    message_id: int | None,
+    kind: str | None = None,
+    content_hash: str | None = None,
+):
     ts = _now_ts()
     with DB_LOCK:
         _execute(
@@ -483,15 +1002,19 @@ def set_flow_message_id(user_id: int, message_id: int | None):
         exists = cursor.fetchone() is not None
         if exists:
             _execute(
-                "UPDATE applications SET flow_message_id = ?, updated_at = ? WHERE user_id = ?",
-                (message_id, ts, user_id)
+                "UPDATE applications SET flow_message_id = ?, flow_message_kind = ?, flow_message_hash = ?, "
+                "updated_at = ? WHERE user_id = ?",
+                (message_id, kind, content_hash, ts, user_id)
             )
         else:
             _execute(
-                "INSERT INTO applications (user_id, flow_message_id, created_at, updated_at) VALUES (?, ?, ?, ?)",
-                (user_id, message_id, ts, ts)
+                "INSERT INTO applications "
+                "(user_id, flow_message_id, flow_message_kind, flow_message_hash, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, message_id, kind, content_hash, ts, ts)
             )
         conn.commit()
+        _update_tracked_user_message(user_id, 1, message_id)
 
 def get_flow_message_id(user_id: int) -> int | None:
     with DB_LOCK:
@@ -504,6 +1027,56 @@ def get_flow_message_id(user_id: int) -> int | None:
             return None
         return row[0]
 
+def get_user_message_state(user_id: int) -> dict[str, dict]:
+    with DB_LOCK:
+        _execute(
+            "SELECT menu_message_id, menu_message_kind, menu_message_hash, "
+            "flow_message_id, flow_message_kind, flow_message_hash "
+            "FROM applications WHERE user_id = ?",
+            (user_id,)
+        )
+        row = cursor.fetchone() or (None,) * 6
+        _track_user_messages(user_id, row[0], row[3])
+    return {
+        "menu": {"id": row[0], "kind": row[1], "hash": row[2]},
+        "flow": {"id": row[3], "kind": row[4], "hash": row[5]},
+    }
+
+# Какие сообщения пользователя сейчас записаны как меню и шаг анкеты: user_id -> [menu_id, flow_id].
+# Заполняется при чтении и записи этих id, чтобы правки и удаления прочих сообщений не шли в БД.
+# Пользователя нет в кэше — значит, неизвестно, и запись идёт как раньше.
+USER_MESSAGE_CACHE_SIZE = 10000
+_TRACKED_USER_MESSAGES: OrderedDict[int, list[int | None]] = OrderedDict()
+
+def _track_user_messages(user_id: int, menu_id: int | None, flow_id: int | None):
+    _TRACKED_USER_MESSAGES[user_id] = [menu_id, flow_id]
+    _TRACKED_USER_MESSAGES.move_to_end(user_id)
+    while len(_TRACKED_USER_MESSAGES) > USER_MESSAGE_CACHE_SIZE:
+        _TRACKED_USER_MESSAGES.popitem(last=False)
+
+def _update_tracked_user_message(user_id: int, slot: int, message_id: int | None):
+    tracked = _TRACKED_USER_MESSAGES.get(user_id)
+    if tracked is not None:
+        tracked[slot] = message_id
+
+def is_tracked_user_message(user_id: int, message_id: int) -> bool | None:
+    with DB_LOCK:
+        tracked = _TRACKED_USER_MESSAGES.get(user_id)
+        if tracked is None:
+            return None
+        return message_id in tracked
+
+def record_user_message_edit(user_id: int, message_id: int, content_hash: str | None):
+    with DB_LOCK:
+        _execute(
+            "UPDATE applications SET "
+            "menu_message_hash = CASE WHEN menu_message_id = ? THEN ? ELSE menu_message_hash END, "
+            "flow_message_hash = CASE WHEN flow_message_id = ? THEN ? ELSE flow_message_hash END "
+            "WHERE user_id = ? AND (menu_message_id = ? OR flow_message_id = ?)",
+            (message_id, content_hash, message_id, content_hash, user_id, message_id, message_id)
+        )
+        conn.commit()
+
 def get_admin_messages_for_archive(days: int) -> list[tuple[int, int]]:
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
     with DB_LOCK:
@@ -519,8 +1092,13 @@ def get_admin_messages_for_archive(days: int) -> list[tuple[int, int]]:
 def reset_all_data():
     with DB_LOCK:
         _execute("DELETE FROM applications")
+        _TRACKED_USER_MESSAGES.clear()
         _execute("DELETE FROM settings")
         _execute("DELETE FROM posted_messages")
+        _execute("DELETE FROM broadcast_recipients")
+        _execute("DELETE FROM broadcast_jobs")
+        _execute("DELETE FROM bulk_job_users")
+        _execute("DELETE FROM bulk_jobs")
         conn.commit()
         if DB_KIND == "sqlite":
             try:
@@ -594,6 +1172,123 @@ def list_applications(status: str | None = None) -> list[dict]:
         ]
 
 
+def list_applications_page(status: str | None, limit: int, offset: int) -> tuple[list[dict], int]:
+    # Тот же порядок, что и в list_applications, но читаем только строки текущей страницы.
+    if status:
+        where, params = "status = ?", (status,)
+    else:
+        where, params = "status IN ('pending', 'accepted', 'rejected')", ()
+    with DB_LOCK:
+        _execute(f"SELECT COUNT(*) FROM applications WHERE {where}", params)
+        total = int(cursor.fetchone()[0] or 0)
+        _execute(
+            "SELECT user_id, status, updated_at, data_json FROM applications "
+            f"WHERE {where} "
+            "ORDER BY updated_at DESC "
+            "LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        )
+        rows = cursor.fetchall()
+    items = []
+    for row in rows:
+        try:
+            data = json.loads(row[3]) if row[3] else {}
+        except Exception:
+            data = {}
+        items.append({
+            "user_id": row[0],
+            "status": row[1],
+            "updated_at": row[2],
+            "data": data if isinstance(data, dict) else {},
+        })
+    return items, total
+
+
+APPLICATION_BACKFILL_BATCH = 500
+
+def backfill_application_fields(batch_size: int = APPLICATION_BACKFILL_BATCH) -> int:
+    # Заявки, сохранённые до появления колонок или со старой версией набора полей.
+    # Пачками, чтобы не держать DB_LOCK на всю таблицу.
+    done = 0
+    while True:
+        with DB_LOCK:
+            _execute(
+                "SELECT user_id, data_json FROM applications "
+                "WHERE data_json IS NOT NULL AND (fields_version IS NULL OR fields_version < ?) "
+                "LIMIT ?",
+                (APPLICATION_FIELDS_VERSION, batch_size)
+            )
+            rows = cursor.fetchall()
+            if rows:
+                _executemany(
+                    f"UPDATE applications SET {_FIELD_ASSIGNMENTS} WHERE user_id = ?",
+                    [(*application_fields(_safe_json(row[1], {})), row[0]) for row in rows]
+                )
+            else:
+                # Как в set_form_data: для анкет из бота — язык, выбранный пользователем.
+                _execute(
+                    "UPDATE applications SET lang = ("
+                    "SELECT s.value FROM settings s WHERE s.key = 'user_lang:' || CAST(applications.user_id AS TEXT)"
+                    ") WHERE lang IS NULL AND data_json IS NOT NULL AND user_id > 0"
+                )
+            conn.commit()
+        if not rows:
+            return done
+        done += len(rows)
+
+def _search_terms_where(terms: list[str]) -> tuple[str, tuple]:
+    if DB_KIND == "postgres":
+        where = f"{SEARCH_TSV_SQL} @@ to_tsquery('simple', ?)"
+        params: tuple = (" & ".join(f"{term}:*" for term in terms),)
+        if _SEARCH_TRIGRAM:
+            # Подстрока из середины (часть номера, кусок ника) — через триграммный индекс.
+            where = f"({where} OR search_text LIKE ?)"
+            params += ("%" + "%".join(terms) + "%",)
+        return where, params
+    if _SEARCH_FTS:
+        return (
+            "user_id IN (SELECT rowid FROM applications_fts WHERE applications_fts MATCH ?)",
+            (" ".join(f'"{term}"*' for term in terms),)
+        )
+    return " AND ".join("search_text LIKE ?" for _ in terms), tuple(f"%{term}%" for term in terms)
+
+def search_applications(query: str, limit: int, offset: int) -> tuple[list[dict], int]:
+    # Слова запроса ищутся по индексу /find, фильтры key=value — по колонкам полей анкеты.
+    terms, filters = parse_search_query(query)
+    if not terms and not filters or any(value is None for value in filters.values()):
+        return [], 0
+    clauses = []
+    params: tuple = ()
+    if terms:
+        where, params = _search_terms_where(terms)
+        clauses.append(where)
+    for key, value in filters.items():
+        clauses.append(f"{APPLICATION_FILTERS[key][0]} = ?")
+        params += (value,)
+    where = " AND ".join(clauses)
+    with DB_LOCK:
+        _execute(f"SELECT COUNT(*) FROM applications WHERE {where}", params)
+        total = int(cursor.fetchone()[0] or 0)
+        _execute(
+            "SELECT user_id, status, updated_at, data_json FROM applications "
+            f"WHERE {where} "
+            "ORDER BY updated_at DESC "
+            "LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        )
+        rows = cursor.fetchall()
+    items = []
+    for row in rows:
+        data = _safe_json(row[3], {})
+        items.append({
+            "user_id": row[0],
+            "status": row[1],
+            "updated_at": row[2],
+            "data": data if isinstance(data, dict) else {},
+        })
+    return items, total
+
+
 def list_applications_for_export() -> list[dict]:
     with DB_LOCK:
         _execute(
@@ -618,7 +1313,7 @@ def clear_form_data(user_id: int):
         exists = cursor.fetchone() is not None
         if exists:
             _execute(
-                "UPDATE applications SET data_json = NULL, updated_at = ? WHERE user_id = ?",
+                f"UPDATE applications SET data_json = NULL, {_FIELD_CLEAR}, updated_at = ? WHERE user_id = ?",
                 (ts, user_id)
             )
             conn.commit()
@@ -658,6 +1353,102 @@ def get_application(user_id: int) -> dict | None:
             "source": row[6],
         }
 
+def get_admin_card_row(user_id: int) -> dict | None:
+    # Всё, что нужно для карточки заявки в админ-группе, одним запросом (вместе с ранней заявкой, если это дубль).
+    with DB_LOCK:
+        _execute(
+            "SELECT a.status, a.updated_at, a.last_apply_at, a.created_at, a.source, a.data_json, "
+            "e.user_id, e.name, e.source, COALESCE(e.last_apply_at, e.created_at), e.admin_message_id "
+            "FROM applications a LEFT JOIN applications e ON e.user_id = a.duplicate_of "
+            "WHERE a.user_id = ?",
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        try:
+            data = json.loads(row[5]) if row[5] else {}
+        except Exception:
+            data = {}
+        return {
+            "status": row[0],
+            "updated_at": row[1],
+            "last_apply_at": row[2],
+            "created_at": row[3],
+            "source": row[4],
+            "data": data if isinstance(data, dict) else {},
+            "duplicate_of": _earlier_application(row[6:11]),
+        }
+
+def _earlier_application(row) -> dict | None:
+    if not row or row[0] is None:
+        return None
+    return {
+        "user_id": row[0],
+        "name": row[1],
+        "source": row[2],
+        "submitted_at": row[3],
+        "admin_message_id": row[4],
+    }
+
+# Ранняя заявка того же человека: совпадение по телефону в E.164 или по нику. Это точечные
+# поиски по индексам phone и telegram, их стоимость не растёт с числом заявок.
+_EARLIER_APPLICATION_SQL = (
+    "SELECT user_id FROM applications "
+    "WHERE {column} = ? AND status IN ('pending', 'accepted', 'rejected') AND user_id <> ? "
+    "ORDER BY COALESCE(last_apply_at, created_at) "
+    "LIMIT 1"
+)
+
+def _find_earlier_application_locked(user_id: int, phone: str | None, telegrams: list[str]) -> int | None:
+    found = []
+    for column, value in [("phone", phone), *(("telegram", handle) for handle in telegrams)]:
+        if not value:
+            continue
+        _execute(_EARLIER_APPLICATION_SQL.format(column=column), (value, user_id))
+        row = cursor.fetchone()
+        if row:
+            found.append(row[0])
+    if not found:
+        return None
+    if len(found) > 1:
+        # Совпало с разными заявками — ссылаемся на самую раннюю.
+        marks = ", ".join("?" for _ in found)
+        _execute(
+            f"SELECT user_id FROM applications WHERE user_id IN ({marks}) "
+            "ORDER BY COALESCE(last_apply_at, created_at) LIMIT 1",
+            tuple(found)
+        )
+        return cursor.fetchone()[0]
+    return found[0]
+
+def find_earlier_application(user_id: int, phone: str | None = None, telegram: str | None = None) -> dict | None:
+    # Для карточки, которую рисуют до сохранения заявки (сайт): те же поля, что duplicate_of в get_admin_card_row.
+    handle = telegram_handle(telegram)
+    with DB_LOCK:
+        earlier = _find_earlier_application_locked(user_id, phone_e164(phone) if phone else None, [handle] if handle else [])
+        if earlier is None:
+            return None
+        _execute(
+            "SELECT user_id, name, source, COALESCE(last_apply_at, created_at), admin_message_id "
+            "FROM applications WHERE user_id = ?",
+            (earlier,)
+        )
+        return _earlier_application(cursor.fetchone())
+
+def mark_duplicate_application(user_id: int, extra_telegram: str | None = None) -> int | None:
+    # Проверяем по уже нормализованным колонкам заявки и сохраняем ссылку на раннюю заявку для карточки.
+    with DB_LOCK:
+        _execute("SELECT phone, telegram FROM applications WHERE user_id = ?", (user_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        telegrams = [handle for handle in {row[1], telegram_handle(extra_telegram)} if handle]
+        earlier = _find_earlier_application_locked(user_id, row[0], telegrams)
+        _execute("UPDATE applications SET duplicate_of = ? WHERE user_id = ?", (earlier, user_id))
+        conn.commit()
+        return earlier
+
 def get_status(user_id: int) -> str | None:
     with DB_LOCK:
         _execute(
@@ -688,7 +1479,7 @@ def cleanup_old_form_data(days: int = 30):
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
     with DB_LOCK:
         _execute(
-            "UPDATE applications SET data_json = NULL "
+            f"UPDATE applications SET data_json = NULL, {_FIELD_CLEAR} "
             "WHERE data_json IS NOT NULL AND status = 'new' AND updated_at < ?",
             (cutoff,)
         )
@@ -905,3 +1696,604 @@ def delete_posted_message(post_id: int) -> None:
     with DB_LOCK:
         _execute("DELETE FROM posted_messages WHERE id = ?", (post_id,))
         conn.commit()
+
+
+TRANSLATION_MEMORY_HITS_KEY = "translation_memory_hits"
+TRANSLATION_MEMORY_MISSES_KEY = "translation_memory_misses"
+
+
+def get_translation_segments(lang: str, source_hashes: list[str]) -> dict[str, str]:
+    hashes = list(dict.fromkeys(source_hashes))
+    if not hashes:
+        return {}
+    placeholders = ", ".join("?" for _ in hashes)
+    with DB_LOCK:
+        _execute(
+            "SELECT source_hash, translated_text FROM translation_memory "
+            f"WHERE lang = ? AND source_hash IN ({placeholders})",
+            (lang, *hashes)
+        )
+        found = {row[0]: row[1] for row in cursor.fetchall() if row[1]}
+        if found:
+            found_placeholders = ", ".join("?" for _ in found)
+            _execute(
+                "UPDATE translation_memory SET hits = hits + 1, last_used_at = ? "
+                f"WHERE lang = ? AND source_hash IN ({found_placeholders})",
+                (_now_ts(), lang, *found)
+            )
+            conn.commit()
+        return found
+
+
+def save_translation_segments(lang: str, items: list[tuple[str, str, str]]) -> None:
+    if not items:
+        return
+    ts = _now_ts()
+    with DB_LOCK:
+        for source_hash, source_text, translated_text in items:
+            _execute(
+                """
+                INSERT INTO translation_memory (
+                    lang, source_hash, source_text, translated_text, hits, created_at, last_used_at
+                )
+                VALUES (?, ?, ?, ?, 0, ?, ?)
+                ON CONFLICT(lang, source_hash) DO UPDATE SET
+                    translated_text = excluded.translated_text,
+                    last_used_at = excluded.last_used_at
+                """,
+                (lang, source_hash, source_text, translated_text, ts, ts)
+            )
+        conn.commit()
+
+
+def add_translation_memory_stats(hits: int, misses: int) -> None:
+    if not hits and not misses:
+        return
+    with DB_LOCK:
+        for key, delta in ((TRANSLATION_MEMORY_HITS_KEY, hits), (TRANSLATION_MEMORY_MISSES_KEY, misses)):
+            if not delta:
+                continue
+            _execute("SELECT value FROM settings WHERE key = ?", (key,))
+            row = cursor.fetchone()
+            try:
+                current = int(row[0]) if row and row[0] else 0
+            except (TypeError, ValueError):
+                current = 0
+            _execute(
+                "INSERT INTO settings (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(current + delta))
+            )
+        conn.commit()
+
+
+def get_translation_memory_stats() -> dict:
+    with DB_LOCK:
+        _execute(
+            "SELECT key, value FROM settings WHERE key IN (?, ?)",
+            (TRANSLATION_MEMORY_HITS_KEY, TRANSLATION_MEMORY_MISSES_KEY)
+        )
+        values = {row[0]: row[1] for row in cursor.fetchall()}
+        _execute("SELECT COUNT(*) FROM translation_memory")
+        row = cursor.fetchone()
+    stats = {"segments": int(row[0]) if row else 0}
+    for name, key in (("hits", TRANSLATION_MEMORY_HITS_KEY), ("misses", TRANSLATION_MEMORY_MISSES_KEY)):
+        try:
+            stats[name] = int(values.get(key) or 0)
+        except (TypeError, ValueError):
+            stats[name] = 0
+    return stats
+
+
+def get_media_file(path: str) -> dict | None:
+    with DB_LOCK:
+        _execute(
+            "SELECT content_hash, file_id, updated_at FROM media_files WHERE path = ?",
+            (path,)
+        )
+        row = cursor.fetchone()
+        if not row or not row[1]:
+            return None
+        return {"content_hash": row[0], "file_id": row[1], "updated_at": row[2]}
+
+
+def set_media_file(path: str, content_hash: str, file_id: str) -> None:
+    with DB_LOCK:
+        _execute(
+            "INSERT INTO media_files (path, content_hash, file_id, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET "
+            "content_hash = excluded.content_hash, file_id = excluded.file_id, updated_at = excluded.updated_at",
+            (path, content_hash, file_id, _now_ts())
+        )
+        conn.commit()
+
+
+def delete_media_file(path: str) -> None:
+    with DB_LOCK:
+        _execute("DELETE FROM media_files WHERE path = ?", (path,))
+        conn.commit()
+
+
+BROADCAST_RECIPIENT_STATUSES = ("pending", "sent", "failed", "unreachable")
+
+
+def list_broadcast_audience(
+    statuses: list[str] | None = None,
+    lang: str | None = None,
+    source: str | None = None,
+    country: str | None = None,
+) -> list[int]:
+    sql = (
+        "SELECT a.user_id FROM applications a "
+        "LEFT JOIN settings s ON s.key = 'user_lang:' || CAST(a.user_id AS TEXT) "
+        "WHERE a.user_id > 0"
+    )
+    params: list = []
+    if statuses:
+        sql += " AND a.status IN (" + ", ".join("?" for _ in statuses) + ")"
+        params.extend(statuses)
+    if lang:
+        sql += " AND COALESCE(s.value, ?) = ?"
+        params.extend([DEFAULT_LANGUAGE, lang])
+    if source:
+        sql += " AND a.source = ?"
+        params.append(source)
+    if country:
+        sql += " AND a.country = ?"
+        params.append(country)
+    sql += " ORDER BY a.user_id"
+    with DB_LOCK:
+        _execute(sql, tuple(params))
+        return [int(row[0]) for row in cursor.fetchall()]
+
+
+def create_broadcast_job(
+    source_chat_id: int,
+    source_message_id: int,
+    filters: dict,
+    user_ids: list[int],
+) -> int:
+    ts = _now_ts()
+    with DB_LOCK:
+        params = (ts, ts, "pending", source_chat_id, source_message_id, _json_text(filters or {}), len(user_ids))
+        insert_sql = (
+            "INSERT INTO broadcast_jobs "
+            "(created_at, updated_at, status, source_chat_id, source_message_id, filters_json, total) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)"
+        )
+        if DB_KIND == "postgres":
+            _execute(insert_sql + " RETURNING id", params)
+            row = cursor.fetchone()
+            job_id = int(row[0]) if row else 0
+        else:
+            _execute(insert_sql, params)
+            job_id = int(cursor.lastrowid or 0)
+        _executemany(
+            "INSERT INTO broadcast_recipients (job_id, user_id, status, updated_at) "
+            "VALUES (?, ?, 'pending', ?) ON CONFLICT DO NOTHING",
+            [(job_id, user_id, ts) for user_id in user_ids]
+        )
+        conn.commit()
+        return job_id
+
+
+def get_broadcast_job(job_id: int) -> dict | None:
+    with DB_LOCK:
+        _execute(
+            """
+            SELECT id, created_at, updated_at, status, source_chat_id, source_message_id,
+                   filters_json, total, progress_chat_id, progress_message_id,
+                   started_at, finished_at
+            FROM broadcast_jobs
+            WHERE id = ?
+            """,
+            (job_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        _execute(
+            "SELECT status, COUNT(*) FROM broadcast_recipients WHERE job_id = ? GROUP BY status",
+            (job_id,)
+        )
+        counts = {status: 0 for status in BROADCAST_RECIPIENT_STATUSES}
+        for status, count in cursor.fetchall():
+            counts[status] = int(count)
+        return {
+            "id": int(row[0]),
+            "created_at": row[1],
+            "updated_at": row[2],
+            "status": row[3],
+            "source_chat_id": row[4],
+            "source_message_id": row[5],
+            "filters": _safe_json(row[6], {}),
+            "total": int(row[7] or 0),
+            "progress_chat_id": row[8],
+            "progress_message_id": row[9],
+            "started_at": row[10],
+            "finished_at": row[11],
+            "counts": counts,
+        }
+
+
+def get_broadcast_job_status(job_id: int) -> str | None:
+    with DB_LOCK:
+        _execute("SELECT status FROM broadcast_jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+
+def list_broadcast_job_ids(statuses: tuple[str, ...] = ("pending", "running")) -> list[int]:
+    with DB_LOCK:
+        _execute(
+            "SELECT id FROM broadcast_jobs WHERE status IN ("
+            + ", ".join("?" for _ in statuses)
+            + ") ORDER BY id",
+            tuple(statuses)
+        )
+        return [int(row[0]) for row in cursor.fetchall()]
+
+
+def set_broadcast_job_status(job_id: int, status: str) -> None:
+    ts = _now_ts()
+    with DB_LOCK:
+        if status == "running":
+            _execute(
+                "UPDATE broadcast_jobs SET status = ?, updated_at = ?, "
+                "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (status, ts, ts, job_id)
+            )
+        elif status in {"done", "cancelled", "failed"}:
+            _execute(
+                "UPDATE broadcast_jobs SET status = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+                (status, ts, ts, job_id)
+            )
+        else:
+            _execute(
+                "UPDATE broadcast_jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (status, ts, job_id)
+            )
+        conn.commit()
+
+
+def set_broadcast_progress_message(job_id: int, chat_id: int, message_id: int) -> None:
+    with DB_LOCK:
+        _execute(
+            "UPDATE broadcast_jobs SET progress_chat_id = ?, progress_message_id = ? WHERE id = ?",
+            (chat_id, message_id, job_id)
+        )
+        conn.commit()
+
+
+def get_pending_broadcast_recipients(job_id: int, limit: int) -> list[int]:
+    with DB_LOCK:
+        _execute(
+            "SELECT user_id FROM broadcast_recipients "
+            "WHERE job_id = ? AND status = 'pending' "
+            "ORDER BY user_id LIMIT ?",
+            (job_id, limit)
+        )
+        return [int(row[0]) for row in cursor.fetchall()]
+
+
+def set_broadcast_recipient_results(job_id: int, results: list[tuple[int, str, str | None]]) -> None:
+    if not results:
+        return
+    ts = _now_ts()
+    with DB_LOCK:
+        _executemany(
+            "UPDATE broadcast_recipients SET status = ?, error = ?, updated_at = ? "
+            "WHERE job_id = ? AND user_id = ?",
+            [(status, error, ts, job_id, user_id) for user_id, status, error in results]
+        )
+        _execute("UPDATE broadcast_jobs SET updated_at = ? WHERE id = ?", (ts, job_id))
+        conn.commit()
+
+
+BULK_JOB_USER_STATUSES = ("pending", "notified", "unreachable", "failed")
+
+
+def create_bulk_job(user_ids: list[int], decision: str, reason_code: str | None = None) -> tuple[int | None, list[int]]:
+    # Статусы заявок и задача на уведомления — одна транзакция: после сбоя не бывает
+    # решённых заявок, о которых некому доделать уведомления и карточки.
+    if not user_ids:
+        return None, []
+    ts = _now_ts()
+    with DB_LOCK, _transaction():
+        changed = _set_statuses_locked(user_ids, decision, "pending", ts)
+        if not changed:
+            return None, []
+        params = (ts, ts, "running", decision, reason_code, len(changed))
+        insert_sql = (
+            "INSERT INTO bulk_jobs (created_at, updated_at, state, decision, reason_code, total) "
+            "VALUES (?, ?, ?, ?, ?, ?)"
+        )
+        if DB_KIND == "postgres":
+            _execute(insert_sql + " RETURNING id", params)
+            row = cursor.fetchone()
+            job_id = int(row[0]) if row else 0
+        else:
+            _execute(insert_sql, params)
+            job_id = int(cursor.lastrowid or 0)
+        _executemany(
+            "INSERT INTO bulk_job_users (job_id, user_id, status, updated_at) VALUES (?, ?, 'pending', ?)",
+            [(job_id, user_id, ts) for user_id in changed]
+        )
+        return job_id, changed
+
+
+def get_bulk_job(job_id: int) -> dict | None:
+    with DB_LOCK:
+        _execute(
+            "SELECT id, state, decision, reason_code, total, progress_message_id FROM bulk_jobs WHERE id = ?",
+            (job_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        _execute(
+            "SELECT user_id, status FROM bulk_job_users WHERE job_id = ? ORDER BY user_id",
+            (job_id,)
+        )
+        users = [(int(user_id), status) for user_id, status in cursor.fetchall()]
+    counts = {status: 0 for status in BULK_JOB_USER_STATUSES}
+    for _, status in users:
+        counts[status] = counts.get(status, 0) + 1
+    return {
+        "id": int(row[0]),
+        "state": row[1],
+        "decision": row[2],
+        "reason_code": row[3],
+        "total": int(row[4] or 0),
+        "progress_message_id": row[5],
+        "user_ids": [user_id for user_id, _ in users],
+        "pending": [user_id for user_id, status in users if status == "pending"],
+        "counts": counts,
+    }
+
+
+def list_bulk_job_ids(states: tuple[str, ...] = ("running", "finishing")) -> list[int]:
+    with DB_LOCK:
+        _execute(
+            "SELECT id FROM bulk_jobs WHERE state IN (" + ", ".join("?" for _ in states) + ") ORDER BY id",
+            tuple(states)
+        )
+        return [int(row[0]) for row in cursor.fetchall()]
+
+
+def set_bulk_job_state(job_id: int, state: str) -> None:
+    ts = _now_ts()
+    with DB_LOCK:
+        _execute(
+            "UPDATE bulk_jobs SET state = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+            (state, ts, ts if state == "done" else None, job_id)
+        )
+        conn.commit()
+
+
+def set_bulk_progress_message(job_id: int, message_id: int) -> None:
+    with DB_LOCK:
+        _execute("UPDATE bulk_jobs SET progress_message_id = ? WHERE id = ?", (message_id, job_id))
+        conn.commit()
+
+
+def set_bulk_job_user_results(job_id: int, results: list[tuple[int, str]]) -> None:
+    if not results:
+        return
+    ts = _now_ts()
+    with DB_LOCK:
+        _executemany(
+            "UPDATE bulk_job_users SET status = ?, updated_at = ? WHERE job_id = ? AND user_id = ?",
+            [(status, ts, job_id, user_id) for user_id, status in results]
+        )
+        _execute("UPDATE bulk_jobs SET updated_at = ? WHERE id = ?", (ts, job_id))
+        conn.commit()
+
+
+def set_user_unreachable(user_id: int, reason: str | None) -> None:
+    # Upsert: пользователь мог заблокировать бота, так и не начав анкету.
+    ts = _now_ts()
+    with DB_LOCK:
+        _execute(
+            "INSERT INTO applications (user_id, created_at, updated_at, unreachable_at, unreachable_reason) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET "
+            "unreachable_at = excluded.unreachable_at, unreachable_reason = excluded.unreachable_reason",
+            (user_id, ts, ts, ts, (reason or "")[:300])
+        )
+        conn.commit()
+
+
+def clear_user_unreachable(user_id: int) -> None:
+    with DB_LOCK:
+        _execute(
+            "UPDATE applications SET unreachable_at = NULL, unreachable_reason = NULL "
+            "WHERE user_id = ? AND unreachable_at IS NOT NULL",
+            (user_id,)
+        )
+        conn.commit()
+
+
+def list_unreachable_user_ids() -> list[int]:
+    with DB_LOCK:
+        _execute("SELECT user_id FROM applications WHERE unreachable_at IS NOT NULL")
+        return [int(row[0]) for row in cursor.fetchall()]
+
+
+def get_job_runs() -> dict[str, dict]:
+    with DB_LOCK:
+        _execute(
+            "SELECT name, last_slot, started_at, finished_at, status, error, duration_ms, runs, failures "
+            "FROM job_runs"
+        )
+        rows = cursor.fetchall()
+    return {
+        row[0]: {
+            "last_slot": row[1],
+            "started_at": row[2],
+            "finished_at": row[3],
+            "status": row[4],
+            "error": row[5],
+            "duration_ms": int(row[6] or 0),
+            "runs": int(row[7] or 0),
+            "failures": int(row[8] or 0),
+        }
+        for row in rows
+    }
+
+
+def record_job_start(name: str, slot: str) -> None:
+    with DB_LOCK:
+        _execute(
+            "INSERT INTO job_runs (name, last_slot, started_at, status) VALUES (?, ?, ?, 'running') "
+            "ON CONFLICT(name) DO UPDATE SET "
+            "last_slot = excluded.last_slot, started_at = excluded.started_at, status = excluded.status",
+            (name, slot, _now_ts())
+        )
+        conn.commit()
+
+
+def record_job_finish(name: str, status: str, duration_ms: int, error: str | None = None) -> None:
+    failed = 1 if status != "ok" else 0
+    with DB_LOCK:
+        _execute(
+            "UPDATE job_runs SET finished_at = ?, status = ?, error = ?, duration_ms = ?, "
+            "runs = COALESCE(runs, 0) + 1, failures = COALESCE(failures, 0) + ? "
+            "WHERE name = ?",
+            (_now_ts(), status, (error or "")[:500] or None, duration_ms, failed, name)
+        )
+        conn.commit()
+
+
+# На Postgres лидер держит advisory-блокировку на отдельном соединении: если процесс умер,
+# соединение закрывается и блокировка снимается сразу. На SQLite — аренда строки с продлением.
+LEADER_LOCK = threading.Lock()
+_leader_conn = None
+_leader_held = False
+
+
+def _leader_lock_key(name: str) -> int:
+    digest = hashlib.blake2b(f"leader:{name}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _drop_leader_connection_locked() -> None:
+    global _leader_conn, _leader_held
+    try:
+        if _leader_conn is not None:
+            _leader_conn.close()
+    except Exception:
+        pass
+    _leader_conn = None
+    _leader_held = False
+
+
+def _acquire_leader_lock(name: str) -> bool:
+    global _leader_conn, _leader_held
+    with LEADER_LOCK:
+        try:
+            if _leader_conn is None:
+                _leader_conn = _open_postgres_connection()
+                _leader_conn.autocommit = True
+            leader_cursor = _leader_conn.cursor()
+            if _leader_held:
+                # Блокировка живёт, пока живо соединение: достаточно убедиться, что оно не оборвалось.
+                try:
+                    leader_cursor.execute("SELECT 1")
+                    leader_cursor.fetchone()
+                except Exception:
+                    # С обрывом соединения сервер уже снял блокировку, и её может взять другая реплика:
+                    # это потеря лидерства, а не временный сбой, который можно переждать.
+                    _drop_leader_connection_locked()
+                    return False
+                return True
+            leader_cursor.execute("SELECT pg_try_advisory_lock(%s)", (_leader_lock_key(name),))
+            row = leader_cursor.fetchone()
+            _leader_held = bool(row and row[0])
+            return _leader_held
+        except Exception:
+            _drop_leader_connection_locked()
+            raise
+
+
+def _acquire_leader_lease(name: str, owner: str, lease_seconds: float) -> bool:
+    now_ms = int(time.time() * 1000)
+    with DB_LOCK:
+        _execute(
+            "INSERT INTO leader_leases (name, owner, expires_at, renewed_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET "
+            "owner = excluded.owner, expires_at = excluded.expires_at, renewed_at = excluded.renewed_at "
+            "WHERE leader_leases.owner = excluded.owner OR leader_leases.expires_at < ?",
+            (name, owner, now_ms + int(lease_seconds * 1000), _now_ts(), now_ms)
+        )
+        conn.commit()
+        _execute("SELECT owner FROM leader_leases WHERE name = ?", (name,))
+        row = cursor.fetchone()
+    return bool(row) and row[0] == owner
+
+
+def acquire_leadership(name: str, owner: str, lease_seconds: float) -> bool:
+    if DB_KIND == "postgres":
+        return _acquire_leader_lock(name)
+    return _acquire_leader_lease(name, owner, lease_seconds)
+
+
+def release_leadership(name: str, owner: str) -> None:
+    if DB_KIND == "postgres":
+        with LEADER_LOCK:
+            _drop_leader_connection_locked()
+        return
+    with DB_LOCK:
+        _execute(
+            "UPDATE leader_leases SET expires_at = 0 WHERE name = ? AND owner = ?",
+            (name, owner)
+        )
+        conn.commit()
+
+
+def add_scheduled_deletions(
+    chat_id: int,
+    message_ids: list[int],
+    due_at_ms: int,
+    tag: str | None = None,
+    owner: str | None = None,
+) -> None:
+    if not message_ids:
+        return
+    ts = _now_ts()
+    with DB_LOCK:
+        _executemany(
+            "INSERT INTO scheduled_deletions (chat_id, message_id, due_at, tag, created_at, owner) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(chat_id, message_id) DO UPDATE SET due_at = excluded.due_at, tag = excluded.tag, owner = excluded.owner",
+            [(chat_id, message_id, due_at_ms, tag, ts, owner) for message_id in message_ids]
+        )
+        conn.commit()
+
+
+def remove_scheduled_deletions(items: list[tuple[int, int]]) -> None:
+    if not items:
+        return
+    with DB_LOCK:
+        _executemany("DELETE FROM scheduled_deletions WHERE chat_id = ? AND message_id = ?", items)
+        conn.commit()
+
+
+def list_scheduled_deletions(owner: str | None) -> list[tuple[int, int, int, str | None]]:
+    with DB_LOCK:
+        _execute(
+            "SELECT chat_id, message_id, due_at, tag FROM scheduled_deletions WHERE owner = ? ORDER BY due_at",
+            (owner,),
+        )
+        return [(int(row[0]), int(row[1]), int(row[2]), row[3]) for row in cursor.fetchall()]
+
+
+def adopt_scheduled_deletions(owner: str, overdue_before_ms: int) -> int:
+    # Строки без владельца (до миграции) и чужие, просроченные дольше запаса: их реплика не вернулась.
+    with DB_LOCK:
+        _execute(
+            "UPDATE scheduled_deletions SET owner = ? WHERE owner IS NULL OR (owner <> ? AND due_at < ?)",
+            (owner, owner, overdue_before_ms),
+        )
+        adopted = cursor.rowcount or 0
+        conn.commit()
+        return adopted
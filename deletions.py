@@ -0,0 +1,173 @@
+import asyncio
+import heapq
+import logging
+import time
+
+from database import (
+    add_scheduled_deletions,
+    adopt_scheduled_deletions,
+    list_scheduled_deletions,
+    remove_scheduled_deletions,
+)
+from rate_limiter import PRIORITY_BACKGROUND, set_outbound_priority
+
+logger = logging.getLogger(__name__)
+
+DELETION_BATCH_SIZE = 20
+DELETION_CONCURRENCY = 4
+# Живая реплика удаляет в срок; строку, просроченную дольше этого, забирает лидер.
+DELETION_ADOPT_GRACE_SECONDS = 60.0
+
+
+class DeletionScheduler:
+    # Одна куча по времени удаления на весь процесс вместо задачи на каждого пользователя.
+    # Копия хранится в БД с владельцем: каждый процесс при старте поднимает только свои строки,
+    # а строки пропавших реплик забирает лидер (adopt), так что одно сообщение не удаляют дважды.
+    def __init__(
+        self,
+        bot,
+        owner: str | None = None,
+        batch_size: int = DELETION_BATCH_SIZE,
+        concurrency: int = DELETION_CONCURRENCY,
+    ):
+        self.bot = bot
+        self.owner = owner
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self._heap: list[tuple[float, int, int]] = []
+        # chat_id -> {message_id: (срок, метка)}; в куче могут оставаться устаревшие записи, их пропускаем.
+        self._pending: dict[int, dict[int, tuple[float, str | None]]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.scheduled = 0
+        self.deleted = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._pending.values())
+
+    def _push(self, chat_id: int, message_id: int, due: float, tag: str | None) -> None:
+        self._pending.setdefault(chat_id, {})[message_id] = (due, tag)
+        heapq.heappush(self._heap, (due, chat_id, message_id))
+
+    def schedule(self, chat_id: int, message_ids: list[int], delay: float, tag: str | None = None) -> None:
+        if not message_ids:
+            return
+        due = time.time() + delay
+        try:
+            add_scheduled_deletions(chat_id, message_ids, int(due * 1000), tag, owner=self.owner)
+        except Exception:
+            logger.exception("Не удалось сохранить отложенное удаление сообщений")
+        for message_id in message_ids:
+            self._push(chat_id, message_id, due, tag)
+        self.scheduled += len(message_ids)
+        self._wakeup.set()
+
+    def load(self) -> int:
+        loaded = 0
+        for chat_id, message_id, due_ms, tag in list_scheduled_deletions(self.owner):
+            if message_id in self._pending.get(chat_id, {}):
+                continue
+            self._push(chat_id, message_id, due_ms / 1000, tag)
+            loaded += 1
+        if loaded:
+            self._wakeup.set()
+        return loaded
+
+    def adopt(self, grace: float = DELETION_ADOPT_GRACE_SECONDS) -> int:
+        if not adopt_scheduled_deletions(self.owner, int((time.time() - grace) * 1000)):
+            return 0
+        return self.load()
+
+    def _take(self, chat_id: int, message_id: int) -> tuple[float, str | None] | None:
+        items = self._pending.get(chat_id)
+        if not items:
+            return None
+        entry = items.pop(message_id, None)
+        if not items:
+            del self._pending[chat_id]
+        return entry
+
+    async def delete_now(self, chat_id: int, tag: str | None = None) -> int:
+        items = self._pending.get(chat_id)
+        if not items:
+            return 0
+        message_ids = [message_id for message_id, (_, item_tag) in items.items() if tag is None or item_tag == tag]
+        for message_id in message_ids:
+            self._take(chat_id, message_id)
+        await self._delete([(chat_id, message_id) for message_id in message_ids])
+        return len(message_ids)
+
+    def _pop_due(self, now: float) -> list[tuple[int, int]]:
+        batch = []
+        while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+            due, chat_id, message_id = heapq.heappop(self._heap)
+            entry = self._pending.get(chat_id, {}).get(message_id)
+            if entry is None or entry[0] != due:
+                # Уже удалено досрочно или перенесено на другой срок.
+                continue
+            self._take(chat_id, message_id)
+            batch.append((chat_id, message_id))
+        return batch
+
+    async def _delete(self, items: list[tuple[int, int]]) -> None:
+        if not items:
+            return
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def delete_one(chat_id: int, message_id: int):
+            async with semaphore:
+                try:
+                    await self.bot.delete_message(chat_id, message_id)
+                    self.deleted += 1
+                except Exception:
+                    # Пользователь удалил сам, заблокировал бота или сообщение старше 48 часов.
+                    self.failed += 1
+
+        await asyncio.gather(*(delete_one(chat_id, message_id) for chat_id, message_id in items))
+        try:
+            remove_scheduled_deletions(items)
+        except Exception:
+            logger.exception("Не удалось убрать выполненные удаления из БД")
+
+    async def _run(self) -> None:
+        set_outbound_priority(PRIORITY_BACKGROUND)
+        while True:
+            batch = self._pop_due(time.time())
+            if batch:
+                try:
+                    await self._delete(batch)
+                except Exception:
+                    logger.exception("Ошибка отложенного удаления сообщений")
+                continue
+            self._wakeup.clear()
+            timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+            # asyncio.wait, а не wait_for: на 3.11 wait_for может проглотить отмену при одновременном set().
+            waiter = asyncio.ensure_future(self._wakeup.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=timeout)
+            finally:
+                waiter.cancel()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            try:
+                self.load()
+            except Exception:
+                logger.exception("Не удалось загрузить отложенные удаления")
+            self._task = asyncio.create_task(self._run(), name="deletion_scheduler")
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self),
+            "heap": len(self._heap),
+            "scheduled": self.scheduled,
+            "deleted": self.deleted,
+            "failed": self.failed,
+        }
@@ -127,19 +127,29 @@ def append_application_row(data: dict[str, Any], user_id: int, status: str):
     wb.save(EXCEL_PATH)
 
 def update_application_status(user_id: int, status: str):
-    if not EXCEL_PATH.exists():
+    update_application_statuses({user_id: status})
+
+
+def update_application_statuses(statuses: dict[int, str]):
+    # Одна загрузка и одно сохранение книги на всю пачку решений.
+    if not statuses or not EXCEL_PATH.exists():
         return
+    wanted = {str(user_id): status for user_id, status in statuses.items()}
     wb = load_workbook(EXCEL_PATH)
     ws = wb.active
-    target_row = None
+    target_rows: dict[str, int] = {}
     for row in range(2, ws.max_row + 1):
-        val = ws.cell(row=row, column=len(HEADERS)).value
-        val_alt = ws.cell(row=row, column=len(HEADERS) - 1).value
-        if str(val) == str(user_id) or str(val_alt) == str(user_id):
-            target_row = row
-    if not target_row:
+        val = str(ws.cell(row=row, column=len(HEADERS)).value)
+        val_alt = str(ws.cell(row=row, column=len(HEADERS) - 1).value)
+        if val in wanted:
+            target_rows[val] = row
+        elif val_alt in wanted:
+            target_rows[val_alt] = row
+    if not target_rows:
         return
-    ws.cell(row=target_row, column=HEADERS.index("Статус") + 1).value = status
+    status_column = HEADERS.index("Статус") + 1
+    for user_id, row in target_rows.items():
+        ws.cell(row=row, column=status_column).value = wanted[user_id]
     wb.save(EXCEL_PATH)
 
 
@@ -0,0 +1,284 @@
+import asyncio
+import inspect
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from database import get_job_runs, record_job_finish, record_job_start
+from time_utils import get_display_tz
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_CONCURRENCY = 2
+# Просыпаемся не реже раза в минуту: переживаем перевод часов и долгий сон хоста.
+MAX_SLEEP_SECONDS = 60.0
+# минуты, часы, день месяца, месяц, день недели (0 и 7 — воскресенье)
+CRON_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_cron_field(raw: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in raw.split(","):
+        step = 1
+        if "/" in part:
+            part, step_raw = part.split("/", 1)
+            step = int(step_raw)
+            if step < 1:
+                raise ValueError(f"Некорректный шаг в cron-поле {raw!r}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_raw, end_raw = part.split("-", 1)
+            start, end = int(start_raw), int(end_raw)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Значение вне диапазона в cron-поле {raw!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron-выражение должно состоять из 5 полей: {expr!r}")
+        self.expr = expr
+        parsed = [_parse_cron_field(raw, low, high) for raw, (low, high) in zip(fields, CRON_FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # Как в cron: если заданы и день месяца, и день недели, достаточно совпадения любого из них.
+        self._days_or = fields[2] != "*" and fields[4] != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_month = moment.day in self.days
+        in_week = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._days_or:
+            return in_month or in_week
+        return in_month and in_week
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron-выражение {self.expr!r} никогда не срабатывает")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expr!r})"
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        schedule: CronSchedule,
+        func: Callable[[], Awaitable[None] | None],
+        catch_up: bool = True,
+        timeout: float | None = None,
+        run_on_start: bool = False,
+    ):
+        self.name = name
+        self.schedule = schedule
+        self.func = func
+        self.catch_up = catch_up
+        self.timeout = timeout
+        self.run_on_start = run_on_start
+        self.next_run: datetime | None = None
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_status: str | None = None
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+
+    async def call(self) -> None:
+        if inspect.iscoroutinefunction(self.func):
+            await self.func()
+        else:
+            # Синхронные задачи (чистка БД) не должны блокировать цикл событий.
+            await asyncio.to_thread(self.func)
+
+    def record(self, status: str, duration: float) -> None:
+        self.runs += 1
+        if status != "ok":
+            self.failures += 1
+        self.last_status = status
+        self.last_duration = duration
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+
+
+class JobScheduler:
+    def __init__(self, max_concurrency: int = DEFAULT_JOB_CONCURRENCY, tz=None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tz = tz
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._jobs: dict[str, Job] = {}
+        self._runs: set[asyncio.Task] = set()
+        self._loop_task: asyncio.Task | None = None
+
+    def _now(self) -> datetime:
+        return datetime.now(self.tz or get_display_tz())
+
+    def add(
+        self,
+        name: str,
+        cron: str,
+        func: Callable[[], Awaitable[None] | None],
+        catch_up: bool = True,
+        timeout: float | None = None,
+        run_on_start: bool = False,
+    ) -> Job:
+        if name in self._jobs:
+            raise ValueError(f"Задача {name!r} уже зарегистрирована")
+        job = Job(name, CronSchedule(cron), func, catch_up=catch_up, timeout=timeout, run_on_start=run_on_start)
+        self._jobs[name] = job
+        return job
+
+    def _plan(self) -> None:
+        now = self._now()
+        try:
+            history = get_job_runs()
+        except Exception:
+            logger.exception("Не удалось прочитать историю фоновых задач")
+            history = {}
+        for job in self._jobs.values():
+            job.next_run = job.schedule.next_after(now)
+            if job.run_on_start:
+                # Чистка, которая раньше шла при каждом запуске: первый прогон сразу, дальше по расписанию.
+                job.next_run = now
+                continue
+            last_slot = (history.get(job.name) or {}).get("last_slot")
+            if not job.catch_up or not last_slot:
+                continue
+            try:
+                missed = job.schedule.next_after(datetime.fromisoformat(last_slot).astimezone(now.tzinfo))
+            except ValueError:
+                continue
+            if missed <= now:
+                # Сколько бы запусков ни пропустили за время простоя, догоняем одним.
+                logger.info("Фоновая задача %s пропустила запуск %s, выполняю сейчас", job.name, missed)
+                job.next_run = missed
+
+    def start(self) -> None:
+        if self._loop_task is not None and not self._loop_task.done():
+            return
+        if not self._jobs:
+            return
+        self._plan()
+        self._loop_task = asyncio.create_task(self._loop(), name="job_scheduler")
+
+    async def _loop(self) -> None:
+        while True:
+            now = self._now()
+            for job in self._jobs.values():
+                if job.next_run is not None and job.next_run <= now:
+                    slot = job.next_run
+                    job.next_run = job.schedule.next_after(max(now, slot))
+                    self._launch(job, slot)
+            wake_at = min(job.next_run for job in self._jobs.values())
+            delay = (wake_at - self._now()).total_seconds()
+            await asyncio.sleep(min(max(delay, 0.0), MAX_SLEEP_SECONDS))
+
+    def _launch(self, job: Job, slot: datetime) -> None:
+        if job.running:
+            job.skipped += 1
+            logger.warning("Фоновая задача %s ещё выполняется, запуск %s пропущен", job.name, slot)
+            return
+        job.running = True
+        task = asyncio.create_task(self._run(job, slot), name=f"job_{job.name}")
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+
+    async def _run(self, job: Job, slot: datetime) -> None:
+        call: asyncio.Future | None = None
+        try:
+            async with self._semaphore:
+                try:
+                    record_job_start(job.name, slot.isoformat())
+                except Exception:
+                    logger.exception("Не удалось записать запуск фоновой задачи %s", job.name)
+                started = time.monotonic()
+                status, error = "ok", None
+                call = asyncio.ensure_future(job.call())
+                try:
+                    if job.timeout:
+                        # shield: поток синхронной задачи не прервать, поэтому по таймауту
+                        # отменяем только корутины, а поток дожидаемся в _release.
+                        await asyncio.wait_for(asyncio.shield(call), job.timeout)
+                    else:
+                        await call
+                except asyncio.TimeoutError:
+                    if inspect.iscoroutinefunction(job.func):
+                        call.cancel()
+                    status, error = "timeout", f"дольше {job.timeout:.0f} с"
+                    logger.error("Фоновая задача %s прервана по таймауту", job.name)
+                except Exception as exc:
+                    status, error = "error", repr(exc)
+                    logger.exception("Ошибка фоновой задачи %s", job.name)
+                duration = time.monotonic() - started
+                job.record(status, duration)
+                try:
+                    record_job_finish(job.name, status, int(duration * 1000), error)
+                except Exception:
+                    logger.exception("Не удалось записать результат фоновой задачи %s", job.name)
+        finally:
+            self._release(job, call)
+
+    @staticmethod
+    def _release(job: Job, call: asyncio.Future | None) -> None:
+        if call is None or call.done() or inspect.iscoroutinefunction(job.func):
+            job.running = False
+            return
+        # Поток ещё держит DB_LOCK: задача считается выполняющейся, пока он не вернётся,
+        # иначе следующий запуск наложится на незавершённый.
+        logger.warning("Фоновая задача %s ещё работает в потоке после таймаута", job.name)
+
+        def _finished(fut: asyncio.Future) -> None:
+            job.running = False
+            if not fut.cancelled() and fut.exception() is not None:
+                logger.error("Фоновая задача %s завершилась с ошибкой после таймаута: %r", job.name, fut.exception())
+
+        call.add_done_callback(_finished)
+
+    async def shutdown(self) -> None:
+        tasks = list(self._runs)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.max_concurrency,
+            "running": sum(1 for job in self._jobs.values() if job.running),
+            "jobs": {
+                job.name: {
+                    "cron": job.schedule.expr,
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "skipped": job.skipped,
+                    "running": job.running,
+                    "last_status": job.last_status,
+                    "last_duration": job.last_duration,
+                    "avg_duration": (job.total_duration / job.runs) if job.runs else 0.0,
+                    "max_duration": job.max_duration,
+                    "next_run": job.next_run,
+                }
+                for job in self._jobs.values()
+            },
+        }
@@ -1,13 +1,83 @@
+import functools
 import os
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from texts import t, field_title
+from texts import DEFAULT_LANG, SUPPORTED_LANGS, normalize_lang, t, field_title
+from callback_data import (
+    AdminAccept,
+    AdminBroadcast,
+    AdminBroadcastStop,
+    AdminBulk,
+    AdminCompact,
+    AdminCompactOpen,
+    AdminList,
+    AdminMenu,
+    AdminPhotos,
+    AdminPost,
+    AdminPostDelete,
+    AdminPostEditCancel,
+    AdminPostEditPhoto,
+    AdminPostEditText,
+    AdminPosts,
+    AdminReject,
+    AdminResetDb,
+    AdminReview,
+    AdminStatus,
+    AdminViewPhoto,
+    EditField,
+    EditPhoto,
+    RejectTemplate,
+    SetLang,
+)
 
 SITE_URL = (os.getenv("SITE_URL") or "https://streamflowagency.com").strip().rstrip("/")
 CHANNEL_LINK = (os.getenv("CHANNEL_LINK") or "https://t.me/streamflowagency").strip()
+ADMIN_KEYBOARD_CACHE_SIZE = 512
+
+
+def copy_markup(markup: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
+    # В aiogram 3.0 модели изменяемые (frozen=False): отдаём копию, чтобы правка
+    # одной клавиатуры не испортила закэшированный экземпляр для всех следующих.
+    # Кнопки копируются поверхностно — их поля строки; это в 2–4 раза дешевле сборки заново.
+    return markup.model_copy(update={
+        "inline_keyboard": [[button.model_copy() for button in row] for row in markup.inline_keyboard]
+    })
+
+
+def per_language(builder):
+    # Статичные клавиатуры собираются один раз на каждый язык при импорте.
+    compiled = {lang: builder(lang) for lang in SUPPORTED_LANGS}
+
+    @functools.wraps(builder)
+    def get(lang: str = DEFAULT_LANG):
+        markup = compiled.get(lang)
+        if markup is None:
+            markup = compiled[normalize_lang(lang)]
+        return copy_markup(markup)
+
+    get.compiled = compiled
+    return get
+
+
+def cached_markup(maxsize: int | None = ADMIN_KEYBOARD_CACHE_SIZE):
+    # Кэш клавиатур с параметрами; наружу, как и в per_language, уходит копия.
+    def decorate(builder):
+        cached = functools.lru_cache(maxsize=maxsize)(builder)
+
+        @functools.wraps(builder)
+        def get(*args, **kwargs):
+            return copy_markup(cached(*args, **kwargs))
+
+        get.cache_info = cached.cache_info
+        get.cache_clear = cached.cache_clear
+        return get
+
+    return decorate
+
 
 # ================= MAIN MENU =================
 
+@per_language
 def main_menu(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=t(lang, "menu_be_model"), callback_data="apply")],
@@ -21,6 +91,7 @@ def main_menu(lang: str = "ru"):
 
 # ================= UNIVERSAL =================
 
+@per_language
 def back_to_menu(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=t(lang, "menu_home"), callback_data="main_menu")]
@@ -28,6 +99,7 @@ def back_to_menu(lang: str = "ru"):
 
 # ================= FORM =================
 
+@per_language
 def form_keyboard(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=t(lang, "btn_back"), callback_data="form_back")],
@@ -36,6 +108,7 @@ def form_keyboard(lang: str = "ru"):
 
 # ================= PREVIEW =================
 
+@per_language
 def preview_keyboard(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [
@@ -52,33 +125,36 @@ def preview_keyboard(lang: str = "ru"):
 
 # ================= PREVIEW EDIT FIELDS =================
 
+@per_language
 def preview_edit_menu(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text=field_title("name", lang), callback_data="edit:name")],
-        [InlineKeyboardButton(text=field_title("city", lang), callback_data="edit:city")],
-        [InlineKeyboardButton(text=field_title("phone", lang), callback_data="edit:phone")],
-        [InlineKeyboardButton(text=field_title("age", lang), callback_data="edit:age")],
-        [InlineKeyboardButton(text=field_title("living", lang), callback_data="edit:living")],
-        [InlineKeyboardButton(text=field_title("devices", lang), callback_data="edit:devices")],
-        [InlineKeyboardButton(text=field_title("device_model", lang), callback_data="edit:device_model")],
-        [InlineKeyboardButton(text=field_title("work_time", lang), callback_data="edit:work_time")],
-        [InlineKeyboardButton(text=field_title("headphones", lang), callback_data="edit:headphones")],
-        [InlineKeyboardButton(text=field_title("telegram", lang), callback_data="edit:telegram")],
-        [InlineKeyboardButton(text=field_title("experience", lang), callback_data="edit:experience")],
+        [InlineKeyboardButton(text=field_title("name", lang), callback_data=EditField(field="name").pack())],
+        [InlineKeyboardButton(text=field_title("city", lang), callback_data=EditField(field="city").pack())],
+        [InlineKeyboardButton(text=field_title("phone", lang), callback_data=EditField(field="phone").pack())],
+        [InlineKeyboardButton(text=field_title("age", lang), callback_data=EditField(field="age").pack())],
+        [InlineKeyboardButton(text=field_title("living", lang), callback_data=EditField(field="living").pack())],
+        [InlineKeyboardButton(text=field_title("devices", lang), callback_data=EditField(field="devices").pack())],
+        [InlineKeyboardButton(text=field_title("device_model", lang), callback_data=EditField(field="device_model").pack())],
+        [InlineKeyboardButton(text=field_title("work_time", lang), callback_data=EditField(field="work_time").pack())],
+        [InlineKeyboardButton(text=field_title("headphones", lang), callback_data=EditField(field="headphones").pack())],
+        [InlineKeyboardButton(text=field_title("telegram", lang), callback_data=EditField(field="telegram").pack())],
+        [InlineKeyboardButton(text=field_title("experience", lang), callback_data=EditField(field="experience").pack())],
         [InlineKeyboardButton(text=t(lang, "btn_back"), callback_data="preview_back")]
     ])
 
 # ================= PREVIEW EDIT PHOTO =================
 
+@per_language
 def preview_edit_photo_menu(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text=t(lang, "photo_face_label"), callback_data="edit_photo:face")],
-        [InlineKeyboardButton(text=t(lang, "photo_full_label"), callback_data="edit_photo:full")],
+        [InlineKeyboardButton(text=t(lang, "photo_face_label"), callback_data=EditPhoto(kind="face").pack())],
+        [InlineKeyboardButton(text=t(lang, "photo_full_label"), callback_data=EditPhoto(kind="full").pack())],
         [InlineKeyboardButton(text=t(lang, "btn_back_to_preview"), callback_data="preview_back")]
     ])
 
 # ================= ABOUT =================
 
+@per_language
 def about_menu(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=t(lang, "about_menu_work"), callback_data="about_work")],
@@ -89,6 +165,7 @@ def about_menu(lang: str = "ru"):
 
 # ================= PORTFOLIO =================
 
+@per_language
 def portfolio_menu(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=t(lang, "portfolio_menu_reviews"), callback_data="portfolio_reviews")],
@@ -99,12 +176,14 @@ def portfolio_menu(lang: str = "ru"):
 
 # ================= APPLY / CONTINUE =================
 
+@per_language
 def reapply_keyboard(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=t(lang, "btn_apply_again"), callback_data="apply_restart")],
         [InlineKeyboardButton(text=t(lang, "menu_home"), callback_data="main_menu")]
     ])
 
+@per_language
 def continue_form_keyboard(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=t(lang, "btn_continue"), callback_data="form_continue")],
@@ -114,17 +193,18 @@ def continue_form_keyboard(lang: str = "ru"):
 
 # ================= ADMIN =================
 
+@cached_markup()
 def admin_decision(user_id: int, contact_url: str | None = None):
     contact = contact_url or f"tg://user?id={user_id}"
     return InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(
                 text="✅ Принять",
-                callback_data=f"admin_accept:{user_id}"
+                callback_data=AdminAccept(user_id=user_id).pack()
             ),
             InlineKeyboardButton(
                 text="❌ Отклонить",
-                callback_data=f"admin_reject:{user_id}"
+                callback_data=AdminReject(user_id=user_id).pack()
             )
         ],
         [
@@ -135,23 +215,24 @@ def admin_decision(user_id: int, contact_url: str | None = None):
         ]
     ])
 
+@cached_markup()
 def admin_pending_keyboard(user_id: int, contact_url: str | None = None):
     contact = contact_url or f"tg://user?id={user_id}"
     return InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(
                 text="🟡 На рассмотрении",
-                callback_data=f"admin_status:{user_id}:pending"
+                callback_data=AdminStatus(user_id=user_id, status="pending").pack()
             )
         ],
         [
             InlineKeyboardButton(
                 text="✅ Принять",
-                callback_data=f"admin_accept:{user_id}"
+                callback_data=AdminAccept(user_id=user_id).pack()
             ),
             InlineKeyboardButton(
                 text="❌ Отклонить",
-                callback_data=f"admin_reject:{user_id}"
+                callback_data=AdminReject(user_id=user_id).pack()
             )
         ],
         [
@@ -162,13 +243,14 @@ def admin_pending_keyboard(user_id: int, contact_url: str | None = None):
         ]
     ])
 
+@cached_markup()
 def admin_accepted_keyboard(user_id: int, contact_url: str | None = None):
     contact = contact_url or f"tg://user?id={user_id}"
     return InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(
                 text="✅ Принято",
-                callback_data=f"admin_status:{user_id}:accepted"
+                callback_data=AdminStatus(user_id=user_id, status="accepted").pack()
             )
         ],
         [
@@ -179,13 +261,14 @@ def admin_accepted_keyboard(user_id: int, contact_url: str | None = None):
         ]
     ])
 
+@cached_markup()
 def admin_rejected_keyboard(user_id: int, contact_url: str | None = None):
     contact = contact_url or f"tg://user?id={user_id}"
     return InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(
                 text="❌ Отклонено",
-                callback_data=f"admin_status:{user_id}:rejected"
+                callback_data=AdminStatus(user_id=user_id, status="rejected").pack()
             )
         ],
         [
@@ -195,49 +278,67 @@ def admin_rejected_keyboard(user_id: int, contact_url: str | None = None):
             )
         ]
     ])
+@per_language
 def cancel_keyboard(lang: str = "ru"):
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text=t(lang, "btn_cancel"), callback_data="edit_cancel")]
     ])
 
 
-def language_keyboard(current_lang: str = "ru", include_home: bool = True):
+def _build_language_keyboard(current_lang: str = "ru", include_home: bool = True):
     def lang_label(code: str, title: str) -> str:
         return f"✅ {title}" if code == current_lang else title
 
     rows = [
         [
-            InlineKeyboardButton(text=lang_label("ru", "Русский"), callback_data="set_lang:ru"),
-            InlineKeyboardButton(text=lang_label("en", "English"), callback_data="set_lang:en"),
+            InlineKeyboardButton(text=lang_label("ru", "Русский"), callback_data=SetLang(lang="ru").pack()),
+            InlineKeyboardButton(text=lang_label("en", "English"), callback_data=SetLang(lang="en").pack()),
         ],
         [
-            InlineKeyboardButton(text=lang_label("pt", "Português"), callback_data="set_lang:pt"),
-            InlineKeyboardButton(text=lang_label("es", "Español"), callback_data="set_lang:es"),
+            InlineKeyboardButton(text=lang_label("pt", "Português"), callback_data=SetLang(lang="pt").pack()),
+            InlineKeyboardButton(text=lang_label("es", "Español"), callback_data=SetLang(lang="es").pack()),
         ],
     ]
     if include_home:
         rows.append([InlineKeyboardButton(text=t(current_lang, "menu_home"), callback_data="main_menu")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
+
+LANGUAGE_KEYBOARDS = {
+    (lang, include_home): _build_language_keyboard(lang, include_home)
+    for lang in SUPPORTED_LANGS
+    for include_home in (True, False)
+}
+
+
+def language_keyboard(current_lang: str = "ru", include_home: bool = True):
+    markup = LANGUAGE_KEYBOARDS.get((current_lang, include_home))
+    if markup is None:
+        return _build_language_keyboard(current_lang, include_home)
+    return copy_markup(markup)
+
+@cached_markup(maxsize=None)
 def reject_templates_keyboard():
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🕊 Сейчас не актуально", callback_data="reject_tpl:1")],
-        [InlineKeyboardButton(text="🧩 Не совпали условия", callback_data="reject_tpl:2")],
-        [InlineKeyboardButton(text="🕐 Вернёмся позже", callback_data="reject_tpl:3")],
-        [InlineKeyboardButton(text="✍️ Своя причина", callback_data="reject_tpl:custom")],
-        [InlineKeyboardButton(text="⬅️ В админ-меню", callback_data="admin_menu:refresh")],
+        [InlineKeyboardButton(text="🕊 Сейчас не актуально", callback_data=RejectTemplate(code="1").pack())],
+        [InlineKeyboardButton(text="🧩 Не совпали условия", callback_data=RejectTemplate(code="2").pack())],
+        [InlineKeyboardButton(text="🕐 Вернёмся позже", callback_data=RejectTemplate(code="3").pack())],
+        [InlineKeyboardButton(text="✍️ Своя причина", callback_data=RejectTemplate(code="custom").pack())],
+        [InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack())],
     ])
 
+@cached_markup(maxsize=None)
 def reject_reason_keyboard():
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="⬅️ В админ-меню", callback_data="admin_menu:refresh")]
+        [InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack())]
     ])
 
+@cached_markup(maxsize=None)
 def confirm_reset_db_keyboard():
     return InlineKeyboardMarkup(inline_keyboard=[
         [
-            InlineKeyboardButton(text="⚠️ Да, обнулить", callback_data="admin_reset_db:confirm"),
-            InlineKeyboardButton(text="Отмена", callback_data="admin_reset_db:cancel")
+            InlineKeyboardButton(text="⚠️ Да, обнулить", callback_data=AdminResetDb(action="confirm").pack()),
+            InlineKeyboardButton(text="Отмена", callback_data=AdminResetDb(action="cancel").pack())
         ]
     ])
 
@@ -248,52 +349,86 @@ def admin_menu_keyboard(counts: dict | None = None):
     total = counts.get("total", pending + accepted + rejected) if counts else 0
     return InlineKeyboardMarkup(inline_keyboard=[
         [
-            InlineKeyboardButton(text="📝 Создать пост", callback_data="admin_menu:create_post")
+            InlineKeyboardButton(text="📝 Создать пост", callback_data=AdminMenu(action="create_post").pack())
         ],
         [
-            InlineKeyboardButton(text="📣 Выложенные посты", callback_data="admin_menu:posts")
+            InlineKeyboardButton(text="📣 Выложенные посты", callback_data=AdminMenu(action="posts").pack())
         ],
         [
             InlineKeyboardButton(
                 text=f"⏳ Ожидают подтверждения!! Просмотреть ({pending})",
-                callback_data="admin_menu:pending"
+                callback_data=AdminMenu(action="pending").pack()
             )
         ],
         [
             InlineKeyboardButton(
                 text=f"✅ Принятые ({accepted})",
-                callback_data="admin_menu:accepted"
+                callback_data=AdminMenu(action="accepted").pack()
             )
         ],
         [
             InlineKeyboardButton(
                 text=f"❌ Отклонённые ({rejected})",
-                callback_data="admin_menu:rejected"
+                callback_data=AdminMenu(action="rejected").pack()
             )
         ],
         [
             InlineKeyboardButton(
                 text=f"📚 Все заявки ({total})",
-                callback_data="admin_menu:all"
+                callback_data=AdminMenu(action="all").pack()
             )
         ],
         [
-            InlineKeyboardButton(text="📊 Статистика", callback_data="admin_menu:stats"),
-            InlineKeyboardButton(text="📁 Excel", callback_data="admin_menu:excel")
+            InlineKeyboardButton(
+                text="▶️ Разбор по очереди",
+                callback_data=AdminReview(action="start").pack()
+            )
         ],
         [
-            InlineKeyboardButton(text="🧹 Архивировать старые", callback_data="admin_menu:archive")
+            InlineKeyboardButton(
+                text="🗒 Компактный список",
+                callback_data=AdminCompact(filter_key="pending").pack()
+            )
         ],
         [
-            InlineKeyboardButton(text="⚠️ Сбросить базу", callback_data="admin_menu:reset"),
-            InlineKeyboardButton(text="🔄 Обновить меню", callback_data="admin_menu:refresh")
+            InlineKeyboardButton(text="📊 Статистика", callback_data=AdminMenu(action="stats").pack()),
+            InlineKeyboardButton(text="📁 Excel", callback_data=AdminMenu(action="excel").pack())
+        ],
+        [
+            InlineKeyboardButton(text="🧹 Архивировать старые", callback_data=AdminMenu(action="archive").pack())
+        ],
+        [
+            InlineKeyboardButton(text="⚠️ Сбросить базу", callback_data=AdminMenu(action="reset").pack()),
+            InlineKeyboardButton(text="🔄 Обновить меню", callback_data=AdminMenu(action="refresh").pack())
         ]
     ])
 
+@cached_markup(maxsize=None)
 def admin_create_post_keyboard():
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="❌ Отменить", callback_data="admin_post:cancel")],
-        [InlineKeyboardButton(text="⬅️ В админ-меню", callback_data="admin_menu:refresh")],
+        [InlineKeyboardButton(text="❌ Отменить", callback_data=AdminPost(action="cancel").pack())],
+        [InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack())],
+    ])
+
+
+@cached_markup(maxsize=None)
+def admin_broadcast_cancel_keyboard():
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Отменить", callback_data=AdminBroadcast(action="cancel").pack())],
+    ])
+
+
+def admin_broadcast_confirm_keyboard(total: int):
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"📣 Отправить ({total})", callback_data=AdminBroadcast(action="confirm").pack())],
+        [InlineKeyboardButton(text="❌ Отменить", callback_data=AdminBroadcast(action="cancel").pack())],
+    ])
+
+
+@cached_markup()
+def admin_broadcast_progress_keyboard(job_id: int):
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="⛔ Остановить рассылку", callback_data=AdminBroadcastStop(job_id=job_id).pack())],
     ])
 
 
@@ -307,47 +442,50 @@ def _post_media_edit_button_label(content_type: str) -> str:
     }.get(normalized, "🖼 Изменить медиа")
 
 
+@cached_markup()
 def admin_posts_view_keyboard(post_id: int, offset: int, total: int, content_type: str):
     normalized = (content_type or "").strip().lower()
     can_edit_media = normalized in {"photo", "video", "document", "animation"}
     rows = [
-        [InlineKeyboardButton(text="✏️ Изменить текст", callback_data=f"admin_post_edit_text:{post_id}:{offset}")]
+        [InlineKeyboardButton(text="✏️ Изменить текст", callback_data=AdminPostEditText(post_id=post_id, offset=offset).pack())]
     ]
     if can_edit_media:
         rows.append(
             [
                 InlineKeyboardButton(
                     text=_post_media_edit_button_label(normalized),
-                    callback_data=f"admin_post_edit_photo:{post_id}:{offset}",
+                    callback_data=AdminPostEditPhoto(post_id=post_id, offset=offset).pack(),
                 )
             ]
         )
     rows.append(
-        [InlineKeyboardButton(text="🗑 Удалить из каналов", callback_data=f"admin_post_delete:{post_id}:{offset}")]
+        [InlineKeyboardButton(text="🗑 Удалить из каналов", callback_data=AdminPostDelete(post_id=post_id, offset=offset).pack())]
     )
 
     prev_offset = offset - 1
     next_offset = offset + 1
     nav_row = []
     if prev_offset >= 0:
-        nav_row.append(InlineKeyboardButton(text="⬅️ Предыдущий", callback_data=f"admin_posts:{prev_offset}"))
+        nav_row.append(InlineKeyboardButton(text="⬅️ Предыдущий", callback_data=AdminPosts(offset=prev_offset).pack()))
     if next_offset < total:
-        nav_row.append(InlineKeyboardButton(text="Следующий ➡️", callback_data=f"admin_posts:{next_offset}"))
+        nav_row.append(InlineKeyboardButton(text="Следующий ➡️", callback_data=AdminPosts(offset=next_offset).pack()))
     if nav_row:
         rows.append(nav_row)
 
-    rows.append([InlineKeyboardButton(text="⬅️ В админ-меню", callback_data="admin_menu:refresh")])
+    rows.append([InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack())])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@cached_markup()
 def admin_posts_edit_keyboard(post_id: int, offset: int):
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="❌ Отменить", callback_data=f"admin_post_edit_cancel:{post_id}:{offset}")],
-            [InlineKeyboardButton(text="⬅️ В админ-меню", callback_data="admin_menu:refresh")],
+            [InlineKeyboardButton(text="❌ Отменить", callback_data=AdminPostEditCancel(post_id=post_id, offset=offset).pack())],
+            [InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack())],
         ]
     )
 
+@cached_markup()
 def admin_list_nav_keyboard(filter_key: str, offset: int, total: int, limit: int):
     buttons = []
     prev_offset = offset - limit
@@ -357,47 +495,263 @@ def admin_list_nav_keyboard(filter_key: str, offset: int, total: int, limit: int
         nav_row.append(
             InlineKeyboardButton(
                 text="⬅️ Предыдущая",
-                callback_data=f"admin_list:{filter_key}:{prev_offset}"
+                callback_data=AdminList(filter_key=filter_key, offset=prev_offset).pack()
             )
         )
     if next_offset < total:
         nav_row.append(
             InlineKeyboardButton(
                 text="Следующая ➡️",
-                callback_data=f"admin_list:{filter_key}:{next_offset}"
+                callback_data=AdminList(filter_key=filter_key, offset=next_offset).pack()
             )
         )
     if nav_row:
         buttons.append(nav_row)
     buttons.append([
-        InlineKeyboardButton(text="⬅️ В админ-меню", callback_data="admin_menu:refresh")
+        InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack())
     ])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+ADMIN_COMPACT_FILTERS = (
+    ("pending", "⏳"),
+    ("accepted", "✅"),
+    ("rejected", "❌"),
+    ("all", "📚"),
+)
+
+
+# Результаты /find открываются и закрываются как страница компактного списка с этим ключом.
+ADMIN_FIND_FILTER_KEY = "find"
+
+
+def _admin_compact_item_rows(filter_key: str, offset: int, items: tuple[tuple[int, int, str], ...]):
+    # items: (номер строки на странице, user_id, статус)
+    rows = []
+    for number, user_id, status in items:
+        row = []
+        if status == "pending":
+            row.append(InlineKeyboardButton(
+                text=f"✅ {number}",
+                callback_data=AdminAccept(user_id=user_id, mode="compact", filter_key=filter_key, offset=offset).pack()
+            ))
+            row.append(InlineKeyboardButton(
+                text=f"❌ {number}",
+                callback_data=AdminReject(user_id=user_id, mode="compact", filter_key=filter_key, offset=offset).pack()
+            ))
+        row.append(InlineKeyboardButton(
+            text=f"👁 {number}",
+            callback_data=AdminCompactOpen(user_id=user_id, filter_key=filter_key, offset=offset).pack()
+        ))
+        rows.append(row)
+    return rows
+
+
+def _admin_compact_nav_row(filter_key: str, offset: int, total: int, limit: int):
+    nav_row = []
+    if offset - limit >= 0:
+        nav_row.append(InlineKeyboardButton(
+            text="⬅️ Предыдущая",
+            callback_data=AdminCompact(filter_key=filter_key, offset=max(offset - limit, 0)).pack()
+        ))
+    if offset + limit < total:
+        nav_row.append(InlineKeyboardButton(
+            text="Следующая ➡️",
+            callback_data=AdminCompact(filter_key=filter_key, offset=offset + limit).pack()
+        ))
+    return nav_row
+
+
+@cached_markup()
+def admin_compact_page_keyboard(
+    filter_key: str,
+    offset: int,
+    total: int,
+    limit: int,
+    items: tuple[tuple[int, int, str], ...]
+):
+    rows = _admin_compact_item_rows(filter_key, offset, items)
+    nav_row = _admin_compact_nav_row(filter_key, offset, total, limit)
+    if nav_row:
+        rows.append(nav_row)
+    rows.append([
+        InlineKeyboardButton(
+            text=f"• {icon}" if key == filter_key else icon,
+            callback_data=AdminCompact(filter_key=key).pack()
+        )
+        for key, icon in ADMIN_COMPACT_FILTERS
+    ])
+    rows.append([
+        InlineKeyboardButton(text="☑️ Выбрать несколько", callback_data=AdminBulk(action="start").pack())
+    ])
+    rows.append([
+        InlineKeyboardButton(text="🗂 По одной", callback_data=AdminList(filter_key=filter_key, offset=offset).pack()),
+        InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack()),
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@cached_markup()
+def admin_find_page_keyboard(offset: int, total: int, limit: int, items: tuple[tuple[int, int, str], ...]):
+    rows = _admin_compact_item_rows(ADMIN_FIND_FILTER_KEY, offset, items)
+    nav_row = _admin_compact_nav_row(ADMIN_FIND_FILTER_KEY, offset, total, limit)
+    if nav_row:
+        rows.append(nav_row)
+    rows.append([
+        InlineKeyboardButton(text="🗒 Компактный список", callback_data=AdminCompact(filter_key="pending").pack()),
+        InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack()),
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+BULK_TOGGLES_PER_ROW = 5
+BULK_REJECT_TEMPLATES = (
+    ("1", "🕊 Сейчас не актуально"),
+    ("2", "🧩 Не совпали условия"),
+    ("3", "🕐 Вернёмся позже"),
+)
+
+
+def admin_bulk_page_keyboard(
+    offset: int,
+    total: int,
+    limit: int,
+    items: tuple[tuple[int, int, bool], ...],
+    selected: int
+):
+    # items: (номер заявки, user_id, выбрана ли)
+    toggles = [
+        InlineKeyboardButton(
+            text=f"{'☑' if checked else '☐'} {number}",
+            callback_data=AdminBulk(action="toggle", value=str(user_id)).pack()
+        )
+        for number, user_id, checked in items
+    ]
+    rows = [toggles[start:start + BULK_TOGGLES_PER_ROW] for start in range(0, len(toggles), BULK_TOGGLES_PER_ROW)]
+    rows.append([
+        InlineKeyboardButton(text="☑ Страницу", callback_data=AdminBulk(action="select_page", value=str(offset)).pack()),
+        InlineKeyboardButton(text=f"☑ Все ({total})", callback_data=AdminBulk(action="select_all").pack()),
+        InlineKeyboardButton(text="☐ Снять", callback_data=AdminBulk(action="clear").pack()),
+    ])
+    nav_row = []
+    if offset - limit >= 0:
+        nav_row.append(InlineKeyboardButton(
+            text="⬅️ Предыдущая",
+            callback_data=AdminBulk(action="page", value=str(max(offset - limit, 0))).pack()
+        ))
+    if offset + limit < total:
+        nav_row.append(InlineKeyboardButton(
+            text="Следующая ➡️",
+            callback_data=AdminBulk(action="page", value=str(offset + limit)).pack()
+        ))
+    if nav_row:
+        rows.append(nav_row)
+    if selected:
+        rows.append([
+            InlineKeyboardButton(text=f"✅ Принять ({selected})", callback_data=AdminBulk(action="accept").pack()),
+            InlineKeyboardButton(text=f"❌ Отклонить ({selected})", callback_data=AdminBulk(action="reject").pack()),
+        ])
+    rows.append([
+        InlineKeyboardButton(text="✖️ Выйти из выбора", callback_data=AdminBulk(action="cancel").pack())
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@cached_markup(maxsize=None)
+def admin_bulk_reject_keyboard():
+    rows = [
+        [InlineKeyboardButton(text=label, callback_data=AdminBulk(action="reject_tpl", value=code).pack())]
+        for code, label in BULK_REJECT_TEMPLATES
+    ]
+    rows.append([InlineKeyboardButton(text="⬅️ К выбору", callback_data=AdminBulk(action="page").pack())])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@cached_markup(maxsize=None)
+def admin_bulk_confirm_keyboard():
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text="✔️ Подтвердить", callback_data=AdminBulk(action="confirm").pack()),
+            InlineKeyboardButton(text="⬅️ К выбору", callback_data=AdminBulk(action="page").pack()),
+        ]
+    ])
+
+
+@cached_markup()
+def admin_compact_card_keyboard(
+    user_id: int,
+    status: str,
+    filter_key: str,
+    offset: int,
+    contact_url: str | None = None
+):
+    contact = contact_url or f"tg://user?id={user_id}"
+    rows = []
+    if status == "pending":
+        rows.append([
+            InlineKeyboardButton(
+                text="✅ Принять",
+                callback_data=AdminAccept(user_id=user_id, mode="compact", filter_key=filter_key, offset=offset).pack()
+            ),
+            InlineKeyboardButton(
+                text="❌ Отклонить",
+                callback_data=AdminReject(user_id=user_id, mode="compact", filter_key=filter_key, offset=offset).pack()
+            ),
+        ])
+    rows.append([
+        InlineKeyboardButton(text="💬 Написать кандидату", url=contact)
+    ])
+    rows.append([
+        InlineKeyboardButton(text="✖️ Закрыть карточку", callback_data=AdminCompact(filter_key=filter_key, offset=offset).pack())
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@cached_markup()
+def admin_review_keyboard(user_id: int, contact_url: str | None = None):
+    contact = contact_url or f"tg://user?id={user_id}"
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text="✅ Принять", callback_data=AdminAccept(user_id=user_id, mode="review").pack()),
+            InlineKeyboardButton(text="❌ Отклонить", callback_data=AdminReject(user_id=user_id, mode="review").pack()),
+        ],
+        [
+            InlineKeyboardButton(text="⏭ Пропустить", callback_data=AdminReview(action="skip", user_id=user_id).pack())
+        ],
+        [
+            InlineKeyboardButton(text="💬 Написать кандидату", url=contact)
+        ],
+        [
+            InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack())
+        ],
+    ])
+
+
+@cached_markup()
 def admin_list_item_keyboard(user_id: int, status: str, contact_url: str | None = None):
     contact = contact_url or f"tg://user?id={user_id}"
     rows = []
     if status == "pending":
         rows.append([
-            InlineKeyboardButton(text="✅ Принять", callback_data=f"admin_accept:{user_id}:view"),
-            InlineKeyboardButton(text="❌ Отклонить", callback_data=f"admin_reject:{user_id}:view"),
+            InlineKeyboardButton(text="✅ Принять", callback_data=AdminAccept(user_id=user_id, mode="view").pack()),
+            InlineKeyboardButton(text="❌ Отклонить", callback_data=AdminReject(user_id=user_id, mode="view").pack()),
         ])
     elif status == "accepted":
         rows.append([
-            InlineKeyboardButton(text="✅ Принято", callback_data=f"admin_status:{user_id}:accepted")
+            InlineKeyboardButton(text="✅ Принято", callback_data=AdminStatus(user_id=user_id, status="accepted").pack())
         ])
     elif status == "rejected":
         rows.append([
-            InlineKeyboardButton(text="❌ Отклонено", callback_data=f"admin_status:{user_id}:rejected")
+            InlineKeyboardButton(text="❌ Отклонено", callback_data=AdminStatus(user_id=user_id, status="rejected").pack())
         ])
     rows.append([
-        InlineKeyboardButton(text="📷 Фото", callback_data=f"admin_photos:{user_id}")
+        InlineKeyboardButton(text="📷 Фото", callback_data=AdminPhotos(user_id=user_id).pack())
     ])
     rows.append([
         InlineKeyboardButton(text="💬 Написать кандидату", url=contact)
     ])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
+@cached_markup()
 def admin_list_view_keyboard(
     user_id: int,
     status: str,
@@ -411,21 +765,21 @@ def admin_list_view_keyboard(
     rows = []
     if status == "pending":
         rows.append([
-            InlineKeyboardButton(text="✅ Принять", callback_data=f"admin_accept:{user_id}:view"),
-            InlineKeyboardButton(text="❌ Отклонить", callback_data=f"admin_reject:{user_id}:view"),
+            InlineKeyboardButton(text="✅ Принять", callback_data=AdminAccept(user_id=user_id, mode="view").pack()),
+            InlineKeyboardButton(text="❌ Отклонить", callback_data=AdminReject(user_id=user_id, mode="view").pack()),
         ])
     elif status == "accepted":
         rows.append([
-            InlineKeyboardButton(text="✅ Принято", callback_data=f"admin_status:{user_id}:accepted")
+            InlineKeyboardButton(text="✅ Принято", callback_data=AdminStatus(user_id=user_id, status="accepted").pack())
         ])
     elif status == "rejected":
         rows.append([
-            InlineKeyboardButton(text="❌ Отклонено", callback_data=f"admin_status:{user_id}:rejected")
+            InlineKeyboardButton(text="❌ Отклонено", callback_data=AdminStatus(user_id=user_id, status="rejected").pack())
         ])
 
     rows.append([
-        InlineKeyboardButton(text="📷 Анфас", callback_data=f"admin_view_photo:{user_id}:face:{filter_key}:{offset}"),
-        InlineKeyboardButton(text="🧍 В полный рост", callback_data=f"admin_view_photo:{user_id}:full:{filter_key}:{offset}")
+        InlineKeyboardButton(text="📷 Анфас", callback_data=AdminViewPhoto(user_id=user_id, kind="face", filter_key=filter_key, offset=offset).pack()),
+        InlineKeyboardButton(text="🧍 В полный рост", callback_data=AdminViewPhoto(user_id=user_id, kind="full", filter_key=filter_key, offset=offset).pack())
     ])
     rows.append([
         InlineKeyboardButton(text="💬 Написать кандидату", url=contact)
@@ -438,20 +792,20 @@ def admin_list_view_keyboard(
         nav_row.append(
             InlineKeyboardButton(
                 text="⬅️ Предыдущая",
-                callback_data=f"admin_list:{filter_key}:{prev_offset}"
+                callback_data=AdminList(filter_key=filter_key, offset=prev_offset).pack()
             )
         )
     if next_offset < total:
         nav_row.append(
             InlineKeyboardButton(
                 text="Следующая ➡️",
-                callback_data=f"admin_list:{filter_key}:{next_offset}"
+                callback_data=AdminList(filter_key=filter_key, offset=next_offset).pack()
             )
         )
     if nav_row:
         rows.append(nav_row)
 
     rows.append([
-        InlineKeyboardButton(text="⬅️ В админ-меню", callback_data="admin_menu:refresh")
+        InlineKeyboardButton(text="⬅️ В админ-меню", callback_data=AdminMenu(action="refresh").pack())
     ])
     return InlineKeyboardMarkup(inline_keyboard=rows)
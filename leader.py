@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from database import acquire_leadership, release_leadership
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 15.0
+
+
+class LeaderElection:
+    # Одна реплика становится лидером и выполняет единичные задачи (расписание, админ-меню, рассылки).
+    # Остальные проверяют блокировку каждые lease/3 секунд и подхватывают её, когда лидер пропал.
+    def __init__(
+        self,
+        name: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        on_elected: Callable[[], Awaitable[None]] | None = None,
+        on_demoted: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.name = name
+        self.lease_seconds = max(3.0, lease_seconds)
+        self.heartbeat = self.lease_seconds / 3
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.is_leader = False
+        self.elections = 0
+        self.demotions = 0
+        self.errors = 0
+        self._renewed_at = 0.0
+        self._leader_since: float | None = None
+        self._task: asyncio.Task | None = None
+        self._elected_task: asyncio.Task | None = None
+
+    async def _acquire(self) -> bool | None:
+        try:
+            return await asyncio.to_thread(acquire_leadership, self.name, self.owner, self.lease_seconds)
+        except Exception:
+            self.errors += 1
+            logger.exception("Ошибка проверки лидерства (%s)", self.name)
+            return None
+
+    async def _promote(self) -> None:
+        self.is_leader = True
+        self.elections += 1
+        self._leader_since = time.monotonic()
+        logger.info("Реплика %s стала лидером (%s)", self.owner, self.name)
+        if self.on_elected is not None:
+            # Запуск фоновых задач не должен задерживать продление аренды.
+            self._elected_task = asyncio.create_task(self._call(self.on_elected), name=f"leader_elected_{self.name}")
+
+    async def _demote(self) -> None:
+        self.is_leader = False
+        self.demotions += 1
+        self._leader_since = None
+        logger.warning("Реплика %s больше не лидер (%s)", self.owner, self.name)
+        if self._elected_task is not None and not self._elected_task.done():
+            self._elected_task.cancel()
+            await asyncio.gather(self._elected_task, return_exceptions=True)
+        self._elected_task = None
+        if self.on_demoted is not None:
+            await self._call(self.on_demoted)
+
+    async def _call(self, callback: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await callback()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Ошибка смены лидерства (%s)", self.name)
+
+    async def _run(self) -> None:
+        while True:
+            held = await self._acquire()
+            now = time.monotonic()
+            if held:
+                self._renewed_at = now
+                if not self.is_leader:
+                    await self._promote()
+            elif self.is_leader:
+                # Блокировку занял другой (или на Postgres оборвалось её соединение) — уступаем сразу;
+                # при сбое БД с арендой на SQLite держимся, пока аренда не истекает.
+                if held is False or now - self._renewed_at >= self.lease_seconds - self.heartbeat:
+                    await self._demote()
+            await asyncio.sleep(self.heartbeat)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"leader_election_{self.name}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            await self._demote()
+        try:
+            # Освобождаем сразу, чтобы другая реплика не ждала истечения аренды.
+            await asyncio.to_thread(release_leadership, self.name, self.owner)
+        except Exception:
+            logger.exception("Не удалось освободить лидерство (%s)", self.name)
+
+    def stats(self) -> dict:
+        return {
+            "owner": self.owner,
+            "is_leader": self.is_leader,
+            "leader_for": (time.monotonic() - self._leader_since) if self._leader_since else 0.0,
+            "elections": self.elections,
+            "demotions": self.demotions,
+            "errors": self.errors,
+        }
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, Message
+
+from database import get_media_file, set_media_file, delete_media_file
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+MEDIA_DIR = "media"
+PREWARM_EXTRA_PATHS = ("web/assets/portfolio.pdf",)
+MEDIA_KIND_BY_SUFFIX = {
+    ".jpg": "photo",
+    ".jpeg": "photo",
+    ".png": "photo",
+    ".mp4": "video",
+    ".mov": "video",
+    ".pdf": "document",
+}
+# Только ответы о недействительном file_id: прочие ошибки (права, лимиты) не должны сбрасывать кэш.
+REJECTED_FILE_ID_MARKERS = (
+    "wrong file identifier",
+    "wrong remote file identifier",
+    "wrong file_id",
+)
+
+# path -> (mtime_ns, size, sha256): файл перечитываем только если он изменился на диске.
+_HASH_CACHE: dict[str, tuple[int, int, str]] = {}
+
+
+def resolve_media_path(path: str | Path) -> Path:
+    candidate = Path(path)
+    if not candidate.is_absolute():
+        candidate = BASE_DIR / candidate
+    return candidate
+
+
+def media_key(path: str | Path) -> str:
+    resolved = resolve_media_path(path)
+    try:
+        return resolved.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def content_hash(path: str | Path) -> str:
+    resolved = resolve_media_path(path)
+    stat = resolved.stat()
+    key = str(resolved)
+    cached = _HASH_CACHE.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    digest = hashlib.sha256()
+    with resolved.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    _HASH_CACHE[key] = (stat.st_mtime_ns, stat.st_size, value)
+    return value
+
+
+def cached_file_id(path: str | Path) -> str | None:
+    row = get_media_file(media_key(path))
+    if not row:
+        return None
+    try:
+        current_hash = content_hash(path)
+    except FileNotFoundError:
+        return row["file_id"]
+    if row["content_hash"] != current_hash:
+        return None
+    return row["file_id"]
+
+
+def media_source(path: str | Path) -> str | FSInputFile:
+    return cached_file_id(path) or FSInputFile(str(resolve_media_path(path)))
+
+
+def file_id_from_message(message: Message | None) -> str | None:
+    if message is None:
+        return None
+    if message.photo:
+        return message.photo[-1].file_id
+    for attr in ("video", "document", "animation", "audio", "voice"):
+        media = getattr(message, attr, None)
+        if media is not None:
+            return media.file_id
+    return None
+
+
+def remember_media(path: str | Path, message: Message | None) -> str | None:
+    file_id = file_id_from_message(message)
+    if not file_id:
+        return None
+    try:
+        set_media_file(media_key(path), content_hash(path), file_id)
+    except Exception:
+        logger.exception("Не удалось сохранить file_id для %s", path)
+    return file_id
+
+
+def forget_media(path: str | Path) -> None:
+    delete_media_file(media_key(path))
+
+
+def is_file_id_rejected(exc: Exception) -> bool:
+    text = str(exc).lower()
+    return any(marker in text for marker in REJECTED_FILE_ID_MARKERS)
+
+
+async def send_cached_media(
+    path: str | Path,
+    send: Callable[[str | FSInputFile], Awaitable[Message]],
+) -> Message:
+    file_id = cached_file_id(path)
+    if file_id:
+        try:
+            return await send(file_id)
+        except TelegramBadRequest as exc:
+            if not is_file_id_rejected(exc):
+                raise
+            logger.warning("Telegram отклонил file_id для %s, загружаю файл заново", path)
+            forget_media(path)
+    message = await send(FSInputFile(str(resolve_media_path(path))))
+    remember_media(path, message)
+    return message
+
+
+async def send_cached_media_group(
+    paths: list[str | Path],
+    media_class,
+    send_group: Callable[[list], Awaitable[list[Message]]],
+) -> list[Message]:
+    file_ids = [cached_file_id(path) for path in paths]
+    if any(file_ids):
+        try:
+            messages = await send_group(
+                [
+                    media_class(media=file_id or FSInputFile(str(resolve_media_path(path))))
+                    for path, file_id in zip(paths, file_ids)
+                ]
+            )
+        except TelegramBadRequest as exc:
+            if not is_file_id_rejected(exc):
+                raise
+            logger.warning("Telegram отклонил file_id в альбоме, загружаю файлы заново")
+            for path in paths:
+                forget_media(path)
+        else:
+            for path, file_id, message in zip(paths, file_ids, messages):
+                if not file_id:
+                    remember_media(path, message)
+            return messages
+    messages = await send_group(
+        [media_class(media=FSInputFile(str(resolve_media_path(path)))) for path in paths]
+    )
+    for path, message in zip(paths, messages):
+        remember_media(path, message)
+    return messages
+
+
+def media_kind(path: str | Path) -> str | None:
+    return MEDIA_KIND_BY_SUFFIX.get(Path(path).suffix.lower())
+
+
+def bundled_media_paths() -> list[str]:
+    paths: list[str] = []
+    media_dir = resolve_media_path(MEDIA_DIR)
+    if media_dir.is_dir():
+        for item in sorted(media_dir.rglob("*")):
+            if item.is_file() and media_kind(item):
+                paths.append(media_key(item))
+    for extra in PREWARM_EXTRA_PATHS:
+        if resolve_media_path(extra).is_file() and extra not in paths:
+            paths.append(extra)
+    return paths
+
+
+async def _upload_media(bot, chat_id: int, path: str) -> Message:
+    source = FSInputFile(str(resolve_media_path(path)))
+    kind = media_kind(path)
+    if kind == "photo":
+        return await bot.send_photo(chat_id, source, disable_notification=True)
+    if kind == "video":
+        return await bot.send_video(chat_id, source, disable_notification=True)
+    return await bot.send_document(chat_id, source, disable_notification=True)
+
+
+async def prewarm_media(
+    bot,
+    chat_id: int,
+    paths: list[str] | None = None,
+    concurrency: int = 2,
+    delete_after: bool = False,
+    force: bool = False,
+    progress: Callable[[dict], Awaitable[None]] | None = None,
+) -> dict:
+    paths = bundled_media_paths() if paths is None else paths
+    report = {"total": len(paths), "done": 0, "uploaded": 0, "cached": 0, "failed": []}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def worker(path: str) -> None:
+        try:
+            if not force and cached_file_id(path):
+                report["cached"] += 1
+                return
+            async with semaphore:
+                message = await _upload_media(bot, chat_id, path)
+                if remember_media(path, message):
+                    report["uploaded"] += 1
+                else:
+                    report["failed"].append(path)
+                if delete_after:
+                    try:
+                        await bot.delete_message(chat_id, message.message_id)
+                    except Exception:
+                        pass
+        except Exception:
+            logger.exception("Ошибка предзагрузки медиа %s", path)
+            report["failed"].append(path)
+        finally:
+            report["done"] += 1
+            if progress is not None:
+                try:
+                    await progress(report)
+                except Exception:
+                    logger.exception("Ошибка обновления прогресса предзагрузки")
+
+    await asyncio.gather(*(worker(path) for path in paths))
+    return report
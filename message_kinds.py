@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+from contextvars import ContextVar
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.methods import (
+    DeleteMessage,
+    EditMessageCaption,
+    EditMessageMedia,
+    EditMessageReplyMarkup,
+    EditMessageText,
+)
+
+from database import is_tracked_user_message, record_user_message_edit
+
+MESSAGE_KIND_TEXT = "text"
+# Фото, видео и документы: текст живёт в подписи и меняется через editMessageCaption.
+MESSAGE_KIND_CAPTION = "caption"
+MEDIA_ATTRS = ("photo", "video", "document", "animation", "audio", "voice")
+
+# Сообщение, на кнопку которого сейчас нажали: оно точно ещё есть в чате.
+_visible_message: ContextVar[tuple[int, int] | None] = ContextVar("visible_message", default=None)
+
+
+def message_kind(message) -> str:
+    if any(getattr(message, attr, None) for attr in MEDIA_ATTRS) or getattr(message, "caption", None) is not None:
+        return MESSAGE_KIND_CAPTION
+    return MESSAGE_KIND_TEXT
+
+
+def content_hash(text: str | None, reply_markup=None) -> str:
+    markup = reply_markup.model_dump_json(exclude_none=True) if reply_markup is not None else ""
+    return hashlib.sha1(f"{text or ''}\x00{markup}".encode("utf-8")).hexdigest()[:16]
+
+
+def mark_message_visible(chat_id: int, message_id: int) -> None:
+    _visible_message.set((chat_id, message_id))
+
+
+def is_message_visible(chat_id: int, message_id: int) -> bool:
+    return _visible_message.get() == (chat_id, message_id)
+
+
+async def edit_message_by_kind(bot, chat_id: int, message_id: int, kind: str | None, text: str, reply_markup=None):
+    if kind == MESSAGE_KIND_CAPTION:
+        return await bot.edit_message_caption(
+            chat_id=chat_id,
+            message_id=message_id,
+            caption=text,
+            reply_markup=reply_markup,
+        )
+    return await bot.edit_message_text(
+        chat_id=chat_id,
+        message_id=message_id,
+        text=text,
+        reply_markup=reply_markup,
+    )
+
+
+class MessageRegistryMiddleware(BaseRequestMiddleware):
+    # Любая правка или удаление сообщения пользователя (в том числе через call.message.edit_*)
+    # обновляет сохранённый хеш, иначе пропуск «неизменённых» правок показал бы устаревшее меню.
+    # В БД идут только меню и шаг анкеты (или сообщения неизвестных кэшу пользователей), и не из цикла событий.
+    async def __call__(self, make_request, bot, method):
+        result = await make_request(bot, method)
+        chat_id = getattr(method, "chat_id", None)
+        message_id = getattr(method, "message_id", None)
+        if not isinstance(chat_id, int) or chat_id <= 0 or not message_id:
+            return result
+        if isinstance(method, EditMessageText):
+            digest = content_hash(method.text, method.reply_markup)
+        elif isinstance(method, EditMessageCaption):
+            digest = content_hash(method.caption, method.reply_markup)
+        elif isinstance(method, (EditMessageMedia, EditMessageReplyMarkup, DeleteMessage)):
+            digest = None
+        else:
+            return result
+        if is_tracked_user_message(chat_id, message_id) is False:
+            return result
+        await asyncio.to_thread(record_user_message_edit, chat_id, message_id, digest)
+        return result
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from aiogram import BaseMiddleware
+
+from rate_limiter import TokenBucket
+
+FLOOD_MAX_USERS = 10000
+MEDIA_ATTRS = ("photo", "video", "document", "animation", "audio", "voice", "video_note", "sticker")
+
+
+class UserOrderingMiddleware(BaseMiddleware):
+    def __init__(self, max_concurrency: int = 32):
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # key -> [lock, refcount]: запись живёт, пока у пользователя есть апдейты в работе или в очереди.
+        self._locks: dict[tuple, list] = {}
+        self.active = 0
+        self.waiting = 0
+        self.waiting_max = 0
+        self.handled = 0
+        self.delayed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @staticmethod
+    def _key(data: dict) -> tuple | None:
+        user = data.get("event_from_user")
+        chat = data.get("event_chat")
+        if user is None and chat is None:
+            return None
+        return (chat.id if chat else None, user.id if user else None)
+
+    def _record_wait(self, waited: float) -> None:
+        self.handled += 1
+        if waited > 0.001:
+            self.delayed += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    async def _run(self, handler, event, data, started: float, queued: list):
+        async with self._semaphore:
+            queued[0] = False
+            self.waiting -= 1
+            self.active += 1
+            self._record_wait(time.monotonic() - started)
+            try:
+                return await handler(event, data)
+            finally:
+                self.active -= 1
+
+    async def __call__(self, handler, event, data):
+        started = time.monotonic()
+        self.waiting += 1
+        self.waiting_max = max(self.waiting_max, self.waiting)
+        key = self._key(data)
+        queued = [True]
+        try:
+            if key is None:
+                return await self._run(handler, event, data, started, queued)
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = [asyncio.Lock(), 0]
+                self._locks[key] = entry
+            entry[1] += 1
+            try:
+                # Сначала очередь пользователя, потом общий лимит: ждущие апдейты не занимают слоты.
+                async with entry[0]:
+                    return await self._run(handler, event, data, started, queued)
+            finally:
+                entry[1] -= 1
+                if entry[1] <= 0 and self._locks.get(key) is entry:
+                    del self._locks[key]
+        finally:
+            if queued[0]:
+                self.waiting -= 1
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "waiting_max": self.waiting_max,
+            "keys": len(self._locks),
+            "handled": self.handled,
+            "delayed": self.delayed,
+            "wait_avg": (self.wait_total / self.delayed) if self.delayed else 0.0,
+            "wait_max": self.wait_max,
+            "limit": self.max_concurrency,
+        }
+
+
+class FloodControlMiddleware(BaseMiddleware):
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]],
+        max_users: int = FLOOD_MAX_USERS,
+        notice: Callable[[object], Awaitable[None]] | None = None,
+        notice_states: frozenset[str] = frozenset(),
+    ):
+        # limits: класс апдейта ("callback", "message", "media") -> (токенов в секунду, размер пачки)
+        self.limits = dict(limits)
+        self.max_users = max(1, max_users)
+        # Текст, отброшенный в одном из notice_states (ответ на вопрос анкеты), не должен пропадать
+        # молча: один раз за серию отвечаем через notice(message).
+        self.notice = notice
+        self.notice_states = notice_states
+        # user_id -> {класс: bucket}; самые давние пользователи вытесняются первыми.
+        self._users: OrderedDict[int, dict[str, TokenBucket]] = OrderedDict()
+        self._noticed: set[int] = set()
+        self.rejected = {kind: 0 for kind in self.limits}
+        self.evicted = 0
+        self.notices = 0
+
+    @staticmethod
+    def _classify(event) -> str | None:
+        if getattr(event, "callback_query", None) is not None:
+            return "callback"
+        message = getattr(event, "message", None)
+        if message is None:
+            return None
+        if any(getattr(message, attr, None) for attr in MEDIA_ATTRS):
+            return "media"
+        return "message"
+
+    def _bucket(self, user_id: int, kind: str) -> TokenBucket:
+        buckets = self._users.get(user_id)
+        if buckets is None:
+            buckets = {}
+            self._users[user_id] = buckets
+            while len(self._users) > self.max_users:
+                evicted, _ = self._users.popitem(last=False)
+                self._noticed.discard(evicted)
+                self.evicted += 1
+        else:
+            self._users.move_to_end(user_id)
+        bucket = buckets.get(kind)
+        if bucket is None:
+            rate, burst = self.limits[kind]
+            bucket = TokenBucket(rate, burst)
+            buckets[kind] = bucket
+        return bucket
+
+    async def __call__(self, handler, event, data):
+        chat = data.get("event_chat")
+        user = data.get("event_from_user")
+        kind = self._classify(event)
+        # Ограничиваем только личные чаты: админ-группа и каналы идут без фильтра.
+        if kind is None or user is None or chat is None or chat.type != "private":
+            return await handler(event, data)
+        now = time.monotonic()
+        bucket = self._bucket(user.id, kind)
+        if bucket.delay(now) > 0:
+            self.rejected[kind] += 1
+            if kind == "callback":
+                # Снимаем «часики» с кнопки, но в обработчики лишнее нажатие не пускаем.
+                try:
+                    await event.callback_query.answer()
+                except Exception:
+                    pass
+            elif kind == "message" and self.notice is not None and data.get("raw_state") in self.notice_states:
+                await self._send_notice(user.id, event.message)
+            return None
+        bucket.take(now)
+        if kind == "message":
+            self._noticed.discard(user.id)
+        return await handler(event, data)
+
+    async def _send_notice(self, user_id: int, message) -> None:
+        if user_id in self._noticed:
+            return
+        self._noticed.add(user_id)
+        self.notices += 1
+        try:
+            await self.notice(message)
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._users),
+            "evicted": self.evicted,
+            "rejected": dict(self.rejected),
+            "notices": self.notices,
+        }
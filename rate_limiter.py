@@ -0,0 +1,344 @@
+import asyncio
+import bisect
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_USER = 0
+PRIORITY_ADMIN = 1
+PRIORITY_BACKGROUND = 2
+
+GLOBAL_RATE_PER_SECOND = 30.0
+PRIVATE_CHAT_RATE_PER_SECOND = 1.0
+PRIVATE_CHAT_BURST = 3.0
+GROUP_RATE_PER_MINUTE = 20.0
+GROUP_BURST = 5.0
+# Фоновые правки в группе (массовые решения, архив) не забирают последний токен:
+# он остаётся для действий админа, иначе каждое нажатие в меню ждёт по 3 с.
+GROUP_INTERACTIVE_RESERVE = 1.0
+MAX_IDLE_BUCKETS = 5000
+
+# Эти методы не отправляют сообщений в чат и лимитами на чат не ограничены.
+UNLIMITED_METHODS = {
+    "answerCallbackQuery",
+    "sendChatAction",
+    "setMyCommands",
+    "approveChatJoinRequest",
+    "declineChatJoinRequest",
+}
+GLOBAL_ONLY_METHODS = {"deleteMessage", "deleteMessages"}
+# В группах и каналах лимит «20 в минуту» считаем по новым сообщениям и правкам: пачка правок
+# карточек в админ-группе иначе упирается в RetryAfter. Удаления идут только под общим лимитом.
+# Исключение — правки в интерактивных чатах (админ-группа) с приоритетом выше фонового, см. is_chat_limited.
+GROUP_LIMITED_METHODS = {
+    "sendMessage",
+    "sendPhoto",
+    "sendVideo",
+    "sendAnimation",
+    "sendDocument",
+    "sendAudio",
+    "sendVoice",
+    "sendMediaGroup",
+    "copyMessage",
+    "copyMessages",
+    "forwardMessage",
+    "forwardMessages",
+    "editMessageText",
+    "editMessageCaption",
+    "editMessageMedia",
+    "editMessageReplyMarkup",
+}
+EDIT_METHODS = {"editMessageText", "editMessageCaption", "editMessageMedia", "editMessageReplyMarkup"}
+
+_outbound_priority: contextvars.ContextVar[int | None] = contextvars.ContextVar("outbound_priority", default=None)
+
+
+def set_outbound_priority(priority: int) -> None:
+    _outbound_priority.set(priority)
+
+
+@contextmanager
+def outbound_priority(priority: int):
+    token = _outbound_priority.set(priority)
+    try:
+        yield
+    finally:
+        _outbound_priority.reset(token)
+
+
+def default_priority(chat_id) -> int:
+    explicit = _outbound_priority.get()
+    if explicit is not None:
+        return explicit
+    if isinstance(chat_id, int) and chat_id > 0:
+        return PRIORITY_USER
+    return PRIORITY_ADMIN
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float, need: float = 1.0) -> float:
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < need:
+            wait = max(wait, (need - self.tokens) / self.rate)
+        return wait
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def reserve(self, now: float) -> float:
+        # Для синхронных клиентов: токен берём сразу, а ждать вызывающий будет сам.
+        wait = self.delay(now)
+        self.take(now)
+        return wait
+
+    def block(self, now: float, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.blocked_until <= now
+
+    def blocked_for(self, now: float) -> float:
+        return max(0.0, self.blocked_until - now)
+
+
+def _tokens_needed(chat_id, priority: int) -> float:
+    if priority >= PRIORITY_BACKGROUND and not (isinstance(chat_id, int) and chat_id > 0):
+        return 1.0 + GROUP_INTERACTIVE_RESERVE
+    return 1.0
+
+
+def _new_chat_bucket(chat_id) -> TokenBucket:
+    if isinstance(chat_id, int) and chat_id > 0:
+        return TokenBucket(PRIVATE_CHAT_RATE_PER_SECOND, PRIVATE_CHAT_BURST)
+    return TokenBucket(GROUP_RATE_PER_MINUTE / 60.0, GROUP_BURST)
+
+
+def is_chat_limited(
+    api_method: str,
+    chat_id,
+    priority: int = PRIORITY_BACKGROUND,
+    interactive_chats=frozenset(),
+) -> bool:
+    # Нужно ли тратить токен лимита чата. Блокировку после RetryAfter чат соблюдает в любом случае.
+    if chat_id is None or api_method in GLOBAL_ONLY_METHODS:
+        return False
+    if api_method in EDIT_METHODS and priority < PRIORITY_BACKGROUND and chat_id in interactive_chats:
+        # Действия админа (следующая карточка, меню) не ждут токена; фоновые правки платят и пропускают их вперёд.
+        return False
+    if isinstance(chat_id, int) and chat_id > 0:
+        return True
+    return api_method in GROUP_LIMITED_METHODS
+
+
+class OutboundScheduler:
+    def __init__(self, global_rate: float = GLOBAL_RATE_PER_SECOND, interactive_chats=()):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.interactive_chats = frozenset(interactive_chats)
+        self.chat_buckets: dict = {}
+        self._waiters: list[list] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._pump_task: asyncio.Task | None = None
+        self.requests = 0
+        self.delayed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.depth_max = 0
+        self.retry_after_count = 0
+
+    def _bucket(self, chat_id) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= MAX_IDLE_BUCKETS:
+                self._prune(time.monotonic())
+            bucket = _new_chat_bucket(chat_id)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        for key in [key for key, bucket in self.chat_buckets.items() if bucket.is_idle(now)]:
+            del self.chat_buckets[key]
+
+    def _ready_in(self, chat_id, limited: bool, now: float, priority: int = PRIORITY_ADMIN) -> float:
+        wait = self.global_bucket.delay(now)
+        if chat_id is not None:
+            bucket = self._bucket(chat_id)
+            if limited:
+                wait = max(wait, bucket.delay(now, _tokens_needed(chat_id, priority)))
+            else:
+                wait = max(wait, bucket.blocked_for(now))
+        return wait
+
+    def _grant(self, chat_id, limited: bool, now: float) -> None:
+        self.global_bucket.take(now)
+        if chat_id is not None and limited:
+            self._bucket(chat_id).take(now)
+
+    def _record(self, waited: float) -> None:
+        self.requests += 1
+        if waited > 0:
+            self.delayed += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    async def acquire(self, chat_id, priority: int = PRIORITY_ADMIN, limited: bool = True) -> float:
+        now = time.monotonic()
+        if not self._waiters and self._ready_in(chat_id, limited, now, priority) <= 0:
+            self._grant(chat_id, limited, now)
+            self._record(0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        bisect.insort(self._waiters, [priority, next(self._seq), chat_id, limited, future, now])
+        self.depth_max = max(self.depth_max, len(self._waiters))
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._waiters = [waiter for waiter in self._waiters if waiter[4] is not future]
+            raise
+
+    async def _pump(self) -> None:
+        while self._waiters:
+            self._wakeup.clear()
+            now = time.monotonic()
+            sleep_for = None
+            granted = False
+            for waiter in list(self._waiters):
+                priority, _seq, chat_id, limited, future, enqueued_at = waiter
+                if future.done():
+                    self._waiters.remove(waiter)
+                    continue
+                global_wait = self.global_bucket.delay(now)
+                if global_wait > 0:
+                    sleep_for = global_wait
+                    break
+                chat_wait = self._ready_in(chat_id, limited, now, priority)
+                if chat_wait <= 0:
+                    self._grant(chat_id, limited, now)
+                    self._waiters.remove(waiter)
+                    waited = now - enqueued_at
+                    self._record(waited)
+                    future.set_result(waited)
+                    granted = True
+                    break
+                sleep_for = chat_wait if sleep_for is None else min(sleep_for, chat_wait)
+            if granted or not self._waiters:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for or 0.05)
+            except asyncio.TimeoutError:
+                pass
+
+    def note_retry_after(self, chat_id, seconds: float) -> None:
+        self.retry_after_count += 1
+        now = time.monotonic()
+        if chat_id is None:
+            self.global_bucket.block(now, seconds)
+        else:
+            self._bucket(chat_id).block(now, seconds)
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._waiters),
+            "queued_max": self.depth_max,
+            "requests": self.requests,
+            "delayed": self.delayed,
+            "wait_avg": (self.wait_total / self.delayed) if self.delayed else 0.0,
+            "wait_max": self.wait_max,
+            "retry_after": self.retry_after_count,
+            "chats": len(self.chat_buckets),
+        }
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    def __init__(self, scheduler: OutboundScheduler, max_retries: int = 3):
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+
+    async def __call__(self, make_request, bot, method):
+        api_method = getattr(method, "__api_method__", "")
+        chat_id = getattr(method, "chat_id", None)
+        if api_method in UNLIMITED_METHODS or api_method.startswith("get") or chat_id is None:
+            return await make_request(bot, method)
+        priority = default_priority(chat_id)
+        limited = is_chat_limited(api_method, chat_id, priority, self.scheduler.interactive_chats)
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(chat_id, priority, limited)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                # Притормаживаем только этот чат, остальные чаты продолжают работать.
+                self.scheduler.note_retry_after(chat_id, exc.retry_after)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.warning(
+                    "Telegram попросил подождать %s с (%s, chat=%s), повтор %s/%s",
+                    exc.retry_after,
+                    api_method,
+                    chat_id,
+                    attempt,
+                    self.max_retries,
+                )
+
+
+class SyncRateLimiter:
+    def __init__(self, global_rate: float = GLOBAL_RATE_PER_SECOND):
+        self._lock = threading.Lock()
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_buckets: dict = {}
+
+    def wait(self, chat_id=None, api_method: str = "sendMessage") -> float:
+        with self._lock:
+            now = time.monotonic()
+            delay = self.global_bucket.reserve(now)
+            if chat_id is not None:
+                bucket = self.chat_buckets.get(chat_id)
+                if bucket is None:
+                    bucket = _new_chat_bucket(chat_id)
+                    self.chat_buckets[chat_id] = bucket
+                if is_chat_limited(api_method, chat_id):
+                    delay = max(delay, bucket.reserve(now))
+                else:
+                    delay = max(delay, bucket.blocked_for(now))
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def block(self, chat_id, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if chat_id is None:
+                bucket = self.global_bucket
+            else:
+                bucket = self.chat_buckets.setdefault(chat_id, _new_chat_bucket(chat_id))
+            bucket.block(now, seconds)
@@ -0,0 +1,111 @@
+import logging
+import time
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+
+from database import clear_user_unreachable, list_unreachable_user_ids, set_user_unreachable
+
+logger = logging.getLogger(__name__)
+
+UNREACHABLE_BAD_REQUEST_MARKERS = (
+    "chat not found",
+    "user not found",
+    "user is deactivated",
+    "peer_id_invalid",
+)
+
+# Отметки ставят и снимают все реплики, поэтому локальную копию периодически перечитываем из БД.
+REACHABILITY_REFRESH_SECONDS = 60.0
+
+_unreachable: set[int] = set()
+_loaded_at: float | None = None
+_skipped_calls = 0
+
+
+def _registry() -> set[int]:
+    global _unreachable, _loaded_at
+    now = time.monotonic()
+    if _loaded_at is None or now - _loaded_at >= REACHABILITY_REFRESH_SECONDS:
+        _loaded_at = now
+        try:
+            _unreachable = set(list_unreachable_user_ids())
+        except Exception:
+            logger.exception("Не удалось загрузить список недоступных пользователей")
+    return _unreachable
+
+
+def _is_private_chat(chat_id) -> bool:
+    return isinstance(chat_id, int) and chat_id > 0
+
+
+def is_unreachable_error(exc: Exception) -> bool:
+    if isinstance(exc, TelegramForbiddenError):
+        return True
+    if isinstance(exc, TelegramBadRequest):
+        text = str(exc).lower()
+        return any(marker in text for marker in UNREACHABLE_BAD_REQUEST_MARKERS)
+    return False
+
+
+def is_user_reachable(user_id: int) -> bool:
+    global _skipped_calls
+    if user_id in _registry():
+        _skipped_calls += 1
+        return False
+    return True
+
+
+def mark_unreachable(user_id: int, reason: str | None = None) -> None:
+    registry = _registry()
+    if user_id in registry:
+        return
+    registry.add(user_id)
+    logger.info("Пользователь %s недоступен: %s", user_id, reason or "-")
+    try:
+        set_user_unreachable(user_id, reason)
+    except Exception:
+        logger.exception("Не удалось сохранить недоступность пользователя %s", user_id)
+
+
+def mark_reachable(user_id: int) -> None:
+    registry = _registry()
+    if user_id not in registry:
+        return
+    registry.discard(user_id)
+    try:
+        clear_user_unreachable(user_id)
+    except Exception:
+        logger.exception("Не удалось снять отметку недоступности пользователя %s", user_id)
+
+
+def reachability_stats() -> dict:
+    return {"unreachable": len(_registry()), "skipped": _skipped_calls}
+
+
+class ReachabilityRequestMiddleware(BaseRequestMiddleware):
+    async def __call__(self, make_request, bot, method):
+        try:
+            return await make_request(bot, method)
+        except (TelegramForbiddenError, TelegramBadRequest) as exc:
+            chat_id = getattr(method, "chat_id", None)
+            if _is_private_chat(chat_id) and is_unreachable_error(exc):
+                mark_unreachable(chat_id, str(exc))
+            raise
+
+
+class ReachabilityUpdateMiddleware(BaseMiddleware):
+    async def __call__(self, handler, event, data):
+        my_chat_member = getattr(event, "my_chat_member", None)
+        if my_chat_member is not None and my_chat_member.chat.type == "private":
+            # Блокировка бота тоже приходит апдейтом от пользователя, её нельзя считать признаком доступности.
+            if my_chat_member.new_chat_member.status == "kicked":
+                mark_unreachable(my_chat_member.chat.id, "bot was blocked by the user")
+            else:
+                mark_reachable(my_chat_member.chat.id)
+        else:
+            user = data.get("event_from_user")
+            if user is not None and not user.is_bot:
+                mark_reachable(user.id)
+        return await handler(event, data)
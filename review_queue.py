@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REVIEW_PREFETCH = 5
+
+
+class ReviewQueue:
+    # Разбор заявок по очереди: держим наготове следующие K заявок на рассмотрении
+    # (строка из БД, отрисованная карточка, file_id фото), чтобы «следующая» была одним вызовом API.
+    # Окно перечитывается в фоне после каждого решения или пропуска.
+    def __init__(
+        self,
+        load: Callable[[int, set[int]], tuple[list[dict], int]],
+        status: Callable[[int], str | None],
+        size: int = DEFAULT_REVIEW_PREFETCH,
+    ):
+        self.load = load
+        self.status = status
+        self.size = max(1, size)
+        self.total = 0
+        self.current: int | None = None
+        self._window: list[dict] = []
+        self._skipped: set[int] = set()
+        self._dirty = False
+        self._task: asyncio.Task | None = None
+        self.hot = 0
+        self.cold = 0
+        self.stale = 0
+        self.refreshes = 0
+
+    async def _refresh_now(self) -> None:
+        exclude = set(self._skipped)
+        if self.current is not None:
+            exclude.add(self.current)
+        # Запрос к БД и отрисовка карточек — в потоке, чтобы не держать остальные обработчики.
+        window, total = await asyncio.to_thread(self.load, self.size, exclude)
+        # Пока окно читалось, админ мог показать или пропустить заявку.
+        self._window = [
+            item for item in window
+            if item["user_id"] != self.current and item["user_id"] not in self._skipped
+        ]
+        self.total = total
+        self.refreshes += 1
+
+    async def _refresh_loop(self) -> None:
+        while self._dirty:
+            self._dirty = False
+            try:
+                await self._refresh_now()
+            except Exception:
+                logger.exception("Не удалось обновить очередь разбора заявок")
+
+    def schedule_refresh(self) -> None:
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop(), name="review_queue_refresh")
+
+    async def next(self) -> dict | None:
+        if self._window:
+            self.hot += 1
+        else:
+            self.cold += 1
+        while True:
+            if not self._window:
+                self.current = None
+                await self._refresh_now()
+                if not self._window and self._skipped:
+                    # Дошли до конца — пропущенные показываем по второму кругу.
+                    self._skipped.clear()
+                    await self._refresh_now()
+            if not self._window:
+                self.current = None
+                return None
+            item = self._window.pop(0)
+            # Окно могло устареть: заявку уже разобрали в другом чате, с сайта или массовым решением.
+            if await asyncio.to_thread(self.status, item["user_id"]) == "pending":
+                break
+            self.stale += 1
+        self.current = item["user_id"]
+        self.schedule_refresh()
+        return item
+
+    def decided(self, user_id: int) -> None:
+        window = [item for item in self._window if item["user_id"] != user_id]
+        if len(window) == len(self._window) and self.current != user_id:
+            return
+        self._window = window
+        if self.current == user_id:
+            self.current = None
+        self.total = max(self.total - 1, 0)
+        self.schedule_refresh()
+
+    def skip(self, user_id: int) -> None:
+        self._skipped.add(user_id)
+        if self.current == user_id:
+            self.current = None
+
+    def restart(self) -> None:
+        # Окно могло устареть, пока режимом не пользовались: первую заявку читаем заново.
+        self._skipped.clear()
+        self._window = []
+        self.current = None
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "prefetched": len(self._window),
+            "pending": self.total,
+            "skipped": len(self._skipped),
+            "hot": self.hot,
+            "cold": self.cold,
+            "stale": self.stale,
+            "refreshes": self.refreshes,
+        }
@@ -30,3 +30,6 @@ class ApplicationStates(StatesGroup):
     admin_create_post = State()
     admin_edit_post_text = State()
     admin_edit_post_photo = State()
+    admin_broadcast_message = State()
+    admin_broadcast_confirm = State()
+    admin_bulk_select = State()
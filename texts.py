@@ -37,6 +37,7 @@ TRANSLATIONS = {
         "support_line_3": "Ещё чуть-чуть — и готово 🌸",
         "status_line": "Статус заявки: {status}",
         "start_private_only": "🤍 Напиши мне в личку и нажми /start ✨",
+        "flood_slow_down": "🌸 Не так быстро 🤍 Подожди пару секунд и отправь ответ ещё раз ✨",
         "open_private_prompt": "🤍 Открой чат с ботом и нажми /start ✨",
         "language_menu_title": "🌐 Выбери язык / Choose your language",
         "language_changed": "✅ Язык изменён: {language}",
@@ -201,6 +202,7 @@ TRANSLATIONS = {
         "support_line_3": "Just one more step 🌸",
         "status_line": "Application status: {status}",
         "start_private_only": "🤍 Please open a private chat with me and tap /start ✨",
+        "flood_slow_down": "🌸 Not so fast 🤍 Wait a couple of seconds and send your answer again ✨",
         "open_private_prompt": "🤍 Open a private chat with the bot and tap /start ✨",
         "language_menu_title": "🌐 Choose your language",
         "language_changed": "✅ Language changed: {language}",
@@ -362,6 +364,7 @@ TRANSLATIONS = {
         "support_line_3": "Falta pouco 🌸",
         "status_line": "Status da candidatura: {status}",
         "start_private_only": "🤍 Abra um chat privado comigo e toque em /start ✨",
+        "flood_slow_down": "🌸 Não tão rápido 🤍 Espere alguns segundos e envie a resposta de novo ✨",
         "open_private_prompt": "🤍 Abra um chat privado com o bot e toque em /start ✨",
         "language_menu_title": "🌐 Escolha seu idioma",
         "language_changed": "✅ Idioma alterado: {language}",
@@ -524,6 +527,7 @@ TRANSLATIONS = {
         "support_line_3": "Falta muy poco 🌸",
         "status_line": "Estado de la solicitud: {status}",
         "start_private_only": "🤍 Escríbeme en privado y pulsa /start ✨",
+        "flood_slow_down": "🌸 No tan rápido 🤍 Espera un par de segundos y envía tu respuesta otra vez ✨",
         "open_private_prompt": "🤍 Abre un chat privado con el bot y pulsa /start ✨",
         "language_menu_title": "🌐 Elige tu idioma",
         "language_changed": "✅ Idioma cambiado: {language}",
@@ -827,11 +831,44 @@ FIELD_TITLES_BY_LANG = {
 }
 
 
+def _compile_catalog(tables: dict) -> dict[str, dict]:
+    base = tables[DEFAULT_LANG]
+    return {code: {**base, **tables.get(code, {})} for code in SUPPORTED_LANGS}
+
+
+# Таблицы собираются один раз при импорте: язык -> ключ -> строка, недостающее уже подставлено из русского.
+TEXT_CATALOG = _compile_catalog(TRANSLATIONS)
+STATUS_LABEL_CATALOG = _compile_catalog(STATUS_LABELS_BY_LANG)
+FORM_QUESTION_CATALOG = _compile_catalog(FORM_QUESTIONS_BY_LANG)
+FIELD_TITLE_CATALOG = _compile_catalog(FIELD_TITLES_BY_LANG)
+CATALOG_SOURCES = {
+    "texts": TRANSLATIONS,
+    "status_labels": STATUS_LABELS_BY_LANG,
+    "form_questions": FORM_QUESTIONS_BY_LANG,
+    "field_titles": FIELD_TITLES_BY_LANG,
+}
+
+
+def _catalog_table(catalog: dict[str, dict], lang: str | None) -> dict:
+    table = catalog.get(lang)
+    if table is None:
+        table = catalog[normalize_lang(lang)]
+    return table
+
+
+def missing_catalog_keys() -> dict[str, list[str]]:
+    missing: dict[str, list[str]] = {}
+    for name, tables in CATALOG_SOURCES.items():
+        base = tables[DEFAULT_LANG]
+        for code in SUPPORTED_LANGS:
+            absent = [str(getattr(key, "state", key)) for key in base if key not in tables.get(code, {})]
+            if absent:
+                missing[f"{name}:{code}"] = absent
+    return missing
+
+
 def t(lang: str | None, key: str, **kwargs) -> str:
-    code = normalize_lang(lang)
-    value = TRANSLATIONS.get(code, {}).get(key)
-    if value is None:
-        value = TRANSLATIONS["ru"].get(key, key)
+    value = _catalog_table(TEXT_CATALOG, lang).get(key, key)
     if kwargs:
         try:
             return value.format(**kwargs)
@@ -841,21 +878,15 @@ def t(lang: str | None, key: str, **kwargs) -> str:
 
 
 def status_label(status: str, lang: str | None = None) -> str:
-    code = normalize_lang(lang)
-    labels = STATUS_LABELS_BY_LANG.get(code) or STATUS_LABELS_BY_LANG["ru"]
-    return labels.get(status, status)
+    return _catalog_table(STATUS_LABEL_CATALOG, lang).get(status, status)
 
 
 def form_question(state: ApplicationStates, lang: str | None = None) -> str:
-    code = normalize_lang(lang)
-    questions = FORM_QUESTIONS_BY_LANG.get(code) or FORM_QUESTIONS_BY_LANG["ru"]
-    return questions[state]
+    return _catalog_table(FORM_QUESTION_CATALOG, lang)[state]
 
 
 def field_title(field_key: str, lang: str | None = None) -> str:
-    code = normalize_lang(lang)
-    labels = FIELD_TITLES_BY_LANG.get(code) or FIELD_TITLES_BY_LANG["ru"]
-    return labels.get(field_key, field_key)
+    return _catalog_table(FIELD_TITLE_CATALOG, lang).get(field_key, field_key)
 
 
 def support_lines(lang: str | None = None) -> list[str]:
@@ -1,8 +1,12 @@
+import asyncio
 import logging
+from typing import Any, Awaitable, Callable
 
 from aiogram.types import CallbackQuery, Message
 from aiogram.exceptions import TelegramBadRequest
 
+from message_kinds import MESSAGE_KIND_CAPTION, content_hash, message_kind
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,8 +24,11 @@ async def edit_or_send(call: CallbackQuery, text: str, reply_markup=None):
     message = call.message
     if message is None:
         return
+    # Текст и кнопки те же — не тратим запрос на ответ «message is not modified».
+    if content_hash(message.html_text, message.reply_markup) == content_hash(text, reply_markup):
+        return
     try:
-        if message.photo or message.caption is not None:
+        if message_kind(message) == MESSAGE_KIND_CAPTION:
             await message.edit_caption(caption=text, reply_markup=reply_markup)
         else:
             await message.edit_text(text, reply_markup=reply_markup)
@@ -44,3 +51,24 @@ async def edit_caption_or_send(message: Message, caption: str, reply_markup=None
         await message.edit_caption(caption=caption, reply_markup=reply_markup)
     except Exception:
         await message.answer(caption, reply_markup=reply_markup)
+
+
+async def fan_out(
+    calls: dict[str, Callable[[], Awaitable[Any]]],
+    limit: int = 4,
+) -> tuple[dict[str, Any], dict[str, Exception]]:
+    semaphore = asyncio.Semaphore(max(1, limit))
+    results: dict[str, Any] = {}
+    errors: dict[str, Exception] = {}
+
+    async def _run(key: str, factory: Callable[[], Awaitable[Any]]):
+        async with semaphore:
+            # RetryAfter повторяет RateLimitMiddleware и закрывает bucket чата; сюда доходит уже итоговая ошибка.
+            try:
+                results[key] = await factory()
+            except Exception as exc:
+                logger.warning("Fan-out call %s failed: %s", key, exc)
+                errors[key] = exc
+
+    await asyncio.gather(*(_run(key, factory) for key, factory in calls.items()))
+    return results, errors
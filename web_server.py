@@ -2,7 +2,9 @@ import json
 import html
 import os
 import re
+import signal
 import ssl
+import threading
 import uuid
 from functools import lru_cache
 import urllib.parse
@@ -15,9 +17,12 @@ from email.policy import default
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
-from database import save_web_application, get_status_counts, get_setting, set_setting
+from database import save_web_application, find_earlier_application, get_status_counts, get_setting, set_setting
 from texts import STATUS_LABELS
 from time_utils import format_submit_time
+from rate_limiter import SyncRateLimiter
+from callback_data import AdminMenu
+from coalescer import ThreadedCoalescer
 
 ROOT_DIR = Path(__file__).parent
 WEB_DIR = ROOT_DIR / "web"
@@ -332,10 +337,31 @@ def submission_country(data: dict) -> str:
         return derived
     return "—"
 
-def build_admin_full_text(data: dict, web_id: str, submitted_at: str) -> str:
+def admin_message_url(message_id: int | None) -> str | None:
+    chat = str(ADMIN_GROUP_ID)
+    if not message_id or not chat.startswith("-100"):
+        return None
+    return f"https://t.me/c/{chat[4:]}/{message_id}"
+
+def build_duplicate_line(earlier: dict | None) -> str:
+    # Та же строка, что в карточке бота (bot.build_duplicate_line).
+    if not earlier:
+        return ""
+    submitted = format_submit_time(str(earlier["submitted_at"])) if earlier["submitted_at"] else "—"
+    label = (
+        f"{_safe(earlier['name'] or '—')}, ID {earlier['user_id']}, "
+        f"{'Сайт' if earlier['source'] == 'site' else 'Бот'}, {_safe(submitted)}"
+    )
+    url = admin_message_url(earlier["admin_message_id"])
+    if url:
+        label = f'<a href="{url}">{label}</a>'
+    return f"👯 <b>Похоже на повторную заявку</b>: {label}\n\n"
+
+def build_admin_full_text(data: dict, web_id: str, submitted_at: str, earlier: dict | None = None) -> str:
     status_label = STATUS_LABELS.get("pending", "🟡 На рассмотрении")
     return (
         "📋 <b>Полная анкета</b>\n\n"
+        f"{build_duplicate_line(earlier)}"
         f"👤 Имя: {_safe(data.get('name'))}\n"
         f"📅 Дата рождения: {_safe(data.get('age'))}\n"
         f"🌍 Город и страна: {_safe(data.get('city'))}\n"
@@ -371,53 +397,64 @@ def build_admin_menu_keyboard(counts: dict) -> dict:
     return {
         "inline_keyboard": [
             [
-                {"text": "📝 Создать пост", "callback_data": "admin_menu:create_post"}
+                {"text": "📝 Создать пост", "callback_data": AdminMenu(action="create_post").pack()}
             ],
             [
-                {"text": "📣 Выложенные посты", "callback_data": "admin_menu:posts"}
+                {"text": "📣 Выложенные посты", "callback_data": AdminMenu(action="posts").pack()}
             ],
             [
                 {
                     "text": f"⏳ Ожидают подтверждения!! Просмотреть ({pending})",
-                    "callback_data": "admin_menu:pending",
+                    "callback_data": AdminMenu(action="pending").pack(),
                 }
             ],
             [
                 {
                     "text": f"✅ Принятые ({accepted})",
-                    "callback_data": "admin_menu:accepted",
+                    "callback_data": AdminMenu(action="accepted").pack(),
                 }
             ],
             [
                 {
                     "text": f"❌ Отклонённые ({rejected})",
-                    "callback_data": "admin_menu:rejected",
+                    "callback_data": AdminMenu(action="rejected").pack(),
                 }
             ],
             [
                 {
                     "text": f"📚 Все заявки ({total})",
-                    "callback_data": "admin_menu:all",
+                    "callback_data": AdminMenu(action="all").pack(),
                 }
             ],
             [
-                {"text": "📊 Статистика", "callback_data": "admin_menu:stats"},
-                {"text": "📁 Excel", "callback_data": "admin_menu:excel"},
+                {"text": "📊 Статистика", "callback_data": AdminMenu(action="stats").pack()},
+                {"text": "📁 Excel", "callback_data": AdminMenu(action="excel").pack()},
             ],
             [
-                {"text": "🧹 Архивировать старые", "callback_data": "admin_menu:archive"}
+                {"text": "🧹 Архивировать старые", "callback_data": AdminMenu(action="archive").pack()}
             ],
             [
-                {"text": "⚠️ Сбросить базу", "callback_data": "admin_menu:reset"},
-                {"text": "🔄 Обновить меню", "callback_data": "admin_menu:refresh"},
+                {"text": "⚠️ Сбросить базу", "callback_data": AdminMenu(action="reset").pack()},
+                {"text": "🔄 Обновить меню", "callback_data": AdminMenu(action="refresh").pack()},
             ],
         ]
     }
 
-def notify_admin_new_application():
+def _admin_coalesce_seconds() -> float:
+    try:
+        return max(0.0, float(os.getenv("ADMIN_COALESCE_SECONDS", "5").strip()))
+    except ValueError:
+        return 5.0
+
+
+ADMIN_COALESCER = ThreadedCoalescer(_admin_coalesce_seconds())
+
+
+def notify_admin_new_application(new_count: int = 1):
     counts = get_status_counts()
+    title = f"Новые анкеты: +{new_count}" if new_count > 1 else "Новая анкета"
     text = (
-        "🔔 <b>Новая анкета</b>\n\n"
+        f"🔔 <b>{title}</b>\n\n"
         f"Ожидают подтверждения: <b>{counts.get('pending', 0)}</b>\n"
         "Открой админ-меню, чтобы просмотреть ✨"
     )
@@ -515,9 +552,35 @@ def build_multipart(fields: dict, files: dict):
     return boundary, bytes(body)
 
 
+def _chat_key(value):
+    # В запросах chat_id — строка; лимитеру нужен тот же числовой ключ, что и в боте.
+    text = str(value).strip()
+    return int(text) if text.lstrip("-").isdigit() else value
+
+
+TELEGRAM_LIMITER = SyncRateLimiter()
+
+TELEGRAM_RETRY_ATTEMPTS = 3
+
+
 def telegram_request(method: str, data: dict, files: dict | None = None):
     if not BOT_TOKEN or not ADMIN_GROUP_ID:
         raise RuntimeError({"description": "BOT_TOKEN или ADMIN_GROUP_ID не заданы"})
+    chat_id = None if method.startswith("get") or "chat_id" not in data else _chat_key(data["chat_id"])
+    for attempt in range(TELEGRAM_RETRY_ATTEMPTS + 1):
+        TELEGRAM_LIMITER.wait(chat_id, method)
+        try:
+            return _telegram_request_once(method, data, files)
+        except RuntimeError as err:
+            payload = err.args[0] if err.args and isinstance(err.args[0], dict) else {}
+            retry_after = (payload.get("parameters") or {}).get("retry_after")
+            if not retry_after or attempt >= TELEGRAM_RETRY_ATTEMPTS:
+                raise
+            print("Telegram retry after:", method, retry_after)
+            TELEGRAM_LIMITER.block(chat_id, float(retry_after))
+
+
+def _telegram_request_once(method: str, data: dict, files: dict | None = None):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/{method}"
 
     if files:
@@ -771,6 +834,12 @@ class Handler(SimpleHTTPRequestHandler):
         user_id = -int(time.time_ns())
         web_id = str(user_id)
         submitted_at = format_submit_time(datetime.now(timezone.utc).isoformat())
+        # Проверка на повтор до отправки карточки, чтобы пометка попала в неё сразу.
+        earlier = None
+        try:
+            earlier = find_earlier_application(user_id, phone=phone, telegram=telegram)
+        except Exception as err:
+            print("Duplicate check error:", err)
 
         try:
             send_full = os.getenv("WEB_SEND_FULL_TO_ADMIN", "").strip().lower() in {"1", "true", "yes"}
@@ -779,7 +848,7 @@ class Handler(SimpleHTTPRequestHandler):
                     "sendMessage",
                     {
                         "chat_id": str(ADMIN_GROUP_ID),
-                        "text": build_admin_full_text(payload, web_id, submitted_at),
+                        "text": build_admin_full_text(payload, web_id, submitted_at, earlier),
                         "parse_mode": "HTML",
                     },
                 )
@@ -855,7 +924,13 @@ class Handler(SimpleHTTPRequestHandler):
             return error(message, status=500)
 
         try:
-            save_web_application(user_id, payload, source="site", status="pending")
+            save_web_application(
+                user_id,
+                payload,
+                source="site",
+                status="pending",
+                duplicate_of=earlier["user_id"] if earlier else None,
+            )
             if append_application_row:
                 try:
                     append_application_row(payload, user_id, "pending")
@@ -865,9 +940,9 @@ class Handler(SimpleHTTPRequestHandler):
             print("DB error:", err)
             return error(msg(site_lang, "db_error"), status=500)
 
-        # синхронизируем админ-меню и уведомление так же, как в боте
-        notify_admin_new_application()
-        update_admin_menu_message()
+        # синхронизируем админ-меню и уведомление так же, как в боте (пачкой за окно)
+        ADMIN_COALESCER.mark_dirty("notify", notify_admin_new_application)
+        ADMIN_COALESCER.mark_dirty("menu", lambda _count: update_admin_menu_message())
 
         bot_link = f"https://t.me/{BOT_USERNAME.strip().lstrip('@')}" if BOT_USERNAME.strip() else None
         return self.send_json({
@@ -899,5 +974,13 @@ if __name__ == "__main__":
         host = "0.0.0.0"
     port = int(os.getenv("PORT", "8080"))
     server = ThreadingHTTPServer((host, port), Handler)
+    # SIGTERM при деплое: останавливаем приём запросов и дописываем отложенные правки админ-группы.
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
     print(f"Running on http://{host}:{port}")
-    server.serve_forever()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        ADMIN_COALESCER.flush()